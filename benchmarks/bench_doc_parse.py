@@ -0,0 +1,174 @@
+"""
+Time and peak memory of the DOCX history parser on a synthetic archive, compared
+with the previous python-docx parser.
+
+The archive is a directory of DOCX files in the history layout: a heading per
+article, then "Article Title:", "Publication name:", ... "Article Link:" lines
+and the article text over several paragraphs. Modes:
+
+    legacy      the previous split_doc/extract_details, file by file
+    streaming   parse_archives with one worker: sections are read incrementally
+    parallel    parse_archives across a process pool, one file per task
+
+Every mode writes JSONL; the output of the new modes is checked against the
+legacy output. Each case runs in a fresh process so peak RSS is measured per case.
+
+Usage:
+    python -m benchmarks.bench_doc_parse [--files N] [--articles N] [--paragraphs N] [--workers N] [--modes a,b]
+    python -m benchmarks.bench_doc_parse --files 8 --articles 2000 --paragraphs 20
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import resource
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+from src.parser.doc import archive_paths, parse_archives, write_jsonl
+
+MODES = ["legacy", "streaming", "parallel"]
+WORDS = ("hangar fire crews aircraft maintenance foam suppression airport runway smoke damage "
+         "firefighters blaze roof evacuated investigation engine fuel tanker jet").split()
+
+
+def _paragraph(text: str, style: str = None) -> str:
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    runs = "<w:r><w:tab/></w:r>".join(f'<w:r><w:t xml:space="preserve">{escape(part)}</w:t></w:r>'
+                                      for part in text.split("\t"))
+    return f"<w:p>{properties}{runs}</w:p>"
+
+
+def synthetic_archive(directory: str, files: int, articles: int, paragraphs: int) -> None:
+    """
+    Write `files` DOCX files of `articles` articles each, every article with `paragraphs`
+    text paragraphs. The body XML is written directly into a python-docx template, as
+    adding hundreds of thousands of paragraphs through python-docx is quadratic.
+    """
+    from docx import Document
+
+    template = os.path.join(directory, "template.docx")
+    Document().save(template)
+    with zipfile.ZipFile(template) as source:
+        parts = {name: source.read(name) for name in source.namelist()}
+    os.remove(template)
+    document = parts["word/document.xml"].decode("utf-8")
+    head, tail = document[:document.index("<w:body>") + len("<w:body>")], document[document.index("<w:sectPr"):]
+
+    for file_index in range(files):
+        rng = random.Random(file_index)
+        body = []
+        for i in range(articles):
+            body.append(_paragraph(f"Incident {file_index}-{i}", style="Heading2"))
+            body.append(_paragraph(f"Article Title: Fire in hangar {i} at airport {rng.randint(1, 5000)}"))
+            body.append(_paragraph(f"Publication name: Aviation Daily {rng.randint(1, 50)}"))
+            body.append(_paragraph(f"Accident Location: City {rng.randint(1, 900)}, Country {rng.randint(1, 60)}"))
+            body.append(_paragraph(f"Article Date: 20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"))
+            body.append(_paragraph(f"Author:\tReporter {rng.randint(1, 300)}"))
+            body.append(_paragraph(f"Article Link: https://news.example.com/{file_index}/{i}"))
+            for _ in range(paragraphs):
+                body.append(_paragraph(" ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))) + "."))
+        path = os.path.join(directory, f"history-{file_index:03d}.docx")
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, data in parts.items():
+                archive.writestr(name, head + "".join(body) + tail if name == "word/document.xml" else data)
+
+
+def legacy_parse(path: str):
+    """The previous parser: python-docx, `content +=` sections and seven re.search calls per section."""
+    from docx import Document
+
+    doc = Document(path)
+    content_list = []
+    content = ""
+    for para in doc.paragraphs:
+        if para.style.name.startswith('Heading'):
+            if content:
+                content_list.append(content)
+                content = ""
+        else:
+            content += f"{para.text}\n"
+    if content:
+        content_list.append(content)
+
+    patterns = {
+        "title": r"Article Title:\s*(.*)",
+        "source": r"Publication name:\s*(.*)",
+        "location": r"Accident Location:\s*(.*)",
+        "publishedAt": r"Article Date:\s*(.*)",
+        "author": r"Author:[\t]*(.*)",
+        "url": r"Article Link:\s*(\S+)",
+        "content": r"Article Link:\s*\S+\s*([\s\S]+)"
+    }
+    articles = []
+    for content in content_list:
+        details = {}
+        for key, pattern in patterns.items():
+            match = re.search(pattern, content)
+            details[key] = match.group(1).strip() if match else ""
+        details["content"] = details["content"].replace("\n", " ").strip()
+        if details["title"]:
+            articles.append(details)
+    return articles
+
+
+def _run_case(mode: str, directory: str, output: str, workers: int, results) -> None:
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "legacy":
+        count = write_jsonl((article for path in archive_paths(directory) for article in legacy_parse(path)), output)
+    else:
+        count = write_jsonl(parse_archives(directory, workers=1 if mode == "streaming" else workers), output)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux; pool workers are not included
+    results.put((count, elapsed, (peak - baseline) / 1024))
+
+
+def run_case(mode: str, directory: str, output: str, workers: int):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_case, args=(mode, directory, output, workers, results))
+    process.start()
+    outcome = results.get()
+    process.join()
+    return outcome
+
+
+def _same_output(path: str, reference: str) -> bool:
+    with open(path, "r", encoding="utf-8") as f, open(reference, "r", encoding="utf-8") as g:
+        return [json.loads(line) for line in f] == [json.loads(line) for line in g]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--articles", type=int, default=2000, help="articles per file")
+    parser.add_argument("--paragraphs", type=int, default=20, help="text paragraphs per article")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--modes", default=",".join(MODES))
+    options = parser.parse_args()
+    modes = options.modes.split(",")
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = os.path.join(directory, "archive")
+        os.makedirs(archive)
+        start = time.perf_counter()
+        synthetic_archive(archive, options.files, options.articles, options.paragraphs)
+        size = sum(os.path.getsize(path) for path in archive_paths(archive)) / 1024 / 1024
+        print(f"Synthetic archive: {options.files} files x {options.articles} articles, "
+              f"{size:.1f} MiB, generated in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'mode':<10} {'articles':>10} {'seconds':>10} {'articles/s':>12} {'peak MiB':>10} {'matches':>8}")
+        reference = None
+        for mode in modes:
+            output = os.path.join(directory, f"{mode}.jsonl")
+            count, elapsed, peak = run_case(mode, archive, output, options.workers)
+            if mode == "legacy":
+                reference = output
+            matches = "-" if reference is None or mode == "legacy" else ("yes" if _same_output(output, reference) else "NO")
+            print(f"{mode:<10} {count:>10} {elapsed:>10.2f} {count / elapsed:>12.0f} {peak:>10.1f} {matches:>8}")
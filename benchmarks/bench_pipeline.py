@@ -0,0 +1,207 @@
+"""
+Offline end-to-end benchmark of the pipeline stages against the local fakes in
+benchmarks/fakes.py (SerpAPI, OpenAI, Supabase, googletrans and Mailjet).
+
+Stages:
+    doc_upload   embed and store the history document
+    upload       article_upload of one scrape's worth of articles against the stored history
+    export       ArticleExcelExporter after an (unmeasured) upload
+    weekly       weekly_process end to end: scrape, upload, export and email
+
+Each stage runs in a fresh process with its own temporary working directory, so
+caches start cold and peak RSS is measured per stage. The report gives wall time,
+throughput, peak memory, the calls, errors and latency percentiles seen by each
+fake service and the chat prompt tokens served from the fake's prefix cache; --json writes the same numbers for comparing runs.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--articles N] [--history N] [--latency-scale X]
+                                        [--error-rate P] [--stages a,b] [--json path]
+    python -m benchmarks.bench_pipeline --articles 2000 --latency-scale 0.5 --json bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import traceback
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ["doc_upload", "upload", "export", "weekly"]
+
+FAKE_ENV = {
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_KEY": "fake.supabase.key",
+    "OPENAI_API_KEY": "sk-fake",
+    "SERPAPI_KEY": "fake-serpapi-key",
+    "MJ_APIKEY_PUBLIC": "fake-public",
+    "MJ_APIKEY_PRIVATE": "fake-private",
+    "SENDER_EMAIL": "reporter@example.com",
+    "RECIPIENT_EMAIL": "team@example.com",
+}
+
+
+def as_records(corpus):
+    """Corpus articles in the record shape the scrapers emit."""
+    from datetime import datetime, timedelta
+
+    now = datetime.now()
+    return [{
+        "title": article["title"],
+        "url": article["url"],
+        "description": article["snippet"],
+        "source": article["source"],
+        "author": None,
+        "publishedAt": (now - timedelta(days=article["days_ago"])).strftime('%Y-%m-%d'),
+        "language": article["language"],
+    } for article in corpus.articles]
+
+
+def _run_stage(stage: str, options: dict, results) -> None:
+    try:
+        results.put(_measure_stage(stage, options))
+    except BaseException:
+        results.put({"stage": stage, "error": traceback.format_exc()})
+        raise
+
+
+def _measure_stage(stage: str, options: dict) -> dict:
+    sys.path.insert(0, REPO_ROOT)
+    for name, value in FAKE_ENV.items():
+        os.environ[name] = value
+    os.environ.pop("NEWSAPI_KEY", None)
+    os.chdir(tempfile.mkdtemp(prefix=f"bench-{stage}-"))
+
+    from benchmarks.fakes import FakeServices, SyntheticCorpus
+    from src.config import Config
+
+    # The fake translator's latency stands in for the real rate-limit pause
+    Config.TRANSLATION_MIN_INTERVAL = 0
+    Config.NEWSAPI_KEY = None
+    corpus = SyntheticCorpus(articles=options["articles"], history=options["history"], seed=options["seed"])
+    services = FakeServices(corpus, latency_scale=0, dimensions=options["dimensions"], seed=options["seed"],
+                            cache_min_tokens=options["cache_min_tokens"])
+    services.install()
+
+    if stage == "doc_upload":
+        from src.db import doc_upload
+
+        with open("history.json", "w", encoding="utf-8") as f:
+            json.dump(corpus.history, f)
+        items = len(corpus.history)
+
+        def measured():
+            doc_upload("history.json")
+    elif stage == "upload":
+        from src.db.upload import article_upload
+
+        services.seed_history()
+        records = as_records(corpus)
+        items = len(records)
+
+        def measured():
+            article_upload(records, is_backfill=False)
+    elif stage == "export":
+        from src.db.upload import article_upload
+        from src.excel.article_excel_exporter import ArticleExcelExporter
+
+        services.seed_history()
+        article_upload(as_records(corpus), is_backfill=False)
+        items = sum(1 for row in services.supabase.tables["articles"].values() if row.get("collectedAt") != "doc")
+
+        def measured():
+            ArticleExcelExporter().export_articles_to_excel()
+    elif stage == "weekly":
+        import main
+
+        services.seed_history()
+        items = len(corpus.articles)
+
+        def measured():
+            main.weekly_process()
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+    services.configure(latency_scale=options["latency_scale"], error_rate=options["error_rate"])
+    services.reset_stats()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    measured()
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "stage": stage,
+        "items": items,
+        "seconds": round(elapsed, 3),
+        "items_per_second": round(items / elapsed, 1) if elapsed else None,
+        # ru_maxrss is in KiB on Linux
+        "peak_mib": round((peak - baseline) / 1024, 1),
+        "rows_stored": len(services.supabase.tables.get("articles", {})),
+        "services": services.stats(),
+        "chat_tokens": services.openai.token_stats(),
+    }
+
+
+def run_stage(stage: str, options: dict) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_stage, args=(stage, options, results))
+    process.start()
+    outcome = results.get()
+    process.join()
+    return outcome
+
+
+def print_report(outcomes) -> None:
+    for outcome in outcomes:
+        if "error" in outcome:
+            print(f"\nstage {outcome['stage']} failed:\n{outcome['error']}")
+    outcomes = [outcome for outcome in outcomes if "error" not in outcome]
+    print(f"\n{'stage':<12} {'items':>8} {'seconds':>9} {'items/s':>9} {'peak MiB':>9} {'rows':>8}")
+    for outcome in outcomes:
+        print(f"{outcome['stage']:<12} {outcome['items']:>8} {outcome['seconds']:>9.2f} "
+              f"{outcome['items_per_second']:>9} {outcome['peak_mib']:>9.1f} {outcome['rows_stored']:>8}")
+    print(f"\n{'stage':<12} {'service':<14} {'calls':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for outcome in outcomes:
+        for service, stats in outcome["services"].items():
+            print(f"{outcome['stage']:<12} {service:<14} {stats['calls']:>7} {stats['errors']:>7} "
+                  f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}")
+    print(f"\n{'stage':<12} {'chat prompt tokens':>19} {'cached':>9} {'cached %':>9}")
+    for outcome in outcomes:
+        tokens = outcome["chat_tokens"]
+        if tokens["prompt_tokens"]:
+            print(f"{outcome['stage']:<12} {tokens['prompt_tokens']:>19} {tokens['cached_tokens']:>9} "
+                  f"{100 * tokens['cached_tokens'] / tokens['prompt_tokens']:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=500, help="news articles in the synthetic corpus")
+    parser.add_argument("--history", type=int, default=1000, help="incidents in the stored history")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="multiplier on the fakes' default latencies; 0 measures pipeline overhead only")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake calls that fail")
+    parser.add_argument("--dimensions", type=int, default=1536, help="embedding dimensions")
+    parser.add_argument("--cache-min-tokens", type=int, default=1024,
+                        help="shortest prompt prefix the fake chat model caches (OpenAI: 1024)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated subset of {STAGES}")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    options = {
+        "articles": args.articles,
+        "history": args.history,
+        "latency_scale": args.latency_scale,
+        "error_rate": args.error_rate,
+        "dimensions": args.dimensions,
+        "cache_min_tokens": args.cache_min_tokens,
+        "seed": args.seed,
+    }
+    outcomes = [run_stage(stage, options) for stage in args.stages.split(",")]
+    print_report(outcomes)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"options": options, "stages": outcomes}, f, indent=2)
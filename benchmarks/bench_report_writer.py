@@ -0,0 +1,117 @@
+"""
+Time and peak memory of the streaming ReportWriter on synthetic report rows,
+optionally compared with the old pandas to_excel + load_workbook styling pass.
+
+Each case runs in a fresh process so peak RSS is measured per case.
+
+Usage:
+    python -m benchmarks.bench_report_writer [--rows N [N ...]] [--legacy]
+    python -m benchmarks.bench_report_writer --rows 10000 100000 1000000 --legacy
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+
+import pandas as pd
+
+from src.excel.report_writer import ReportWriter
+
+HEADERS = [
+    "Date of Incident",
+    "Airport / Hangar Name",
+    "Country / Region",
+    "Brief Summary",
+    "Source Link(s)",
+    "Language",
+    "Origin Title"
+]
+
+
+def synthetic_report(rows: int) -> pd.DataFrame:
+    rng = random.Random(rows)
+    languages = ["en", "fr", "de", "es", "ja"]
+    return pd.DataFrame({
+        "Date of Incident": [f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" for _ in range(rows)],
+        "Airport / Hangar Name": [f"Airport {rng.randint(1, 5000)} Hangar {rng.randint(1, 9)}" for _ in range(rows)],
+        "Country / Region": [rng.choice(["United States", "France", "Germany", "Japan", "Brazil"]) for _ in range(rows)],
+        "Brief Summary": [f"Fire reported in maintenance hangar {i}; crews contained the blaze. " * rng.randint(1, 4) for i in range(rows)],
+        "Source Link(s)": [", ".join(f"https://news.example.com/{i}/{j}" for j in range(rng.randint(1, 3))) for i in range(rows)],
+        "Language": [rng.choice(languages) for _ in range(rows)],
+        "Origin Title": [f"Original title {i}" for i in range(rows)],
+    }, columns=HEADERS)
+
+
+def legacy_write(df: pd.DataFrame, path: str) -> None:
+    """The previous exporter: write with pandas, reload, scan every column, save again."""
+    from openpyxl import load_workbook
+    from openpyxl.styles import Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    df.to_excel(path, index=False)
+    wb = load_workbook(path)
+    ws = wb.active
+    for col_idx, header in enumerate(HEADERS, 1):
+        cell = ws.cell(row=1, column=col_idx)
+        cell.fill = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")
+        cell.font = Font(bold=True)
+    for col_idx, header in enumerate(HEADERS, 1):
+        max_length = len(header)
+        for row in ws.iter_rows(min_row=2, min_col=col_idx, max_col=col_idx):
+            for cell in row:
+                if cell.value:
+                    max_length = max(max_length, len(str(cell.value)))
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_length + 2, 50)
+    url_col_idx = HEADERS.index("Source Link(s)") + 1
+    for row in ws.iter_rows(min_row=2, min_col=url_col_idx, max_col=url_col_idx):
+        for cell in row:
+            if cell.value:
+                cell.hyperlink = str(cell.value).split(",")[0].strip()
+                cell.font = Font(color="0000EE", underline="single")
+    wb.save(path)
+
+
+def _run_case(mode: str, rows: int, results) -> None:
+    df = synthetic_report(rows)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "report.xlsx")
+        start = time.perf_counter()
+        if mode == "legacy":
+            legacy_write(df, path)
+        else:
+            ReportWriter(HEADERS, link_column="Source Link(s)").write(df, path)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux
+    results.put((elapsed, (peak - baseline) / 1024, size / 1024 / 1024))
+
+
+def run_case(mode: str, rows: int):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_case, args=(mode, rows, results))
+    process.start()
+    outcome = results.get()
+    process.join()
+    return outcome
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000],
+                        help="report sizes to time; 1000000 rows takes minutes and over 1 GiB")
+    parser.add_argument("--legacy", action="store_true",
+                        help="also time the old pandas to_excel + load_workbook styling pass")
+    args = parser.parse_args()
+    modes = ["streaming", "legacy"] if args.legacy else ["streaming"]
+
+    print(f"{'mode':<10} {'rows':>10} {'seconds':>10} {'peak MiB':>10} {'file MiB':>10}")
+    for rows in args.rows:
+        for mode in modes:
+            elapsed, peak, size = run_case(mode, rows)
+            print(f"{mode:<10} {rows:>10} {elapsed:>10.2f} {peak:>10.1f} {size:>10.1f}")
@@ -0,0 +1,84 @@
+"""
+Compare sequential and concurrent SerpScraper.scrape runs against a local fake SerpAPI.
+
+Both passes run without the SerpAPI response cache and without watermarks, so
+every search reaches the fake and the passes only differ in concurrency. The
+translation cache lives in a temporary directory; nothing is written to cache/.
+
+Usage:
+    python -m benchmarks.bench_serpapi_scrape [--latency SECONDS] [--workers N]
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Dict
+
+os.environ.setdefault('SERPAPI_KEY', 'fake-key')
+os.environ.setdefault('OPENAI_API_KEY', 'fake-key')
+
+from src.config import Config
+from src.scrapers import scrape_serpapi
+from src.scrapers.scrape_serpapi import SerpScraper
+
+
+class FakeGoogleSearch:
+    """Stand-in for serpapi.GoogleSearch that sleeps instead of calling the network"""
+    latency = 0.2
+    bing_pages = 2
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = dict(params)
+
+    def get_dict(self) -> Dict[str, Any]:
+        time.sleep(self.latency)
+        query = self.params['q']
+        if self.params['engine'] == 'google_news':
+            return {"news_results": [{
+                "title": f"{query} google {i}",
+                "link": f"https://news.example.com/google/{query}/{i}",
+                "source": {"name": "Example News", "authors": ["Reporter"]},
+                "date": "01/01/2025, 09:00 AM, +0000 UTC"
+            } for i in range(5)]}
+
+        page = (self.params.get('first', 1) - 1) // self.params['count']
+        if page >= self.bing_pages:
+            return {"organic_results": []}
+        return {"organic_results": [{
+            "title": f"{query} bing {page}-{i}",
+            "link": f"https://news.example.com/bing/{query}/{page}/{i}",
+            "snippet": "Hangar fire reported",
+            "source": "Example News",
+            "date": "2d"
+        } for i in range(self.params['count'])]}
+
+
+def run(latency: float, max_workers: int) -> None:
+    FakeGoogleSearch.latency = latency
+    scrape_serpapi.GoogleSearch = FakeGoogleSearch
+    scrape_serpapi.translate_query = lambda query, language: f"{query} [{language}]"
+    Config.SERPAPI_CACHE_ENABLED = False
+
+    timings = {}
+    outputs = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        Config.TRANSLATION_CACHE_PATH = os.path.join(workdir, 'translations.sqlite3')
+        for label, workers in (("sequential", 1), ("concurrent", max_workers)):
+            scraper = SerpScraper(incremental=False)
+            start = time.perf_counter()
+            outputs[label] = scraper.scrape(Config.query_list, max_workers=workers)
+            timings[label] = time.perf_counter() - start
+
+    same_order = [a['url'] for a in outputs["sequential"]] == [a['url'] for a in outputs["concurrent"]]
+    print(f"sequential: {timings['sequential']:.2f}s")
+    print(f"concurrent ({max_workers} workers): {timings['concurrent']:.2f}s")
+    print(f"speedup: {timings['sequential'] / timings['concurrent']:.1f}x, identical ordering: {same_order}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds the fake SerpAPI takes per search")
+    parser.add_argument("--workers", type=int, default=Config.SERPAPI_MAX_WORKERS,
+                        help="worker threads for the concurrent pass")
+    args = parser.parse_args()
+    run(args.latency, args.workers)
@@ -0,0 +1,620 @@
+"""
+Local stand-ins for the external services the pipeline calls, for offline benchmarks.
+
+Every fake routes its calls through a FakeEndpoint, which sleeps for a configurable
+latency (with jitter), limits concurrency like a rate-limited API would, injects
+failures at a configurable rate and records per-call latencies. `install()` patches
+the fakes into the pipeline modules; nothing here touches the network.
+
+The fakes answer from a SyntheticCorpus: news articles about numbered incidents
+("Airport 00042"), several reports per incident, plus off-topic articles. The fake
+embeddings put reports of the same incident close together and the fake chat model
+marks an article as a duplicate when a compared article is about the same incident,
+so deduplication behaves as it would against the real services.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import types
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+INCIDENT_PATTERN = re.compile(r"Airport (\d+)")
+
+# Default per-call latencies in seconds, roughly a tenth of what the real services take
+DEFAULT_LATENCIES = {
+    "serpapi": 0.2,
+    "embeddings": 0.05,
+    "chat": 0.3,
+    "supabase": 0.02,
+    "supabase_rpc": 0.04,
+    "translate": 0.03,
+    "mailjet": 0.1,
+}
+# Extra chat latency per additional article in a batched request, relative to a single call
+CHAT_BATCH_LATENCY_PER_CASE = 0.25
+# Chat latency of smaller models relative to the default
+CHAT_MODEL_LATENCY = {"gpt-4o-mini": 0.5}
+# Concurrent requests each service accepts before callers queue
+DEFAULT_CONCURRENCY = {
+    "serpapi": 8,
+    "embeddings": 8,
+    "chat": 16,
+    "supabase": 16,
+    "supabase_rpc": 16,
+    "translate": 4,
+    "mailjet": 2,
+}
+
+
+class FakeServiceError(Exception):
+    """Failure injected by a FakeEndpoint"""
+
+
+class FakeEndpoint:
+    """Latency, concurrency and failure model for one fake service, with per-call statistics."""
+
+    def __init__(self, name: str, latency: float = 0.0, jitter: float = 0.25, error_rate: float = 0.0,
+                 concurrency: int = None, seed: int = 0):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._slots = threading.BoundedSemaphore(concurrency) if concurrency else None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latencies = []
+            self.errors = 0
+
+    @contextmanager
+    def call(self, scale: float = 1.0):
+        """
+        Time one call, including any wait for a free slot; raises FakeServiceError at error_rate.
+        `scale` multiplies the latency, for calls that do more work than the usual one.
+        """
+        start = time.perf_counter()
+        if self._slots:
+            self._slots.acquire()
+        try:
+            with self._lock:
+                delay = self.latency * scale * (1 + self._rng.uniform(-self.jitter, self.jitter))
+                fail = self._rng.random() < self.error_rate
+            if delay > 0:
+                time.sleep(delay)
+            if fail:
+                with self._lock:
+                    self.errors += 1
+                raise FakeServiceError(f"{self.name}: injected failure")
+            yield
+        finally:
+            if self._slots:
+                self._slots.release()
+            with self._lock:
+                self.latencies.append(time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = list(self.latencies)
+            errors = self.errors
+        if not latencies:
+            return {"calls": 0, "errors": errors}
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            "calls": len(latencies),
+            "errors": errors,
+            "p50_ms": round(p50 * 1000, 1),
+            "p95_ms": round(p95 * 1000, 1),
+            "p99_ms": round(p99 * 1000, 1),
+        }
+
+
+class SyntheticCorpus:
+    """
+    Deterministic news corpus: `articles` reports spread over incidents, `reports_per_incident`
+    reports each, with `irrelevant_fraction` off-topic articles mixed in. `history` doc-style
+    incidents are generated for the stored table, and `known_fraction` of the news
+    incidents are follow-ups of a stored one.
+    """
+
+    LANGUAGES = ['en', 'zh-cn', 'es', 'fr', 'pt', 'de', 'ar', 'ru', 'ja', 'tr']
+    TITLES = [
+        "Fire breaks out in aircraft hangar at Airport {incident}",
+        "Blaze damages maintenance hangar at Airport {incident}",
+        "Firefighters contain hangar fire at Airport {incident}",
+        "Foam suppression system discharges in hangar at Airport {incident}",
+    ]
+    OFF_TOPIC = [
+        "Airport {incident} opens new retail area",
+        "Airline at Airport {incident} reports record quarter",
+    ]
+    COUNTRIES = ["United States", "France", "Germany", "Brazil", "Japan", "Spain", "Turkey", "Russia"]
+
+    def __init__(self, articles: int = 500, reports_per_incident: int = 3, irrelevant_fraction: float = 0.1,
+                 history: int = 1000, known_fraction: float = 0.2, seed: int = 0):
+        rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self.history = [self._doc_article(incident, rng) for incident in range(history)]
+
+        self.articles = []
+        incident = history
+        while len(self.articles) < articles:
+            if history and rng.random() < known_fraction:
+                subject = rng.randrange(history)
+            else:
+                subject = incident
+                incident += 1
+            days_ago = rng.randint(0, 6)
+            for _ in range(min(reports_per_incident, articles - len(self.articles))):
+                self.articles.append(self._news_article(subject, days_ago, rng, off_topic=False))
+        for _ in range(int(articles * irrelevant_fraction)):
+            position = rng.randrange(len(self.articles) + 1)
+            self.articles.insert(position, self._news_article(rng.randrange(10 ** 5), rng.randint(0, 6), rng, True))
+
+    def _doc_article(self, incident: int, rng: random.Random) -> Dict[str, Any]:
+        published = datetime(2015, 1, 1) + timedelta(days=rng.randrange(3000))
+        return {
+            "title": self.TITLES[incident % len(self.TITLES)].format(incident=f"{incident:05d}"),
+            "publishedAt": published.strftime('%Y-%m-%d'),
+            "url": f"https://archive.example.com/{incident}",
+            "location": f"Airport {incident:05d}, {self.COUNTRIES[incident % len(self.COUNTRIES)]}",
+            "content": "Hangar fire incident recorded in the history document. " * rng.randint(3, 12),
+        }
+
+    def _news_article(self, incident: int, days_ago: int, rng: random.Random, off_topic: bool) -> Dict[str, Any]:
+        templates = self.OFF_TOPIC if off_topic else self.TITLES
+        snippet = "Passenger numbers rose again. " if off_topic else "Emergency crews responded to the hangar at the airport. "
+        serial = rng.getrandbits(48)
+        return {
+            "title": rng.choice(templates).format(incident=f"{incident:05d}"),
+            "url": f"https://news{serial % 97}.example.com/story/{serial:x}?utm_source=feed",
+            "snippet": snippet * rng.randint(1, 4),
+            "source": f"Example News {serial % 97}",
+            "language": self.LANGUAGES[serial % len(self.LANGUAGES)],
+            "days_ago": days_ago,
+        }
+
+    @staticmethod
+    def bucket(key: str, buckets: int) -> int:
+        return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:8], 16) % buckets
+
+    def results_for(self, engine: str, query: str, buckets: int = 64) -> List[Dict[str, Any]]:
+        """Articles a search returns, newest first: each article belongs to one bucket per engine."""
+        with self._lock:
+            if engine not in self._buckets:
+                grouped = [[] for _ in range(buckets)]
+                for article in sorted(self.articles, key=lambda a: a["days_ago"]):
+                    grouped[self.bucket(f"{engine}\x1f{article['url']}", buckets)].append(article)
+                self._buckets[engine] = grouped
+            grouped = self._buckets[engine]
+        return grouped[self.bucket(f"{engine}\x1f{query}", len(grouped))]
+
+
+def _incident_of(text: str) -> Optional[str]:
+    match = INCIDENT_PATTERN.search(text or '')
+    return match.group(1) if match else None
+
+
+def _unit_vector(seed_text: str, dimensions: int) -> np.ndarray:
+    seed = int(hashlib.md5(seed_text.encode('utf-8')).hexdigest()[:8], 16)
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return vector / np.linalg.norm(vector)
+
+
+class FakeGoogleSearch:
+    """Stand-in for serpapi.GoogleSearch answering google_news and bing_news from the corpus"""
+    endpoint: FakeEndpoint = None
+    corpus: SyntheticCorpus = None
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = dict(params)
+
+    def get_dict(self) -> Dict[str, Any]:
+        with self.endpoint.call():
+            engine, query = self.params['engine'], self.params['q']
+            results = self.corpus.results_for(engine, query)
+            now = datetime.now()
+            if engine == 'google_news':
+                return {"news_results": [{
+                    "title": article["title"],
+                    "link": article["url"],
+                    "source": {"name": article["source"], "authors": None},
+                    "date": (now - timedelta(days=article["days_ago"])).strftime('%m/%d/%Y, %I:%M %p, +0000 UTC'),
+                } for article in results[:100]]}
+            first = self.params.get('first', 1) - 1
+            page = results[first:first + self.params.get('count', 10)]
+            return {"organic_results": [{
+                "title": article["title"],
+                "link": article["url"],
+                "snippet": article["snippet"],
+                "source": article["source"],
+                "date": f"{article['days_ago'] + 1}d",
+            } for article in page]}
+
+
+class FakeOpenAI:
+    """
+    Stand-in for openai.OpenAI covering embeddings.create and chat.completions.create.
+
+    Chat calls simulate OpenAI's automatic prompt caching: once a prompt of at least
+    `cache_min_tokens` tokens has been seen, a later prompt sharing its prefix reports
+    the longest shared prefix, in 128-token steps, as `prompt_tokens_details.cached_tokens`.
+    """
+
+    CACHE_INCREMENT_TOKENS = 128
+
+    def __init__(self, embeddings: FakeEndpoint, chat: FakeEndpoint, dimensions: int = 1536,
+                 cache_min_tokens: int = 1024):
+        self.embedding_endpoint = embeddings
+        self.chat_endpoint = chat
+        self.dimensions = dimensions
+        self.cache_min_tokens = cache_min_tokens
+        self._cached_prefixes = set()
+        self._cache_lock = threading.Lock()
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.embeddings = types.SimpleNamespace(create=self._embed)
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._chat))
+
+    def embed(self, text: str) -> List[float]:
+        """Reports of one incident share most of their vector, so they come out as near neighbours."""
+        incident = _incident_of(text)
+        vector = _unit_vector(text, self.dimensions)
+        if incident is not None:
+            vector = 0.9 * _unit_vector(f"incident {incident}", self.dimensions) + 0.3 * vector
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def _embed(self, input: List[str], model: str, **kwargs):
+        with self.embedding_endpoint.call():
+            data = [types.SimpleNamespace(index=i, embedding=self.embed(text)) for i, text in enumerate(input)]
+            tokens = sum(len(text) // 4 + 1 for text in input)
+            return types.SimpleNamespace(data=data, usage=types.SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens))
+
+    def _prefix_cache(self, model: str, prompt: str) -> int:
+        """Cached tokens for the prompt (4 characters a token), remembering its prefixes for later calls."""
+        tokens = len(prompt) // 4
+        boundaries = range(self.cache_min_tokens, tokens + 1, self.CACHE_INCREMENT_TOKENS)
+        keys = [(model, hashlib.sha1(prompt[:boundary * 4].encode()).digest()) for boundary in boundaries]
+        cached = 0
+        with self._cache_lock:
+            for boundary, key in zip(boundaries, keys):
+                if key not in self._cached_prefixes:
+                    break
+                cached = boundary
+            self._cached_prefixes.update(keys)
+        return cached
+
+    def token_stats(self) -> Dict[str, int]:
+        return {"prompt_tokens": self.prompt_tokens, "cached_tokens": self.cached_tokens}
+
+    @staticmethod
+    def _analyze(prompt: str) -> Dict[str, Any]:
+        """Answer one analysis: valid if the title names an incident and a fire, a duplicate of a compared report of it."""
+        existing, _, new = prompt.partition("NEW ARTICLE TO ANALYZE:")
+        new_title = re.search(r"Title: (.*)", new)
+        new_title = new_title.group(1) if new_title else ""
+        incident = _incident_of(new_title)
+        existing = existing.split("EXISTING ARTICLES FOR COMPARISON:")[-1]
+        compared = [_incident_of(title) for title in re.findall(r"Title: (.*)", existing)]
+        duplicate_index = compared.index(incident) + 1 if incident is not None and incident in compared else 0
+        return {
+            "is_valid": incident is not None and any(word in new_title.lower() for word in ("fire", "blaze", "foam")),
+            "duplicate_index": duplicate_index,
+            "airport_hangar_name": f"Airport {incident}" if incident else "",
+            "country_region": "United States",
+        }
+
+    def _chat(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        text = "\n".join(str(message.get("content", "")) for message in messages)
+        user_message = next((str(message.get("content", "")) for message in reversed(messages)
+                             if message.get("role") == "user"), text)
+        screened = re.split(r"=== ARTICLE \d+ ===", user_message)
+        cases = screened if len(screened) > 1 else re.split(r"=== CASE \d+ ===", user_message)
+        # Generating each further answer of a batch adds about a quarter of a single call's latency
+        scale = 1 + CHAT_BATCH_LATENCY_PER_CASE * max(len(cases) - 2, 0)
+        with self.chat_endpoint.call(scale=scale * CHAT_MODEL_LATENCY.get(model, 1.0)):
+            if len(screened) > 1:
+                # The screen sees no compared articles, so only the new-article part of _analyze applies
+                valid = [self._analyze(f"NEW ARTICLE TO ANALYZE:{case}")["is_valid"] for case in screened[1:]]
+                results = [{"case": i, "valid_probability": 0.95 if is_valid else 0.05}
+                           for i, is_valid in enumerate(valid, start=1)]
+                result = {"results": results}
+            elif len(cases) > 1:
+                results = [dict(self._analyze(case), case=i) for i, case in enumerate(cases[1:], start=1)]
+                result = {"results": results}
+            else:
+                result = self._analyze(user_message)
+            prompt_tokens = len(text) // 4 + 1
+            cached_tokens = self._prefix_cache(model, "".join(
+                f"<{message.get('role')}>{message.get('content', '')}" for message in messages
+            ))
+            with self._cache_lock:
+                self.prompt_tokens += prompt_tokens
+                self.cached_tokens += cached_tokens
+            completion_tokens = 40 * len(result.get("results", [result]))
+            usage = types.SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                          total_tokens=prompt_tokens + completion_tokens,
+                                          prompt_tokens_details=types.SimpleNamespace(cached_tokens=cached_tokens))
+            message = types.SimpleNamespace(content=json.dumps(result))
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+
+class _FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class _FakeQuery:
+    """The subset of the PostgREST query builder the pipeline uses"""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.op = 'select'
+        self.columns = '*'
+        self.payload = None
+        self.filters = []
+        self.window = None
+
+    def select(self, columns: str = '*'):
+        self.columns = columns
+        return self
+
+    def insert(self, rows):
+        self.op, self.payload = 'insert', rows
+        return self
+
+    def upsert(self, rows, **kwargs):
+        self.op, self.payload = 'upsert', rows
+        return self
+
+    def update(self, row):
+        self.op, self.payload = 'update', row
+        return self
+
+    def delete(self):
+        self.op = 'delete'
+        return self
+
+    # SQL comparison semantics: NULL never matches
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) == value)
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) != value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column, **kwargs):
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, count):
+        self.window = (0, count)
+        return self
+
+    def execute(self) -> _FakeResponse:
+        with self.db.endpoint.call():
+            return _FakeResponse(self.db.run(self))
+
+
+class FakeSupabase:
+    """In-memory stand-in for the supabase client: table queries and the match_articles RPC"""
+
+    def __init__(self, endpoint: FakeEndpoint, rpc_endpoint: FakeEndpoint):
+        self.endpoint = endpoint
+        self.rpc_endpoint = rpc_endpoint
+        self.tables: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._next_id = 0
+        self._lock = threading.RLock()
+        self._matrix = None  # cached embedding matrix for the RPC, rebuilt after writes
+
+    def table(self, name: str) -> _FakeQuery:
+        return _FakeQuery(self, name)
+
+    def _store(self, row: Dict[str, Any], previous: Dict[str, Any] = None) -> Dict[str, Any]:
+        stored = dict(row)
+        if isinstance(stored.get('embedding'), list):
+            # pgvector columns round-trip as '[x,y,...]' strings through PostgREST
+            stored['embedding'] = json.dumps(stored['embedding'])
+        # Like the updatedAt trigger: updates of the summary columns alone keep the timestamp
+        ignored = ('summary_en', 'summary_source', 'summary_version', 'updatedAt')
+        unchanged = previous is not None and all(
+            stored.get(key) == previous.get(key) for key in set(stored) | set(previous) if key not in ignored
+        )
+        stored['updatedAt'] = previous['updatedAt'] if unchanged and previous.get('updatedAt') else datetime.now().isoformat()
+        return stored
+
+    def _rows(self, table: str) -> Dict[int, Dict[str, Any]]:
+        return self.tables.setdefault(table, {})
+
+    def run(self, query: _FakeQuery) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._rows(query.table)
+            if query.op == 'insert':
+                payload = query.payload if isinstance(query.payload, list) else [query.payload]
+                stored = []
+                for row in payload:
+                    self._next_id += 1
+                    row = self._store(dict(row, id=self._next_id))
+                    rows[row['id']] = row
+                    stored.append(dict(row))
+                self._matrix = None
+                return stored
+            if query.op == 'upsert':
+                payload = query.payload if isinstance(query.payload, list) else [query.payload]
+                stored = []
+                for row in payload:
+                    previous = rows.get(row['id'])
+                    merged = self._store({**(previous or {}), **row}, previous)
+                    rows[row['id']] = merged
+                    stored.append(dict(merged))
+                self._matrix = None
+                return stored
+
+            selected = [row for _, row in sorted(rows.items()) if all(f(row) for f in query.filters)]
+            if query.op == 'update':
+                for row in selected:
+                    rows[row['id']] = self._store({**row, **query.payload}, row)
+                self._matrix = None
+                return [dict(rows[row['id']]) for row in selected]
+            if query.op == 'delete':
+                for row in selected:
+                    del rows[row['id']]
+                self._matrix = None
+                return selected
+            if query.window:
+                selected = selected[query.window[0]:query.window[1]]
+            if query.columns != '*':
+                columns = [column.strip() for column in query.columns.split(',')]
+                selected = [{column: row.get(column) for column in columns} for row in selected]
+            return [dict(row) for row in selected]
+
+    def rpc(self, name: str, params: Dict[str, Any]):
+        def execute():
+            with self.rpc_endpoint.call():
+                return _FakeResponse(self._match_articles(params['query_embedding'], params['match_count']))
+        return types.SimpleNamespace(execute=execute)
+
+    def _match_articles(self, query_embedding: List[float], match_count: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._matrix is None:
+                rows = [row for row in self._rows('articles').values() if row.get('embedding')]
+                matrix = np.array([json.loads(row['embedding']) for row in rows], dtype=np.float32)
+                self._matrix = (rows, matrix)
+            rows, matrix = self._matrix
+        if not rows:
+            return []
+        similarity = matrix @ np.asarray(query_embedding, dtype=np.float32)
+        top = np.argsort(-similarity)[:match_count]
+        return [dict({k: v for k, v in rows[i].items() if k != 'embedding'}, similarity=float(similarity[i]))
+                for i in top]
+
+    def seed(self, rows: List[Dict[str, Any]]) -> None:
+        """Store rows directly, without going through the endpoint."""
+        with self._lock:
+            for row in rows:
+                self._next_id += 1
+                stored = self._store(dict(row, id=self._next_id))
+                self._rows('articles')[stored['id']] = stored
+            self._matrix = None
+
+
+class FakeTranslator:
+    """Stand-in for googletrans.Translator; English targets come back unchanged"""
+    endpoint: FakeEndpoint = None
+
+    async def translate(self, text: str, dest: str = 'en', src: str = 'auto'):
+        with self.endpoint.call():
+            translated = text if dest == 'en' else f"{text} [{dest}]"
+            return types.SimpleNamespace(text=translated, src=src, dest=dest)
+
+
+class FakeMailjet:
+    """Stand-in for mailjet_rest.Client; send.create accepts every message"""
+    endpoint: FakeEndpoint = None
+
+    def __init__(self, auth=None, version=None):
+        self.sent = []
+        self.send = types.SimpleNamespace(create=self._create)
+
+    def _create(self, data: Dict[str, Any]):
+        with self.endpoint.call():
+            self.sent.append(data)
+            return types.SimpleNamespace(status_code=200, json=lambda: {"Messages": [{"Status": "success"}]})
+
+
+class FakeServices:
+    """All fakes with their endpoints, built from one latency/error profile."""
+
+    def __init__(self, corpus: SyntheticCorpus, latency_scale: float = 1.0, error_rate: float = 0.0,
+                 dimensions: int = 1536, seed: int = 0, cache_min_tokens: int = 1024):
+        self.corpus = corpus
+        self.endpoints = {
+            name: FakeEndpoint(name, latency=latency * latency_scale, error_rate=error_rate,
+                               concurrency=DEFAULT_CONCURRENCY[name], seed=seed + i)
+            for i, (name, latency) in enumerate(DEFAULT_LATENCIES.items())
+        }
+        self.openai = FakeOpenAI(self.endpoints["embeddings"], self.endpoints["chat"], dimensions, cache_min_tokens)
+        self.supabase = FakeSupabase(self.endpoints["supabase"], self.endpoints["supabase_rpc"])
+
+    def configure(self, latency_scale: float = None, error_rate: float = None) -> None:
+        """Change the latency scale or error rate of every endpoint, e.g. after an unmeasured setup."""
+        for name, endpoint in self.endpoints.items():
+            if latency_scale is not None:
+                endpoint.latency = DEFAULT_LATENCIES[name] * latency_scale
+            if error_rate is not None:
+                endpoint.error_rate = error_rate
+
+    def reset_stats(self) -> None:
+        for endpoint in self.endpoints.values():
+            endpoint.reset()
+        self.openai.prompt_tokens = 0
+        self.openai.cached_tokens = 0
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: endpoint.stats() for name, endpoint in self.endpoints.items() if endpoint.stats()["calls"]}
+
+    def seed_history(self) -> None:
+        """Store the corpus history the way doc_upload would, embeddings included."""
+        from src.llm.hangarFireAnayser import HangarFireAnalyzer
+
+        rows = []
+        for article in self.corpus.history:
+            row = dict(article, url=[article["url"]], collectedAt="doc")
+            row["embedding"] = self.openai.embed(HangarFireAnalyzer.embedding_text(article))
+            rows.append(row)
+        self.supabase.seed(rows)
+
+    def install(self) -> None:
+        """Patch the fakes into every module that holds a client. Call before importing main."""
+        import src.db
+        import src.db.url_index
+        import src.db.vector_index
+        import src.db.write_buffer
+        import src.email_sender
+        import src.llm
+        import src.llm.hangarFireAnayser
+        import src.llm.language
+        import src.scrapers.scrape_serpapi
+
+        for module in (src.db, src.db.url_index, src.db.vector_index, src.db.write_buffer):
+            module.supabase = self.supabase
+        src.llm.client = self.openai
+        src.llm.hangarFireAnayser.openai = types.SimpleNamespace(OpenAI=lambda **kwargs: self.openai)
+
+        FakeGoogleSearch.endpoint = self.endpoints["serpapi"]
+        FakeGoogleSearch.corpus = self.corpus
+        src.scrapers.scrape_serpapi.GoogleSearch = FakeGoogleSearch
+
+        FakeTranslator.endpoint = self.endpoints["translate"]
+        src.llm.language.Translator = FakeTranslator
+
+        FakeMailjet.endpoint = self.endpoints["mailjet"]
+        src.email_sender.Client = FakeMailjet
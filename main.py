@@ -1,11 +1,12 @@
+import atexit
 import os
 import dotenv
 import datetime
 import json
 import sys
 from src.logging.colorlog_config import get_color_logger
-from src.parser.doc import doc_parse
-from src.scrapers.scrape_newsapi import get_articles_from_newsapi
+from src.parser.doc import parse_archives, read_jsonl, write_jsonl
+from src.scrapers.scrape_newsapi import NewsApiScraper
 from src.scrapers.scrape_serpapi import SerpScraper
 from src.db import doc_upload, clean_database, get_articles, get_similar_articles
 from src.db.upload import article_upload
@@ -13,6 +14,9 @@ from src.excel.article_excel_exporter import ArticleExcelExporter
 from src.email_sender import EmailSender
 from src.scheduler import ScrapingScheduler
 from src.config import Config
+from src.journal import DONE_STATUSES, RunJournal
+from src.scrapers.watermarks import ScrapeWatermarks
+from src.metrics import metrics
 
 logger = get_color_logger()
 
@@ -20,25 +24,91 @@ email_sender = EmailSender()
 scheduler = ScrapingScheduler()
 config = Config()
 
-def weekly_process():
-    query_list = config.query_list
-    scraper = SerpScraper()
-    articles = scraper.scrape(query_list=query_list, weekly=True)
-    
-    new_articles = article_upload(articles, is_backfill=False)
-    logger.info(f"Uploaded {len(new_articles)} new articles to Supabase.")
+SERPAPI_WATERMARKS_FILE = "temp/serpapi_watermarks.json"
 
-    if len(new_articles) > 0:
-        exporter = ArticleExcelExporter()
-        exporter.export_articles_to_excel()
+def weekly_process(resume: bool = False):
+    journal = RunJournal.latest_unfinished("weekly") if resume else None
+    if journal is None:
+        if resume:
+            logger.warning("No unfinished weekly run to resume, starting a new one.")
+        journal = RunJournal.start("weekly")
+    else:
+        logger.info(f"Resuming weekly run {journal.run_id}.")
 
-    email_success = email_sender.send_report_email(
-        filepath=config.REPORT_FILE_PATH, article_count=len(new_articles)
-    )
-    if email_success:
-        logger.info("Weekly report email sent successfully.")
+    if journal.stage_done("scrape"):
+        articles = journal.stage_payload("scrape")
+        logger.info(f"Reusing {len(articles)} scraped articles from the journal.")
+    else:
+        with metrics.timer("stage_seconds", stage="scrape"):
+            query_list = config.query_list
+            scraper = SerpScraper()
+            articles = scraper.scrape(query_list=query_list, weekly=True)
+            if config.NEWSAPI_KEY:
+                # Second source; articles both sources found are deduplicated by URL on upload
+                articles += NewsApiScraper().scrape(query_list=query_list, weekly=True)
+        # The watermarks are saved after the upload, so a failed run scrapes the same results again
+        journal.complete_stage("scrape_watermarks", scraper.pending_watermarks())
+        journal.complete_stage("scrape", articles)
+
+    if journal.stage_done("upload"):
+        new_article_count = journal.stage_payload("upload")["new_articles"]
     else:
-        logger.error("Failed to send weekly report email.")
+        with metrics.timer("stage_seconds", stage="upload"):
+            article_upload(articles, is_backfill=False, journal=journal)
+        # Count inserts from earlier attempts of this run too
+        new_article_count = sum(
+            1 for entry in journal.article_statuses().values()
+            if entry["status"] == "written" and (entry["data"] or {}).get("op") == "insert"
+        )
+        journal.complete_stage("upload", {"new_articles": new_article_count})
+    logger.info(f"Uploaded {new_article_count} new articles to Supabase.")
+
+    if not journal.stage_done("watermarks"):
+        # Articles the upload did not finish failed; their searches are scraped again next time
+        failed_urls = [key for key, entry in journal.article_statuses().items()
+                       if entry["status"] not in DONE_STATUSES and not key.startswith("title:")]
+        ScrapeWatermarks().commit(journal.stage_payload("scrape_watermarks") or [], failed_urls)
+        journal.complete_stage("watermarks")
+
+    if not journal.stage_done("export"):
+        if new_article_count > 0:
+            with metrics.timer("stage_seconds", stage="export"):
+                exporter = ArticleExcelExporter()
+                exporter.export_articles_to_excel()
+        journal.complete_stage("export")
+
+    if not journal.stage_done("email"):
+        with metrics.timer("stage_seconds", stage="email"):
+            email_success = email_sender.send_report_email(
+                filepath=config.REPORT_FILE_PATH, article_count=new_article_count
+            )
+        if not email_success:
+            # Leave the run unfinished so `resume` retries only the email
+            logger.error("Failed to send weekly report email.")
+            return
+        logger.info("Weekly report email sent successfully.")
+        journal.complete_stage("email")
+    journal.finish()
+
+def commit_scrape_watermarks():
+    """Save the watermarks of the last `scrape_serpapi` run, now that its articles are uploaded."""
+    if os.path.exists(SERPAPI_WATERMARKS_FILE):
+        with open(SERPAPI_WATERMARKS_FILE, "r", encoding="utf-8") as f:
+            ScrapeWatermarks().commit(json.load(f))
+        os.remove(SERPAPI_WATERMARKS_FILE)
+
+def write_run_report(run_name: str):
+    """Write the metrics collected since the last report and start counting afresh."""
+    path = metrics.write_report(run_name)
+    logger.info(f"Run report for '{run_name}' written to {path} "
+                f"(estimated cost ${metrics.total('cost_usd_total'):.2f}).")
+    metrics.reset()
+
+def scheduled_weekly_process():
+    try:
+        weekly_process()
+    finally:
+        write_run_report("weekly")
 
 def email_sender_test():
     filepath = config.REPORT_FILE_PATH
@@ -57,12 +127,15 @@ if __name__ == "__main__":
        
     query_list = config.query_list
     option = sys.argv[1].lower()
+    # Every option ends with a run report, even when it fails
+    if option not in ("schedule", "9"):
+        atexit.register(write_run_report, option)
     
     if option == "scrape_newsapi" or option == "0":
-        query = '(aircraft hangar fire) OR (MRO facility fire) OR (aviation hangar fire) OR (aircraft maintenance hangar fire)'
         today = datetime.datetime.utcnow()
         from_date = (today - datetime.timedelta(days=20)).strftime('%Y-%m-%d')
-        articles = get_articles_from_newsapi(query, from_date)
+        # Same queries, languages and record shape as the NewsAPI source of the weekly run
+        articles = NewsApiScraper().scrape(query_list=query_list, from_date=from_date)
         with open("temp/newsapi_articles.json", "w", encoding="utf-8") as f:
             json.dump(articles, f, ensure_ascii=False, indent=2)
         
@@ -72,28 +145,34 @@ if __name__ == "__main__":
     elif option == "weekly":
         weekly_process()
 
+    elif option == "resume":
+        weekly_process(resume=True)
+
     elif option == "scrape_serpapi" or option == "1":
-        scraper = SerpScraper()
-        articles = scraper.scrape(query_list=query_list)
+        # `--replay` re-runs the scrape from cached SerpAPI responses without using quota
+        scraper = SerpScraper(replay="--replay" in sys.argv)
+        articles = scraper.scrape(query_list=query_list, weekly="--weekly" in sys.argv)
         with open("temp/serpapi_articles.json", "w", encoding="utf-8") as f:
             json.dump(articles, f, ensure_ascii=False, indent=2)
+        # Saved by `backfill` once these articles are uploaded
+        with open(SERPAPI_WATERMARKS_FILE, "w", encoding="utf-8") as f:
+            json.dump(scraper.pending_watermarks(), f, ensure_ascii=False)
         print(f"Scraped {len(articles)} articles and saved to serpapi_articles.json.")
     
     elif option == "doc_parse" or option == "2":
-        file_path = "data/history.docx"  # Replace with your document path
-        articles = doc_parse(file_path)
-        with open("temp/doc_articles.json", "w", encoding="utf-8") as f:
-            json.dump(articles, f, ensure_ascii=False, indent=2)
-        print(f"Parsed {len(articles)} articles and saved to doc_articles.json.")
+        # A DOCX file or a directory of DOCX archives; articles are written as they are parsed
+        file_path = sys.argv[2] if len(sys.argv) > 2 else "data/history.docx"
+        article_count = write_jsonl(parse_archives(file_path), "temp/doc_articles.jsonl")
+        print(f"Parsed {article_count} articles and saved to doc_articles.jsonl.")
         
     elif option == "doc_upload" or option == "3":
         clean_database("articles")
-        file_path = "temp/doc_articles.json"
+        file_path = "temp/doc_articles.jsonl"
         doc_upload(file_path)
 
     elif option == "test_similarity" or option == "4":
         query = "aircraft hangar fire"
-        similar_articles = get_similar_articles(query, limit=2)
+        similar_articles, _ = get_similar_articles(query, limit=2)
         print(f"Found {len(similar_articles)} similar articles for query '{query}':")
         for article in similar_articles:
             print(f"- {article['title']} (Similarity: {article['similarity']})")
@@ -116,7 +195,16 @@ if __name__ == "__main__":
         file_path = "temp/serpapi_articles.json"
         with open(file_path, "r", encoding="utf-8") as f:
             articles = json.load(f)
-        new_articles = article_upload(articles, is_backfill=True)
+        if "--batch" in sys.argv:
+            from src.db.batch_backfill import BatchBackfill
+
+            # Resumes an unfinished batch backfill; `--no-wait` submits or polls once and exits
+            new_articles = BatchBackfill.resume_or_start(wait="--no-wait" not in sys.argv).run(articles)
+            if new_articles is None:
+                sys.exit(0)
+        else:
+            new_articles = article_upload(articles, is_backfill=True)
+        commit_scrape_watermarks()
         with open("temp/backfill_articles.json", "w", encoding="utf-8") as f:
             json.dump(new_articles, f, ensure_ascii=False, indent=2)
         print(f"Uploaded {len(new_articles)} new articles to Supabase.")
@@ -129,8 +217,79 @@ if __name__ == "__main__":
         email_sender_test()
     
     elif option == "schedule" or option == "9":
-        scheduler.schedule_weekly_run(weekly_process)
+        scheduler.schedule_weekly_run(scheduled_weekly_process)
         scheduler.run_scheduler()
     
+    elif option == "relevance_eval" or option == "10":
+        from src.llm.relevance import RelevanceScorer
+
+        # Labelled history from doc_parse: every entry is a confirmed incident
+        positives = list(read_jsonl("temp/doc_articles.jsonl"))
+        negatives = []
+        if len(sys.argv) > 2:
+            with open(sys.argv[2], "r", encoding="utf-8") as f:
+                negatives = json.load(f)
+
+        # Foam and AFFF discharges (three of the configured queries) often name no aviation facility
+        system_positives = [article for article in positives if RelevanceScorer.mentions_suppression_system(article)]
+        for threshold in (0.3, 0.4, 0.7, 0.8, 1.0):
+            report = RelevanceScorer(threshold=threshold).evaluate(positives, negatives)
+            system_report = RelevanceScorer(threshold=threshold).evaluate(system_positives)
+            print(f"threshold={threshold}: recall={report['recall']}, "
+                  f"negative rejection rate={report['negative_rejection_rate']}, missed={len(report['missed'])}; "
+                  f"suppression-system recall={system_report['recall']} of {len(system_positives)}")
+        report = RelevanceScorer().evaluate(positives, negatives)
+        with open("temp/relevance_eval.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Saved evaluation at configured threshold {report['threshold']} to relevance_eval.json.")
+
+    elif option == "prompt_eval" or option == "11":
+        from src.llm.hangarFireAnayser import HangarFireAnalyzer
+        from src.llm.prompt_builder import evaluate_prompt_budget
+
+        # Labelled cases: [{"article": {...}, "existing": [...], "expected": {"is_valid", "duplicate_index"}}]
+        file_path = sys.argv[2] if len(sys.argv) > 2 else "temp/prompt_eval.json"
+        with open(file_path, "r", encoding="utf-8") as f:
+            cases = json.load(f)
+
+        def classifier(analyzer):
+            def classify(existing, article):
+                _, prompt_stats = analyzer.build_analysis_messages(existing, article)
+                return analyzer.classify(existing, article), prompt_stats
+            return classify
+
+        report = evaluate_prompt_budget(cases, classifier(HangarFireAnalyzer(prompt_token_budget=None, use_cache=False)),
+                                        classifier(HangarFireAnalyzer(use_cache=False)))
+        with open("temp/prompt_eval_report.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Budget {config.ANALYSIS_PROMPT_TOKEN_BUDGET}: agreement={report['agreement']}, "
+              f"accuracy full={report['accuracy_full']} budgeted={report['accuracy_budgeted']}, "
+              f"tokens saved per call={report['tokens_saved_per_call']}. Saved to prompt_eval_report.json.")
+
+    elif option == "cascade_eval" or option == "12":
+        from src.llm.hangarFireAnayser import evaluate_cascade
+
+        # Same labelled cases as prompt_eval
+        file_path = sys.argv[2] if len(sys.argv) > 2 else "temp/prompt_eval.json"
+        with open(file_path, "r", encoding="utf-8") as f:
+            cases = json.load(f)
+
+        report = evaluate_cascade(cases)
+        with open("temp/cascade_eval_report.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        for mode in ("full", "cascade"):
+            print(f"{mode}: {report[mode]['seconds']}s, ${report[mode]['cost_usd']}, "
+                  f"accuracy={report[mode]['accuracy']}, valid articles missed={report[mode]['missed_valid']}")
+        print(f"Agreement {report['agreement']} with screen threshold {config.ANALYSIS_SCREEN_REJECT_BELOW}. "
+              f"Saved to cascade_eval_report.json.")
+
+    elif option == "llm_cache_clear" or option == "13":
+        from src.llm.hangarFireAnayser import HangarFireAnalyzer
+
+        analyzer = HangarFireAnalyzer(use_cache=True)
+        entries = analyzer.response_cache.stats()["entries"] - 1  # minus the template fingerprint
+        analyzer.response_cache.clear()
+        print(f"Cleared {entries} cached LLM replies.")
+
     else:
         print(f"Unknown option: {option}")
@@ -0,0 +1,18 @@
+-- Track when each article row last changed, so readers can fetch only rows
+-- inserted or updated since a watermark (see src.db.iter_articles).
+
+alter table articles add column if not exists "updatedAt" timestamptz not null default now();
+
+create index if not exists articles_updated_at_idx on articles ("updatedAt");
+
+create or replace function set_articles_updated_at() returns trigger as $$
+begin
+    new."updatedAt" = now();
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists articles_set_updated_at on articles;
+create trigger articles_set_updated_at
+    before update on articles
+    for each row execute function set_articles_updated_at();
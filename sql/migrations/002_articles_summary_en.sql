@@ -0,0 +1,6 @@
+-- English summary of each article, stored at ingest so the Excel export does not
+-- have to translate it again (see ArticleExcelExporter).
+
+alter table articles add column if not exists summary_en text;
+alter table articles add column if not exists summary_source text;
+alter table articles add column if not exists summary_version integer;
@@ -0,0 +1,14 @@
+-- Updates that only fill in the English summary columns keep "updatedAt", so the
+-- incremental export (which writes those summaries) does not fetch the rows again.
+
+create or replace function set_articles_updated_at() returns trigger as $$
+begin
+    if (to_jsonb(new) - 'summary_en' - 'summary_source' - 'summary_version' - 'updatedAt')
+       = (to_jsonb(old) - 'summary_en' - 'summary_source' - 'summary_version' - 'updatedAt') then
+        new."updatedAt" = old."updatedAt";
+    else
+        new."updatedAt" = now();
+    end if;
+    return new;
+end;
+$$ language plpgsql;
@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+Value = Union[str, bytes]
+
+
+class SqliteCache:
+    """
+    Small persistent key/value cache backed by a single SQLite table.
+
+    Entries are evicted least-recently-used first once the table grows past
+    `max_entries`, and optionally expire `ttl` seconds after they were written.
+    Hit and miss counters are kept per instance. Safe to share between threads.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int = 100000, ttl: Optional[float] = None):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Value]:
+        """
+        Return the cached value for key, or None on a miss or expired entry.
+        max_age, in seconds, overrides the cache's ttl for this lookup.
+        """
+        now = time.time()
+        ttl = self.ttl if max_age is None else max_age
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (ttl is not None and now - row[1] > ttl):
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: Value) -> None:
+        """Store value under key, evicting the least recently used entries if the cache is full."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            size = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            if size > self.max_entries:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                    (size - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
@@ -10,12 +10,129 @@ class Config:
 
     # NewsAPI Configuration
     NEWSAPI_KEY = os.getenv('NEWSAPI_KEY')
+    NEWSAPI_MAX_WORKERS = 4
+    NEWSAPI_MAX_PAGES = 5  # 100 results per page; the developer plan stops at 100 results in total
+    NEWSAPI_MAX_QUERY_LENGTH = 500
+    NEWSAPI_RETRIES = 4  # retries with exponential backoff on 429 and 5xx responses
+    NEWSAPI_BACKFILL_DAYS = 29  # the developer plan only searches the last month
     
     # OpenAI API Key
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     
     # Report File Path
     REPORT_FILE_PATH = 'reports/hangar_fire_report.xlsx'
+    # Report rows keyed by article id; the xlsx report is rendered from this file
+    REPORT_HISTORY_PATH = 'reports/hangar_fire_history.parquet'
+
+    # SerpAPI concurrency: total worker threads and per-engine in-flight limits
+    SERPAPI_MAX_WORKERS = 8
+    SERPAPI_ENGINE_CONCURRENCY = {
+        'bing_news': 4,
+        'google_news': 4
+    }
+    # Raw SerpAPI responses, reused within a TTL per mode and replayable offline
+    SERPAPI_CACHE_ENABLED = True
+    SERPAPI_CACHE_PATH = 'cache/serpapi.sqlite3'
+    SERPAPI_CACHE_MAX_ENTRIES = 20000
+    SERPAPI_CACHE_TTL_WEEKLY = 12 * 3600
+    SERPAPI_CACHE_TTL_BACKFILL = 30 * 24 * 3600
+    # Incremental scraping: per-search watermarks of the newest date and URLs already seen.
+    # Results up to SERPAPI_WATERMARK_OVERLAP_DAYS older than the watermark are still checked by URL.
+    SERPAPI_INCREMENTAL = True
+    SERPAPI_WATERMARK_PATH = 'cache/serpapi_watermarks.sqlite3'
+    SERPAPI_WATERMARK_MAX_URLS = 200
+    SERPAPI_WATERMARK_OVERLAP_DAYS = 1
+
+    # Translation cache
+    TRANSLATION_CACHE_PATH = 'cache/translations.sqlite3'
+    TRANSLATION_CACHE_MAX_ENTRIES = 100000
+    # Pause after each uncached translation, to stay under Google Translate's rate limit
+    TRANSLATION_MIN_INTERVAL = 1.0
+
+    # Embeddings: request packing limits and on-disk cache
+    EMBEDDING_BATCH_SIZE = 512
+    EMBEDDING_MAX_BATCH_TOKENS = 250000
+    EMBEDDING_CACHE_PATH = 'cache/embeddings.sqlite3'
+    EMBEDDING_CACHE_MAX_ENTRIES = 200000
+
+    # Article upload pipeline: embedding batch size, workers per stage and queue bounds
+    UPLOAD_EMBED_BATCH_SIZE = 64
+    UPLOAD_RETRIEVE_WORKERS = 4
+    UPLOAD_CLASSIFY_WORKERS = 8
+    UPLOAD_QUEUE_SIZE = 32
+    # In-run inserts less similar than this never trigger a duplicate re-check
+    UPLOAD_RECHECK_MIN_SIMILARITY = 0.5
+    # Articles classified together in one LLM request (1 disables batching), and the
+    # longest a classify worker waits for more queued articles to fill a batch
+    ANALYSIS_BATCH_SIZE = 8
+    ANALYSIS_BATCH_WAIT = 0.5
+
+    # Local relevance pre-filter applied before the LLM classification. Off until
+    # `main.py relevance_eval` shows full recall on the history, including its
+    # foam and suppression-system incidents, at RELEVANCE_THRESHOLD
+    RELEVANCE_FILTER_ENABLED = False
+    RELEVANCE_THRESHOLD = 0.7
+    RELEVANCE_AUDIT_LOG = 'logs/relevance_rejections.jsonl'
+
+    # Similarity lookups: 'local' (in-memory NumPy index) or 'rpc' (match_articles)
+    VECTOR_INDEX_BACKEND = 'local'
+
+    # Batched Supabase writes: rows per request and maximum seconds a write waits
+    WRITE_BATCH_SIZE = 100
+    WRITE_FLUSH_INTERVAL = 5.0
+
+    # English summaries stored with each article; bump the version to re-translate
+    SUMMARY_VERSION = 1
+    TRANSLATION_WORKERS = 4
+
+    # Run reports: counters, latency histograms, token usage and estimated cost per CLI run.
+    # METRICS_FORMAT is 'json' or 'prometheus' (a textfile for node_exporter's textfile collector).
+    METRICS_REPORT_DIR = 'reports/metrics'
+    METRICS_FORMAT = 'json'
+    # USD per 1M tokens, and per SerpAPI search
+    MODEL_PRICES = {
+        'gpt-4o': {'input': 2.50, 'cached_input': 1.25, 'output': 10.00},
+        'gpt-4o-mini': {'input': 0.15, 'cached_input': 0.075, 'output': 0.60},
+        'text-embedding-3-small': {'input': 0.02},
+    }
+    SERPAPI_COST_PER_SEARCH = 0.015
+
+    # Analysis models. With the cascade on, ANALYSIS_SCREEN_MODEL first rates each article's validity
+    # from its title and description; articles rated below ANALYSIS_SCREEN_REJECT_BELOW are rejected
+    # without the full ANALYSIS_MODEL comparison. Check `python main.py cascade_eval` before enabling.
+    ANALYSIS_MODEL = 'gpt-4o'
+    ANALYSIS_CASCADE_ENABLED = False
+    ANALYSIS_SCREEN_MODEL = 'gpt-4o-mini'
+    ANALYSIS_SCREEN_REJECT_BELOW = 0.2
+
+    # Cache of LLM replies keyed on (model, temperature, normalized prompt), so re-running a backfill
+    # or a failed weekly run does not pay twice for the same question. Bump ANALYSIS_PROMPT_VERSION
+    # to drop every cached reply after a change the prompt text does not show (edits to it already do).
+    LLM_CACHE_ENABLED = True
+    LLM_CACHE_PATH = 'cache/llm_responses.sqlite3'
+    LLM_CACHE_MAX_ENTRIES = 200000
+    LLM_CACHE_TTL = 90 * 24 * 3600
+    ANALYSIS_PROMPT_VERSION = 1
+
+    # Token budget of one analysis prompt (counted locally with tiktoken); None disables trimming.
+    # Over budget, the descriptions and contents of the articles are cut to their most relevant sentences.
+    ANALYSIS_PROMPT_TOKEN_BUDGET = 2500
+    ANALYSIS_PROMPT_MAX_LINKS = 3
+
+    # Batch backfill (`backfill --batch`): embeddings and analyses run as asynchronous batch jobs.
+    # BATCH_ENDPOINT is 'openai', 'local' (runs jobs through the synchronous client, for testing)
+    # or 'package.module:ClassName' of a src.llm.batch.BatchEndpoint subclass.
+    BATCH_ENDPOINT = 'openai'
+    BATCH_WORK_DIR = 'cache/batches'
+    BATCH_POLL_INTERVAL = 60
+    BATCH_MAX_REQUESTS = 50000
+    BATCH_PRICE_FACTOR = 0.5
+
+    # History archive parsing (`doc_parse`): DOCX files of a directory are parsed in this many processes
+    DOC_PARSE_WORKERS = 4
+
+    # Journal of pipeline runs, used to resume a weekly run after a crash
+    RUN_JOURNAL_PATH = 'cache/run_journal.sqlite3'
 
     SCHEDULE_TIME = '08:00'
     SCHEDULE_DAY = 'tuesday'
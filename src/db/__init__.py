@@ -1,9 +1,14 @@
 import os
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, Iterator, List, Dict, Any, Tuple
 from supabase import create_client
 import json
-from src.llm import get_embedding
+from src.config import Config
+from src.llm import get_embedding, get_embeddings
 from src.logging.colorlog_config import get_color_logger
+from src.metrics import metrics
+
+if TYPE_CHECKING:
+    from src.db.vector_index import LocalVectorIndex
 
 # Use the color logger from the logging utility
 logger = get_color_logger()
@@ -30,17 +35,23 @@ def clean_database(db_name: str) -> None:
 
 def doc_upload(file_path: str) -> List[Dict[str, Any]]:
     """
-    Reads a JSON file containing a list of articles and uploads them to the 'articles' table in Supabase.
+    Reads a JSON file containing a list of articles (or a JSONL file from doc_parse, one
+    article per line) and uploads them to the 'articles' table in Supabase.
     Returns the list of inserted records.
     """
-    # Read JSON file
-    with open(file_path, 'r', encoding='utf-8') as f:
-        articles = json.load(f)
+    if file_path.endswith('.jsonl'):
+        from src.parser.doc import read_jsonl
+        articles = list(read_jsonl(file_path))
+    else:
+        # Read JSON file
+        with open(file_path, 'r', encoding='utf-8') as f:
+            articles = json.load(f)
         
     if not isinstance(articles, list):
         raise ValueError('JSON file must contain a list of articles.')
 
-    # Generate embeddings and add to each article
+    # Generate embeddings for all articles in as few requests as possible
+    combined_texts = []
     for article in articles:
         # Combine title and content (adjust fields as needed)
         combined_text = f"""Title: {article.get('title', '')}
@@ -50,55 +61,129 @@ Content: {article.get('content', "")}""".strip()
 
         if not combined_text:
             raise ValueError('Article missing title and content for embedding.')
+        combined_texts.append(combined_text)
 
-        article['embedding'] = get_embedding(combined_text)
+    embeddings = get_embeddings(combined_texts)
+    for article, embedding in zip(articles, embeddings):
+        article['embedding'] = embedding
         article["collectedAt"] = "doc"
 
         if isinstance(article.get('url'), str): article['url'] = [article.get('url')]
 
-    # Upload to Supabase
-    response = supabase.table('articles').insert(articles).execute()
-    # Use dict-style access for error/data only
-    if isinstance(response, dict):
-        if response.get('error'):
-            raise Exception(f"Supabase insert error: {response['error']}")
-        return response.get('data', [])
-    return [] 
+    # Upload to Supabase in chunks; a failing chunk is retried row by row
+    from src.db.write_buffer import ArticleWriteBuffer
+    writer = ArticleWriteBuffer()
+    for i, article in enumerate(articles):
+        writer.insert(article, tag=i)
+    writer.close()
+    return [article for article in articles if article.get('id') is not None]
 
 
-def get_similar_articles(query: str, limit: int = 5) -> List[Dict[str, Any]]:
+def get_similar_articles(query: str, limit: int = 5, query_embedding: List[float] = None,
+                         index: "LocalVectorIndex" = None) -> Tuple[List[Dict[str, Any]], List[float]]:
     """
     Retrieves similar articles based on the query using the 'articles' table in Supabase.
     
     Args:
         query (str): The search query to find similar articles.
         limit (int): The maximum number of articles to return.
+        query_embedding (List[float], optional): Precomputed embedding of the query.
+        index (LocalVectorIndex, optional): Local index to search instead of the match_articles RPC.
     
     Returns:
-        List[Dict[str, Any]]: List of similar articles.
+        Tuple[List[Dict[str, Any]], List[float]]: Similar articles and the query embedding.
     """
     # Get embedding for the query
-    query_embedding = get_embedding(query)
+    if query_embedding is None:
+        query_embedding = get_embedding(query)
+
+    if index is not None:
+        return index.search([query_embedding], limit=limit)[0], query_embedding
     
     # Query the database for similar articles
-    response = supabase.rpc('match_articles', {'query_embedding': query_embedding, 'match_count': limit}).execute()
-    if response.data:
-        return response.data, query_embedding
-    elif response.error:
-        raise Exception(f"Supabase query error: {response.error}")
-    return []
+    with metrics.timer("supabase_request_seconds", op="rpc_match_articles"):
+        response = supabase.rpc('match_articles', {'query_embedding': query_embedding, 'match_count': limit}).execute()
+    return response.data or [], query_embedding
+
+
+def iter_articles(columns: List[str] = None, updated_since: str = None, include_doc: bool = False,
+                  page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Streams articles from the 'articles' table in Supabase, one page at a time.
+
+    Pages are fetched by id (keyset pagination), so the table size is never
+    limited by the server's row cap and later pages stay cheap.
+
+    Args:
+        columns (List[str], optional): Columns to fetch. Defaults to all columns.
+        updated_since (str, optional): Only return rows whose "updatedAt" is at or after this ISO timestamp.
+        include_doc (bool): Whether to include rows imported from the history document.
+        page_size (int): Number of rows per request.
+
+    Yields:
+        Dict[str, Any]: One article row at a time.
+    """
+    selected = '*'
+    if columns:
+        # The id is always needed to fetch the next page
+        selected = ','.join(['id'] + [column for column in columns if column != 'id'])
+    last_id = None
+    while True:
+        query = supabase.table('articles').select(selected)
+        if not include_doc:
+            query = query.neq('collectedAt', 'doc')
+        if updated_since:
+            query = query.gte('updatedAt', updated_since)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        with metrics.timer("supabase_request_seconds", op="select"):
+            rows = query.order('id').limit(page_size).execute().data
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]['id']
+
+
+def get_articles(columns: List[str] = None, updated_since: str = None) -> List[Dict[str, Any]]:
+    """
+    Retrieves non-doc articles from the 'articles' table in Supabase.
 
+    Args:
+        columns (List[str], optional): Columns to fetch. Defaults to all columns.
+        updated_since (str, optional): Only return rows updated at or after this ISO timestamp.
 
-def get_articles() -> List[Dict[str, Any]]:
+    Returns:
+        List[Dict[str, Any]]: List of articles.
     """
-    Retrieves articles from the 'articles' table in Supabase for a specific week.
+    return list(iter_articles(columns=columns, updated_since=updated_since))
+
+
+def store_summaries(summaries: List[Dict[str, Any]], batch_size: int = None) -> int:
+    """
+    Saves English summaries of stored articles, writing only the summary columns.
+
+    Args:
+        summaries (List[Dict[str, Any]]): Dicts of {"id", "summary_en", "summary_source", "summary_version"}.
+        batch_size (int, optional): Rows per upsert. Defaults to Config.WRITE_BATCH_SIZE.
 
     Returns:
-        List[Dict[str, Any]]: List of articles for the specified week.
+        int: Number of rows that could not be saved.
     """
-    response = supabase.table('articles').select('*').neq('collectedAt', 'doc').execute()
-    if response.data:
-        return response.data
-    elif response.error:
-        raise Exception(f"Supabase query error: {response.error}")
-    return []
\ No newline at end of file
+    batch_size = batch_size or Config.WRITE_BATCH_SIZE
+    failed = 0
+    for start in range(0, len(summaries), batch_size):
+        chunk = summaries[start:start + batch_size]
+        try:
+            with metrics.timer("supabase_request_seconds", op="upsert"):
+                supabase.table('articles').upsert(chunk).execute()
+            continue
+        except Exception as e:
+            logger.warning(f"Batch summary update of {len(chunk)} rows failed, retrying one by one: {str(e)}")
+        for row in chunk:
+            try:
+                with metrics.timer("supabase_request_seconds", op="update"):
+                    supabase.table('articles').update({k: v for k, v in row.items() if k != 'id'}).eq('id', row['id']).execute()
+            except Exception as e:
+                logger.error(f"Failed to store the summary of article {row['id']}: {str(e)}")
+                failed += 1
+    return failed
@@ -0,0 +1,216 @@
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import Config
+from src.db import get_similar_articles
+from src.db.url_index import KnownUrlIndex
+from src.db.upload import NEIGHBOUR_COUNT, ArticleUploadPipeline, article_key
+from src.db.vector_index import LocalVectorIndex
+from src.journal import RunJournal
+from src.llm import EMBEDDING_MODEL, cache_embeddings, get_embeddings, uncached_embedding_texts
+from src.llm.batch import TERMINAL_STATUSES, BatchEndpoint, get_batch_endpoint
+from src.llm.hangarFireAnayser import HangarFireAnalyzer
+from src.logging.colorlog_config import get_color_logger
+from src.metrics import metrics
+
+logger = get_color_logger()
+
+JOB_URLS = {"embeddings": "/v1/embeddings", "analyses": "/v1/chat/completions"}
+
+
+class BatchBackfill:
+    """
+    Backfill whose paid calls run as asynchronous batch jobs.
+
+    Stages, recorded in a 'backfill_batch' RunJournal:
+      * input: the articles that still need work (not stored, relevant)
+      * embeddings: one job embedding every text not in the embedding cache
+      * analyses: one job with the single-article analysis of every article
+        against its current nearest neighbours, skipping replies already cached;
+        the neighbours are journaled ('analysis_neighbours') before submitting
+      * upload: the normal ArticleUploadPipeline, classifying against the journaled
+        neighbours, so it finds the embeddings and analyses in the caches however
+        long the jobs took; it only calls the API for what the jobs missed (failed
+        requests, and re-checks against articles inserted in the run), and the
+        number of analyses that missed the cache is logged and journaled
+
+    Job results are written into the embedding and LLM response caches, so the
+    upload applies them through exactly the same logic as a synchronous run.
+    Jobs over Config.BATCH_MAX_REQUESTS requests are split into several batches.
+    Without `wait`, a run submits or polls once and returns None; running it
+    again resumes the journaled run.
+    """
+
+    def __init__(self, journal: RunJournal, endpoint: BatchEndpoint = None, wait: bool = True,
+                 poll_interval: float = None):
+        self.journal = journal
+        self.endpoint = endpoint or get_batch_endpoint()
+        self.wait = wait
+        self.poll_interval = Config.BATCH_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.analyzer = HangarFireAnalyzer(use_cache=True)
+        # Loaded once and shared by the analysis requests and the upload
+        self._vector_index: Optional[LocalVectorIndex] = None
+        self._known_urls: Optional[KnownUrlIndex] = None
+
+    @classmethod
+    def resume_or_start(cls, **kwargs) -> "BatchBackfill":
+        """Continue the latest unfinished batch backfill, or start a new one."""
+        journal = RunJournal.latest_unfinished("backfill_batch")
+        if journal is None:
+            journal = RunJournal.start("backfill_batch")
+        else:
+            logger.info(f"Resuming batch backfill {journal.run_id}.")
+        return cls(journal, **kwargs)
+
+    def run(self, articles: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Backfill the articles, or the journaled run's articles when resuming.
+        Returns the newly inserted records, or None while a job is still running.
+        """
+        if self.journal.stage_done("input"):
+            articles = self.journal.stage_payload("input")
+        else:
+            # Filtering only needs the known URLs; the upload reuses them
+            pipeline = ArticleUploadPipeline(is_backfill=True, journal=self.journal)
+            articles = pipeline.relevant_articles(articles)
+            self._known_urls = pipeline.known_urls
+            self.journal.complete_stage("input", articles)
+
+        stages: List[Tuple[str, Callable, Callable]] = [
+            ("embeddings", self._embedding_requests, self._apply_embeddings),
+            ("analyses", self._analysis_requests, self._apply_analyses),
+        ]
+        for stage, prepare, apply in stages:
+            if self.journal.stage_done(stage):
+                continue
+            jobs = self.journal.stage_payload(f"{stage}_submitted")
+            if jobs is None:
+                with metrics.timer("stage_seconds", stage=f"batch_{stage}_prepare"):
+                    jobs = self._submit(stage, prepare(articles))
+                self.journal.complete_stage(f"{stage}_submitted", jobs)
+            if not self._wait_for(stage, jobs):
+                return None
+            applied = failed = 0
+            for job in jobs:
+                job_applied, job_failed = self._apply_job(job, apply)
+                applied += job_applied
+                failed += job_failed
+            logger.info(f"Batch {stage}: applied {applied} results"
+                        + (f", {failed} requests failed and will run synchronously." if failed else "."))
+            self.journal.complete_stage(stage)
+
+        new_articles = []
+        if not self.journal.stage_done("upload"):
+            misses_before = metrics.total("llm_cache_total", outcome="miss", model=self.analyzer.MODEL)
+            with metrics.timer("stage_seconds", stage="upload"):
+                pipeline = ArticleUploadPipeline(is_backfill=True, journal=self.journal, retrieve_before_classify=True,
+                                                 neighbours=self.journal.stage_payload("analysis_neighbours"),
+                                                 vector_index=self._local_index(), known_urls=self._known_urls)
+                new_articles = pipeline.run(articles)
+            misses = int(metrics.total("llm_cache_total", outcome="miss", model=self.analyzer.MODEL) - misses_before)
+            if misses:
+                logger.warning(f"{misses} analyses missed the cache and ran synchronously (failed batch requests, "
+                               f"articles with close matches stored since the job was prepared, and re-checks "
+                               f"against articles inserted in this run).")
+            self.journal.complete_stage("upload", {"new_articles": len(new_articles), "cache_misses": misses})
+        self.journal.finish()
+        return new_articles
+
+    def _local_index(self) -> Optional[LocalVectorIndex]:
+        """The local vector index, loaded on first use; None with the 'rpc' backend."""
+        if self._vector_index is None and Config.VECTOR_INDEX_BACKEND == 'local':
+            self._vector_index = LocalVectorIndex.load()
+        return self._vector_index
+
+    def _embedding_requests(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        texts = [HangarFireAnalyzer.embedding_text(article) for article in articles]
+        return [{"model": EMBEDDING_MODEL, "input": batch} for batch in uncached_embedding_texts(texts)]
+
+    def _analysis_requests(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analysis requests against the neighbours the upload will see, before its own inserts."""
+        texts = [HangarFireAnalyzer.embedding_text(article) for article in articles]
+        # Cache hits after the embeddings job; anything it missed is embedded now
+        embeddings = get_embeddings(texts)
+        if Config.VECTOR_INDEX_BACKEND == 'local':
+            neighbours = self._local_index().search(embeddings, limit=NEIGHBOUR_COUNT)
+        else:
+            neighbours = [get_similar_articles(text, limit=NEIGHBOUR_COUNT, query_embedding=embedding)[0]
+                          for text, embedding in zip(texts, embeddings)]
+        # The upload classifies against these same neighbours, so its prompts match the job's
+        self.journal.complete_stage("analysis_neighbours", {
+            article_key(article): similar for article, similar in zip(articles, neighbours)
+        })
+        requests = [self.analyzer.analysis_request(similar, article) for similar, article in zip(neighbours, articles)]
+        return [request for request in requests if request is not None]
+
+    def _submit(self, stage: str, bodies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write the requests as JSONL files and submit each; returns [{"batch_id", "path"}]."""
+        jobs = []
+        os.makedirs(Config.BATCH_WORK_DIR, exist_ok=True)
+        for part, start in enumerate(range(0, len(bodies), Config.BATCH_MAX_REQUESTS)):
+            path = os.path.join(Config.BATCH_WORK_DIR, f"{self.journal.run_id}-{stage}-{part}.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                for i, body in enumerate(bodies[start:start + Config.BATCH_MAX_REQUESTS], start=start):
+                    f.write(json.dumps({"custom_id": f"{stage}-{i}", "method": "POST",
+                                        "url": JOB_URLS[stage], "body": body}, ensure_ascii=False) + "\n")
+            batch_id = self.endpoint.submit(path, JOB_URLS[stage])
+            metrics.inc("batch_jobs_total", stage=stage)
+            metrics.inc("batch_requests_total", min(Config.BATCH_MAX_REQUESTS, len(bodies) - start), stage=stage)
+            logger.info(f"Submitted batch {batch_id} with {stage} requests from {path}.")
+            jobs.append({"batch_id": batch_id, "path": path})
+        return jobs
+
+    def _wait_for(self, stage: str, jobs: List[Dict[str, Any]]) -> bool:
+        """Poll the jobs until all are finished; without `wait`, poll once. Returns whether all finished."""
+        while True:
+            statuses = {job["batch_id"]: self.endpoint.status(job["batch_id"]) for job in jobs}
+            if all(status in TERMINAL_STATUSES for status in statuses.values()):
+                for batch_id, status in statuses.items():
+                    if status != 'completed':
+                        logger.warning(f"Batch {batch_id} ended as '{status}'; its missing results will run synchronously.")
+                return True
+            running = sum(1 for status in statuses.values() if status not in TERMINAL_STATUSES)
+            if not self.wait:
+                logger.info(f"{running} {stage} batch(es) still running; run the batch backfill again to continue.")
+                return False
+            time.sleep(self.poll_interval)
+
+    def _apply_job(self, job: Dict[str, Any], apply: Callable) -> Tuple[int, int]:
+        with open(job["path"], "r", encoding="utf-8") as f:
+            requests = {request["custom_id"]: request["body"] for request in map(json.loads, f) if request}
+        applied = 0
+        for result in self.endpoint.results(job["batch_id"]):
+            request = requests.get(result.get("custom_id"))
+            response = result.get("response") or {}
+            if request is None or response.get("status_code") != 200:
+                continue
+            try:
+                apply(request, response["body"])
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.warning(f"Ignoring unusable batch result {result.get('custom_id')}: {str(e)}")
+                continue
+            applied += 1
+        return applied, len(requests) - applied
+
+    @staticmethod
+    def _record_usage(model: str, usage: Dict[str, Any]) -> None:
+        if not usage:
+            return
+        details = usage.get("prompt_tokens_details") or {}
+        metrics.record_tokens(model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0) or 0,
+                              details.get("cached_tokens", 0) or 0, price_factor=Config.BATCH_PRICE_FACTOR)
+
+    def _apply_embeddings(self, request: Dict[str, Any], body: Dict[str, Any]) -> None:
+        data = sorted(body["data"], key=lambda item: item["index"])
+        cache_embeddings([request["input"][item["index"]] for item in data], [item["embedding"] for item in data],
+                         model=request["model"])
+        self._record_usage(request["model"], body.get("usage"))
+
+    def _apply_analyses(self, request: Dict[str, Any], body: Dict[str, Any]) -> None:
+        reply = json.loads(body["choices"][0]["message"]["content"])
+        if not isinstance(reply, dict):
+            raise ValueError("analysis reply is not a JSON object")
+        self.analyzer.store_analysis_reply(request, reply)
+        self._record_usage(request["model"], body.get("usage"))
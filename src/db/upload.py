@@ -1,68 +1,672 @@
 import datetime
-import os
-from typing import Any, Dict, List
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
 
-from supabase import create_client
 from tqdm import tqdm
-from src.llm.language import translate_text
+from src.config import Config
+from src.db import get_similar_articles
+from src.db.url_index import KnownUrlIndex
+from src.db.vector_index import LocalVectorIndex
+from src.db.write_buffer import ArticleWriteBuffer
+from src.llm import get_embeddings
+from src.llm.language import to_english, translate_text
+from src.llm.relevance import RelevanceScorer
 from src.logging.colorlog_config import get_color_logger
 from src.llm.hangarFireAnayser import HangarFireAnalyzer
+from src.journal import DONE_STATUSES, RunJournal
+from src.metrics import metrics
+from src.scrapers.url_utils import canonicalize_url
 
 # Use the color logger from the logging utility
 logger = get_color_logger()
 
-# Supabase credentials from environment variables
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_KEY = os.getenv('SUPABASE_KEY')
+NEIGHBOUR_COUNT = 3
+# Paid calls made for every article that reaches the analyzer: embedding, match_articles RPC, gpt-4o
+PAID_CALLS_PER_ARTICLE = 3
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise EnvironmentError('Supabase credentials not set in environment variables.')
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+def _dot(a: List[float], b: List[float]) -> float:
+    # OpenAI embeddings are unit length, so the dot product is the cosine similarity
+    return sum(x * y for x, y in zip(a, b))
 
-def article_upload(articles: List[Dict[str, Any]], is_backfill: bool) -> List[Dict[str, Any]]:
+
+def article_key(article: Dict[str, Any]) -> str:
+    """Journal key of an article: its canonical URL, or its title if it has none."""
+    return canonicalize_url(article.get('url') or '') or f"title:{article.get('title')}"
+
+
+class _UploadItem:
+    """State of one article as it moves through the upload pipeline."""
+
+    def __init__(self, index: int, article: Dict[str, Any]):
+        self.index = index
+        self.article = article
+        self.key = article_key(article)
+        self.resumed = False  # analysis restored from the run journal
+        self.embedding: Optional[List[float]] = None
+        self.similar: List[Dict[str, Any]] = []
+        self.snapshot = 0  # number of in-run inserts visible when neighbours were retrieved
+        self.analysis: Dict[str, Any] = {}
+        self.description: Optional[str] = None
+        self.summary: Optional[tuple] = None  # (English summary, translation source)
+        self.error: Optional[Exception] = None
+        self.recheck = False  # sent back by the writer to be classified against this run's inserts
+
+
+class ArticleUploadPipeline:
     """
-    Uploads a list of articles to the database.
+    Staged, concurrent version of the article upload loop.
+
+    Articles whose canonical URL is already stored, and articles the local
+    relevance scorer rejects, are dropped up front, before any paid API call.
+    The rest flow embed -> retrieve -> classify -> write through bounded queues:
+      * embed: one thread, embeds articles in batches of `embed_batch_size`; with
+        the local vector index it also looks up each batch's neighbours in one call
+      * retrieve: `retrieve_workers` threads calling the match_articles RPC (only
+        used when Config.VECTOR_INDEX_BACKEND is 'rpc')
+      * classify: `classify_workers` threads calling the analyzer (and translating
+        descriptions and English summaries of valid articles); each worker takes up
+        to `analysis_batch_size` queued articles and classifies them in one request
+      * write: the calling thread, the only one that writes to Supabase, through
+        an ArticleWriteBuffer that batches inserts and duplicate merges
+
+    Because neighbours are retrieved before earlier in-flight articles are written,
+    an article classified as new is re-checked by the writer against every article
+    inserted in this run since its retrieval. If one of those would have been among
+    its nearest neighbours, the writer sends the article back to the classify
+    workers with that neighbour set before writing it, so two in-flight reports of
+    the same incident are merged without the writer waiting on the LLM.
+
+    A stage thread that dies of an unexpected error does not hang the run: the
+    writer stops once its queue is idle and journals the articles it never got
+    as 'failed'.
+
+    With `retrieve_before_classify`, every article's neighbours are retrieved
+    before any article moves on, so all of them are compared against the same
+    stored articles (as the batch backfill's analysis job was); the re-check
+    covers this run's inserts. `neighbours` maps article keys (see article_key)
+    to neighbour sets retrieved earlier, e.g. when the batch backfill prepared its
+    analysis job. Those articles are classified against the saved set, so their
+    prompts match the job's requests even if stored rows were edited since; only
+    rows stored since that would now be among the nearest neighbours are added.
+
+    With a RunJournal, every article's progress is recorded as it goes: analyses
+    as soon as they are made, 'written' once the write buffer has stored the row,
+    and 'failed' for articles that could not be embedded, looked up or analyzed.
+    Resuming with the same journal skips articles already written or rejected
+    and reuses recorded analyses instead of calling the LLM again.
     """
-    today = datetime.date.today()
-    week_string = today.strftime("%G-W%V") if not is_backfill else "backfill"
-    
-    new_articles = []
-    for article in tqdm(articles):
-        analysis_result, query_embedding = HangarFireAnalyzer().analyze_article(article)
-        if analysis_result.get("is_valid", False):
-            if analysis_result["duplicate_index"] > 0:
-                original_article = supabase.table('articles').select('*').eq('id', analysis_result["id"]).execute().data[0]
-                if article.get('url') not in original_article.get('url', []):
-                    original_article['url'].append(article.get('url', ''))
-                if analysis_result.get('airport_hangar_name') and not original_article.get('airport_hangar_name'):
-                    original_article['airport_hangar_name'] = analysis_result.get('airport_hangar_name')
-                if analysis_result.get('country_region') and not original_article.get('location'):
-                    original_article['location'] = analysis_result.get('country_region')
-                if article.get('description') and not original_article.get('description'):
-                    if article.get('language') == 'en':
-                        original_article['description'] = article.get('description', '')
-                    else:
-                        original_article['description'] = translate_text(article.get('description', ''), 'en', article.get('language', 'en'))
-                if article.get('content') and not original_article.get('content'):
-                    original_article['content'] = article.get('content', '')
-                supabase.table('articles').update(original_article).eq('id', analysis_result["id"]).execute()
+
+    def __init__(self, is_backfill: bool, embed_batch_size: int = None, retrieve_workers: int = None,
+                 classify_workers: int = None, queue_size: int = None, known_urls: KnownUrlIndex = None,
+                 relevance_scorer: RelevanceScorer = None, vector_index: LocalVectorIndex = None,
+                 journal: RunJournal = None, analysis_batch_size: int = None,
+                 retrieve_before_classify: bool = False, neighbours: Dict[str, List[Dict[str, Any]]] = None):
+        today = datetime.date.today()
+        self.week_string = today.strftime("%G-W%V") if not is_backfill else "backfill"
+        self.embed_batch_size = embed_batch_size or Config.UPLOAD_EMBED_BATCH_SIZE
+        self.retrieve_workers = retrieve_workers or Config.UPLOAD_RETRIEVE_WORKERS
+        self.classify_workers = classify_workers or Config.UPLOAD_CLASSIFY_WORKERS
+        self.queue_size = queue_size or Config.UPLOAD_QUEUE_SIZE
+        self.analysis_batch_size = analysis_batch_size or Config.ANALYSIS_BATCH_SIZE
+        self.retrieve_before_classify = retrieve_before_classify
+        self.neighbours = neighbours or {}
+        self.analyzer = HangarFireAnalyzer()
+        self.known_urls = known_urls
+        self.skipped_known = 0
+        if relevance_scorer is None and Config.RELEVANCE_FILTER_ENABLED:
+            relevance_scorer = RelevanceScorer()
+        self.relevance_scorer = relevance_scorer
+        self.skipped_irrelevant = 0
+        # Loaded by `run` when the local backend is on and none is given
+        self.vector_index = vector_index
+
+        self._retrieve_queue = queue.Queue(maxsize=self.queue_size)
+        self._classify_queue = queue.Queue(maxsize=self.queue_size)
+        self._write_queue = queue.Queue(maxsize=self.queue_size)
+        # Records inserted during this run, in insertion order, with their embeddings (None once an insert fails)
+        self._run_inserts: List[Dict[str, Any]] = []
+        self._run_inserts_lock = threading.Lock()
+        # Provisional id -> (record sent to the write buffer, run-local copy)
+        self._provisional: Dict[int, tuple] = {}
+        # Provisional id -> journal keys of the article inserted and of articles merged into it while pending
+        self._pending_keys: Dict[int, List[str]] = {}
+        # Provisional id -> error, for inserts that failed
+        self._failed_inserts: Dict[int, str] = {}
+        # Names of stage threads that died of an unexpected error
+        self._stage_failures: List[str] = []
+        self.writer = ArticleWriteBuffer(on_outcome=self._on_write_outcome)
+        self.journal = journal
+
+    def run(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Upload the articles and return the newly inserted records in input order."""
+        if not articles:
+            return []
+        items = self._filter_irrelevant(self._apply_journal(self._filter_known(articles)))
+        metrics.inc("upload_articles_total", self.skipped_known, outcome="known")
+        metrics.inc("upload_articles_total", self.skipped_irrelevant, outcome="irrelevant")
+        if not items:
+            return []
+        if self.vector_index is None and Config.VECTOR_INDEX_BACKEND == 'local':
+            self.vector_index = LocalVectorIndex.load()
+        if self.vector_index is not None:
+            self.retrieve_workers = 0
+
+        threads = [threading.Thread(target=self._run_stage, args=(self._embed_stage, items),
+                                    name="upload-embed", daemon=True)]
+        threads += [threading.Thread(target=self._run_stage, args=(self._retrieve_stage,),
+                                     name=f"upload-retrieve-{i}", daemon=True)
+                    for i in range(self.retrieve_workers)]
+        threads += [threading.Thread(target=self._run_stage, args=(self._classify_stage,),
+                                     name=f"upload-classify-{i}", daemon=True)
+                    for i in range(self.classify_workers)]
+        for thread in threads:
+            thread.start()
+
+        new_articles = self._write_stage(items, threads)
+
+        if self._stage_failures:
+            # The remaining workers may be blocked on queues nobody drains; they are daemons
+            new_articles.sort(key=lambda pair: pair[0])
+            return [record for _, record in new_articles if record.get('id') is not None]
+
+        # Every item has been written, so the worker queues are empty; stop the workers
+        for _ in range(self.retrieve_workers):
+            self._retrieve_queue.put(None)
+        for _ in range(self.classify_workers):
+            self._classify_queue.put(None)
+        for thread in threads:
+            thread.join()
+
+        new_articles.sort(key=lambda pair: pair[0])
+        # Records whose insert failed never got an id
+        return [record for _, record in new_articles if record.get('id') is not None]
+
+    def relevant_articles(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Articles that still need work: not stored yet, not finished in the journal and
+        accepted by the relevance filter. Used to prepare batch jobs ahead of `run`.
+        """
+        return [item.article for item in self._filter_irrelevant(self._apply_journal(self._filter_known(articles)))]
+
+    def _filter_known(self, articles: List[Dict[str, Any]]) -> List[_UploadItem]:
+        """Drop articles whose canonical URL is already stored or repeated earlier in the batch."""
+        if self.known_urls is None:
+            self.known_urls = KnownUrlIndex.load()
+        items = []
+        seen = set()
+        for i, article in enumerate(articles):
+            canonical = canonicalize_url(article.get('url') or '')
+            if canonical and (canonical in seen or article.get('url') in self.known_urls):
+                self.skipped_known += 1
+                continue
+            seen.add(canonical)
+            items.append(_UploadItem(i, article))
+        if self.skipped_known:
+            logger.info(f"Skipped {self.skipped_known} already known articles, "
+                        f"avoiding {self.skipped_known * PAID_CALLS_PER_ARTICLE} paid API calls.")
+        return items
+
+    def _apply_journal(self, items: List[_UploadItem]) -> List[_UploadItem]:
+        """Skip articles the journal has finished and restore recorded analyses."""
+        if self.journal is None:
+            return items
+        statuses = self.journal.article_statuses()
+        remaining = []
+        finished = restored = 0
+        for item in items:
+            entry = statuses.get(item.key)
+            if entry and entry['status'] in DONE_STATUSES:
+                finished += 1
+                continue
+            if entry and entry['status'] == 'analyzed' and entry['data']:
+                item.analysis = entry['data']['analysis']
+                item.description = entry['data'].get('description')
+                item.summary = tuple(entry['data']['summary']) if entry['data'].get('summary') else None
+                item.resumed = True
+                restored += 1
+            remaining.append(item)
+        if finished or restored:
+            logger.info(f"Resuming run {self.journal.run_id}: {finished} articles already done, "
+                        f"{restored} analyses reused from the journal.")
+        return remaining
+
+    def _journal(self, item: _UploadItem, status: str, data: Dict[str, Any] = None) -> None:
+        if self.journal is not None:
+            self.journal.record_article(item.key, status, data)
+
+    def _filter_irrelevant(self, items: List[_UploadItem]) -> List[_UploadItem]:
+        """Drop articles the local relevance scorer considers off-topic."""
+        if self.relevance_scorer is None:
+            return items
+        relevant = []
+        for item in items:
+            if item.resumed or self.relevance_scorer.is_relevant(item.article):
+                relevant.append(item)
+            else:
+                self._journal(item, 'rejected')
+        self.skipped_irrelevant = len(items) - len(relevant)
+        if self.skipped_irrelevant:
+            logger.info(f"Relevance filter rejected {self.skipped_irrelevant} of {len(items)} articles, "
+                        f"avoiding {self.skipped_irrelevant} LLM calls (see {self.relevance_scorer.audit_log_path}).")
+        return relevant
+
+    def _run_stage(self, stage: Callable, *args) -> None:
+        """Run a stage thread's loop, recording it if it dies so the writer stops waiting for its items."""
+        try:
+            stage(*args)
+        except Exception as e:
+            name = threading.current_thread().name
+            logger.error(f"Upload stage {name} stopped: {str(e)}")
+            self._stage_failures.append(name)
+
+    def _embed_stage(self, items: List[_UploadItem]) -> None:
+        # With retrieve_before_classify, items are held back until every neighbour lookup
+        # is done, so no lookup sees this run's writes; the writer re-checks against those
+        held = [] if self.retrieve_before_classify else None
+        released = set()
+
+        def release(target: queue.Queue, item: _UploadItem) -> None:
+            released.add(item)
+            if held is None:
+                target.put(item)
+            else:
+                held.append((target, item))
+
+        for start in range(0, len(items), self.embed_batch_size):
+            batch = items[start:start + self.embed_batch_size]
+            try:
+                embeddings = get_embeddings([HangarFireAnalyzer.embedding_text(item.article) for item in batch])
+                self._find_neighbours(batch, embeddings, release)
+            except Exception as e:
+                logger.error(f"Embedding or neighbour lookup failed for articles {start}-{start + len(batch) - 1}: {str(e)}")
+                for item in batch:
+                    if item not in released:
+                        item.error = e
+                        self._write_queue.put(item)
+
+        for target, item in held or []:
+            target.put(item)
+
+    def _find_neighbours(self, batch: List[_UploadItem], embeddings: List[List[float]],
+                         release: Callable[[queue.Queue, _UploadItem], None]) -> None:
+        """Store the batch's embeddings and release each item to the stage that comes next for it."""
+        for item, embedding in zip(batch, embeddings):
+            item.embedding = embedding
+            if item.resumed:
+                # Already analyzed in an earlier attempt: go straight to the writer
+                release(self._write_queue, item)
+            else:
+                self._journal(item, 'embedded')
+        batch = [item for item in batch if not item.resumed]
+        if not batch:
+            return
+        if self.vector_index is None:
+            for item in batch:
+                if not self.retrieve_before_classify:
+                    release(self._retrieve_queue, item)
+                    continue
+                try:
+                    self._retrieve(item)
+                except Exception as e:
+                    logger.error(f"Similarity lookup failed for '{item.article.get('title')}': {str(e)}")
+                    item.error = e
+                    release(self._write_queue, item)
+                    continue
+                release(self._classify_queue, item)
+            return
+
+        with self._run_inserts_lock:
+            snapshot = len(self._run_inserts)
+        with metrics.timer("vector_search_seconds", backend="local"):
+            neighbours = self.vector_index.search([item.embedding for item in batch], limit=NEIGHBOUR_COUNT)
+        for item, similar in zip(batch, neighbours):
+            item.snapshot = snapshot
+            item.similar = self._saved_neighbours(item, similar)
+            release(self._classify_queue, item)
+
+    def _retrieve_stage(self) -> None:
+        while True:
+            item = self._retrieve_queue.get()
+            if item is None:
+                return
+            try:
+                self._retrieve(item)
+            except Exception as e:
+                logger.error(f"Similarity lookup failed for '{item.article.get('title')}': {str(e)}")
+                item.error = e
+                self._write_queue.put(item)
+                continue
+            self._classify_queue.put(item)
+
+    def _classify_stage(self) -> None:
+        while True:
+            item = self._classify_queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + Config.ANALYSIS_BATCH_WAIT
+            while len(batch) < self.analysis_batch_size:
+                try:
+                    item = self._classify_queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._classify_batch(batch)
+            if stop:
+                return
+
+    def _classify_batch(self, items: List[_UploadItem]) -> None:
+        """Classify the items in one request where possible, then hand each to the writer."""
+        analyses = {}
+        # Re-checks already passed the screen on their first classification
+        for screen in (True, False):
+            group = [item for item in items if item.recheck != screen]
+            if len(group) < 2:
+                continue
+            try:
+                results = self.analyzer.classify_batch([(item.similar, item.article) for item in group], screen)
+                analyses.update(zip(group, results))
+            except Exception as e:
+                logger.warning(f"Batched analysis of {len(group)} articles failed, analyzing them one by one: {str(e)}")
+        for item in items:
+            try:
+                self._classify(item, analyses.get(item), screen=not item.recheck)
+            except Exception as e:
+                logger.error(f"Analysis failed for '{item.article.get('title')}': {str(e)}")
+                item.error = e
+            self._write_queue.put(item)
+
+    def _retrieve(self, item: _UploadItem) -> None:
+        # Take the snapshot before the lookup so inserts racing with it are re-checked later
+        with self._run_inserts_lock:
+            item.snapshot = len(self._run_inserts)
+        similar, _ = get_similar_articles(
+            HangarFireAnalyzer.embedding_text(item.article), limit=NEIGHBOUR_COUNT, query_embedding=item.embedding
+        )
+        item.similar = self._saved_neighbours(item, similar)
+
+    def _saved_neighbours(self, item: _UploadItem, similar: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        The item's saved neighbours, if it has any, plus those of the freshly retrieved
+        ones stored since that are at least as similar as the weakest saved neighbour
+        (ignoring any below Config.UPLOAD_RECHECK_MIN_SIMILARITY). Otherwise `similar`.
+        """
+        saved = self.neighbours.get(item.key)
+        if saved is None:
+            return similar
+        floor = Config.UPLOAD_RECHECK_MIN_SIMILARITY
+        if len(saved) >= NEIGHBOUR_COUNT:
+            floor = max(floor, min(neighbour.get('similarity', -1.0) for neighbour in saved))
+        saved_ids = {neighbour.get('id') for neighbour in saved}
+        newer = [neighbour for neighbour in similar
+                 if neighbour.get('id') not in saved_ids and neighbour.get('similarity', -1.0) >= floor]
+        if not newer:
+            return saved
+        logger.info(f"'{item.article.get('title')}' has {len(newer)} new neighbour(s) stored since its neighbours were saved.")
+        neighbours = saved + newer
+        neighbours.sort(key=lambda neighbour: neighbour.get('similarity', -1.0), reverse=True)
+        return neighbours[:NEIGHBOUR_COUNT]
+
+    def _classify(self, item: _UploadItem, analysis: Dict[str, Any] = None, screen: bool = True) -> None:
+        """Classify the item, unless a batched analysis is given, and prepare what its write needs."""
+        article = item.article
+        item.analysis = analysis if analysis is not None else self.analyzer.classify(item.similar, article, screen)
+        logger.debug(f"Analysis result: {item.analysis}")
+        if item.analysis.get("is_valid", False) and article.get('description') and item.description is None:
+            if article.get('language', 'en') != 'en':
+                item.description = translate_text(article.get('description', ''), 'en', article.get('language', 'en'))
+            else:
+                item.description = article.get('description')
+        if item.analysis.get("is_valid", False) and item.summary is None:
+            if item.description:
+                item.summary = (item.description, 'original' if article.get('language', 'en') == 'en' else 'googletrans')
             else:
-                record = {
-                    "title": article.get('title'),
-                    "source": article.get('source'),
-                    "location": analysis_result.get('country_region', ''),
-                    "airport_hangar_name": analysis_result.get('airport_hangar_name', ''),
-                    "author": article.get('author'),
-                    "url": [article.get('url')],
-                    "description": translate_text(article.get('description', ''), 'en', article.get('language', 'en')) if article.get('language', 'en') != 'en' and article.get('description') else article.get('description'),
-                    "content": article.get('content'),
-                    "embedding": query_embedding,
-                    "publishedAt": article.get('publishedAt')[:10] if article.get('publishedAt') else None,
-                    "collectedAt": week_string,
-                    "language": article.get('language')
-                }
-                
-                new_articles.append(record)
-                supabase.table('articles').insert(record).execute()
-    return new_articles
\ No newline at end of file
+                item.summary = to_english(article.get('title'), article.get('language', 'en'))
+        # Only analyses that stay valid across a restart are journaled: rejections and
+        # duplicates of stored rows. A new incident may match rows a crashed attempt
+        # already wrote, and provisional ids do not survive, so those are redone on resume.
+        analysis = item.analysis
+        reusable = not analysis.get('is_valid', False) or (analysis.get('duplicate_index') and (analysis.get('id') or 0) > 0)
+        if self.journal is not None and reusable:
+            self._journal(item, 'analyzed', {
+                "analysis": item.analysis, "description": item.description, "summary": item.summary
+            })
+
+    def _stale_neighbours(self, item: _UploadItem) -> List[Dict[str, Any]]:
+        """
+        Return this run's inserts made after the item's neighbours were retrieved
+        that are at least as similar as its weakest neighbour, ignoring any below
+        Config.UPLOAD_RECHECK_MIN_SIMILARITY.
+        """
+        with self._run_inserts_lock:
+            recent = [record for record in self._run_inserts[item.snapshot:] if record is not None]
+        if not recent:
+            return []
+        floor = Config.UPLOAD_RECHECK_MIN_SIMILARITY
+        if len(item.similar) >= NEIGHBOUR_COUNT:
+            floor = max(floor, min(neighbour.get('similarity', -1.0) for neighbour in item.similar))
+        known_ids = {self._resolve_id(neighbour.get('id')) for neighbour in item.similar}
+        candidates = []
+        for record in recent:
+            if record['id'] in known_ids:
+                continue
+            similarity = _dot(item.embedding, record['embedding'])
+            if similarity >= floor:
+                candidates.append(dict(record, similarity=similarity))
+        return candidates
+
+    def _resolve_id(self, article_id: Any) -> Any:
+        """Map a provisional id to the stored id once its insert has been flushed."""
+        if article_id in self._provisional:
+            return self._provisional[article_id][0].get('id') or article_id
+        return article_id
+
+    def _needs_recheck(self, item: _UploadItem) -> bool:
+        """
+        Whether an article deemed new must be re-classified because articles inserted
+        meanwhile may describe the same incident; if so, adds them to its neighbours.
+        """
+        candidates = self._stale_neighbours(item)
+        with self._run_inserts_lock:
+            item.snapshot = len(self._run_inserts)
+        if not candidates:
+            return False
+        neighbours = item.similar + candidates
+        neighbours.sort(key=lambda neighbour: neighbour.get('similarity', -1.0), reverse=True)
+        item.similar = neighbours[:NEIGHBOUR_COUNT]
+        logger.info(f"Re-checking '{item.article.get('title')}' against {len(candidates)} article(s) inserted in this run.")
+        return True
+
+    def _merge_duplicate(self, item: _UploadItem) -> None:
+        article = item.article
+        analysis_result = item.analysis
+        target_id = analysis_result["id"]
+
+        def merge(original_article: Dict[str, Any]) -> None:
+            urls = original_article.get('url') or []
+            if article.get('url') not in urls:
+                original_article['url'] = urls + [article.get('url', '')]
+            if analysis_result.get('airport_hangar_name') and not original_article.get('airport_hangar_name'):
+                original_article['airport_hangar_name'] = analysis_result.get('airport_hangar_name')
+            if analysis_result.get('country_region') and not original_article.get('location'):
+                original_article['location'] = analysis_result.get('country_region')
+            if item.description and not original_article.get('description'):
+                original_article['description'] = item.description
+            if article.get('content') and not original_article.get('content'):
+                original_article['content'] = article.get('content', '')
+            if item.summary and item.summary[0] and not original_article.get('summary_en'):
+                original_article['summary_en'], original_article['summary_source'] = item.summary
+                original_article['summary_version'] = Config.SUMMARY_VERSION
+
+        if target_id in self._failed_inserts:
+            raise RuntimeError(f"insert of the article it duplicates failed: {self._failed_inserts[target_id]}")
+        if target_id in self._provisional:
+            # Duplicate of an article inserted in this run: edit the pending record
+            # directly, or its stored row once the insert has been flushed
+            record = self._provisional[target_id][0]
+            if record.get('id') is None:
+                merge(record)
+                self._pending_keys[target_id].append(item.key)
+            else:
+                self.writer.merge(record['id'], merge, tag=item.key)
+        else:
+            self.writer.merge(target_id, merge, tag=item.key)
+
+        if self.vector_index is not None:
+            indexed = self.vector_index.get(target_id)
+            if indexed is not None:
+                merge(indexed)
+                self.vector_index.update(target_id, indexed)
+        self.known_urls.add([article.get('url', '')], target_id)
+
+    def _insert_new(self, item: _UploadItem) -> Dict[str, Any]:
+        article = item.article
+        analysis_result = item.analysis
+        record = {
+            "title": article.get('title'),
+            "source": article.get('source'),
+            "location": analysis_result.get('country_region', ''),
+            "airport_hangar_name": analysis_result.get('airport_hangar_name', ''),
+            "author": article.get('author'),
+            "url": [article.get('url')],
+            "description": item.description if article.get('description') else article.get('description'),
+            "content": article.get('content'),
+            "embedding": item.embedding,
+            "publishedAt": article.get('publishedAt')[:10] if article.get('publishedAt') else None,
+            "collectedAt": self.week_string,
+            "language": article.get('language'),
+            "summary_en": item.summary[0] if item.summary else None,
+            "summary_source": item.summary[1] if item.summary else None,
+            "summary_version": Config.SUMMARY_VERSION
+        }
+        # Until the buffered insert is flushed the article is known by a negative provisional id
+        provisional_id = -(len(self._provisional) + 1)
+        stored = dict(record, id=provisional_id)
+        self._provisional[provisional_id] = (record, stored)
+        self._pending_keys[provisional_id] = [item.key]
+        self.writer.insert(record, tag=provisional_id)
+
+        with self._run_inserts_lock:
+            self._run_inserts.append(stored)
+        if self.vector_index is not None:
+            self.vector_index.add(stored, item.embedding)
+        self.known_urls.add(record['url'], provisional_id)
+        return record
+
+    def _on_write_outcome(self, outcome: Dict[str, Any]) -> None:
+        """Journal stored articles and swap provisional ids for real ones once an insert is stored."""
+        if not outcome['ok']:
+            if outcome['op'] == 'insert':
+                self._drop_failed_insert(outcome['tag'], outcome['error'])
+            return
+        if outcome['op'] == 'merge':
+            if self.journal is not None:
+                self.journal.record_article(outcome['tag'], 'written', {"op": "merge", "id": outcome['id']})
+            return
+        provisional_id = outcome['tag']
+        if self.journal is not None:
+            for i, key in enumerate(self._pending_keys[provisional_id]):
+                # The first key is the inserted article; the rest were merged into it before the flush
+                self.journal.record_article(key, 'written', {"op": "insert" if i == 0 else "merge", "id": outcome['id']})
+        _, stored = self._provisional[provisional_id]
+        stored['id'] = outcome['id']
+        if self.vector_index is not None:
+            self.vector_index.rekey(provisional_id, outcome['id'])
+        self.known_urls.rekey(provisional_id, outcome['id'])
+
+    def _drop_failed_insert(self, provisional_id: int, error: str) -> None:
+        """
+        Forget an article whose insert failed: the duplicates merged into its pending
+        record fail with it, and later duplicates of it fail instead of being merged.
+        """
+        self._failed_inserts[provisional_id] = error
+        for key in self._pending_keys[provisional_id][1:]:
+            self.writer.record_failure("merge", key, RuntimeError(f"insert of the article it duplicates failed: {error}"))
+        _, stored = self._provisional[provisional_id]
+        with self._run_inserts_lock:
+            # A tombstone keeps the positions items use as snapshots valid
+            position = next(i for i, record in enumerate(self._run_inserts) if record is stored)
+            self._run_inserts[position] = None
+        if self.vector_index is not None:
+            self.vector_index.remove(provisional_id)
+        self.known_urls.remove(provisional_id)
+
+    def _write_stage(self, items: List[_UploadItem], threads: List[threading.Thread]) -> List[Any]:
+        new_articles = []
+        failed = 0
+        finished = set()
+        # Re-checks waiting for room in the classify queue; the writer never blocks on it
+        rechecks: List[_UploadItem] = []
+        with tqdm(total=len(items)) as progress:
+            while len(finished) < len(items):
+                while rechecks:
+                    try:
+                        self._classify_queue.put_nowait(rechecks[0])
+                    except queue.Full:
+                        break
+                    rechecks.pop(0)
+                try:
+                    item = self._write_queue.get(timeout=0.1 if rechecks else self.writer.flush_interval)
+                except queue.Empty:
+                    self.writer.flush_if_due()
+                    if self._stage_failures or not any(thread.is_alive() for thread in threads):
+                        break
+                    continue
+                if item.error is not None:
+                    # Journaled so callers see it as unfinished even if it failed before being journaled
+                    self._journal(item, 'failed', {"error": str(item.error)})
+                    failed += 1
+                    finished.add(item)
+                    progress.update(1)
+                    continue
+                try:
+                    if item.analysis.get("is_valid", False) and item.analysis["duplicate_index"] == 0 \
+                            and self._needs_recheck(item):
+                        item.recheck = True
+                        rechecks.append(item)
+                        continue
+                    finished.add(item)
+                    progress.update(1)
+                    if not item.analysis.get("is_valid", False):
+                        self._journal(item, 'rejected')
+                        metrics.inc("upload_articles_total", outcome="rejected")
+                    elif item.analysis["duplicate_index"] > 0:
+                        self._merge_duplicate(item)
+                        metrics.inc("upload_articles_total", outcome="duplicate")
+                    else:
+                        new_articles.append((item.index, self._insert_new(item)))
+                        metrics.inc("upload_articles_total", outcome="new")
+                except Exception as e:
+                    logger.error(f"Failed to store '{item.article.get('title')}': {str(e)}")
+                    finished.add(item)
+                    failed += 1
+        unfinished = [item for item in items if item not in finished]
+        if unfinished:
+            logger.error(f"Upload stages stopped ({', '.join(self._stage_failures) or 'all exited'}); "
+                         f"{len(unfinished)} articles were not processed.")
+            for item in unfinished:
+                self._journal(item, 'failed', {"error": "upload stage stopped"})
+            failed += len(unfinished)
+        summary = self.writer.close()
+        failed += summary['failed']
+        metrics.inc("upload_articles_total", failed, outcome="failed")
+        if failed:
+            logger.warning(f"{failed} of {len(items)} articles failed and were not uploaded.")
+        # Only report records whose buffered insert actually reached the database
+        return [(index, record) for index, record in new_articles if record.get('id') is not None]
+
+
+def article_upload(articles: List[Dict[str, Any]], is_backfill: bool, journal: RunJournal = None) -> List[Dict[str, Any]]:
+    """
+    Uploads a list of articles to the database.
+    If a run journal is given, progress is recorded in it and work it already records is skipped.
+    """
+    pipeline = ArticleUploadPipeline(is_backfill=is_backfill, journal=journal)
+    return pipeline.run(articles)
@@ -0,0 +1,62 @@
+from typing import Dict, Iterable, Optional
+
+from src.db import supabase
+from src.logging.colorlog_config import get_color_logger
+from src.metrics import metrics
+from src.scrapers.url_utils import canonicalize_url
+
+logger = get_color_logger()
+
+
+class KnownUrlIndex:
+    """
+    In-memory map from canonical article URL to the id of the stored article
+    that already lists it, synced from the `url` arrays of the 'articles' table.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+
+    @classmethod
+    def load(cls, page_size: int = 1000) -> "KnownUrlIndex":
+        """Build the index from every row in the 'articles' table, one page at a time."""
+        index = cls()
+        start = 0
+        while True:
+            with metrics.timer("supabase_request_seconds", op="select"):
+                rows = supabase.table('articles').select('id,url').order('id').range(start, start + page_size - 1).execute().data
+            for row in rows:
+                urls = row.get('url') or []
+                index.add(urls if isinstance(urls, list) else [urls], row.get('id'))
+            if len(rows) < page_size:
+                break
+            start += page_size
+        logger.info(f"Loaded {len(index)} known article URLs.")
+        return index
+
+    def add(self, urls: Iterable[str], article_id: Optional[int]) -> None:
+        for url in urls:
+            canonical = canonicalize_url(url)
+            if canonical:
+                self._ids.setdefault(canonical, article_id)
+
+    def rekey(self, old_id: Optional[int], new_id: Optional[int]) -> None:
+        """Point every URL stored under old_id at new_id."""
+        for url, article_id in self._ids.items():
+            if article_id == old_id:
+                self._ids[url] = new_id
+
+    def remove(self, article_id: Optional[int]) -> None:
+        """Forget every URL stored under article_id, e.g. after its insert failed."""
+        for url in [url for url, known_id in self._ids.items() if known_id == article_id]:
+            del self._ids[url]
+
+    def lookup(self, url: str) -> Optional[int]:
+        """Return the id of the stored article with this URL, or None if it is unknown."""
+        return self._ids.get(canonicalize_url(url))
+
+    def __contains__(self, url: str) -> bool:
+        return canonicalize_url(url) in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
@@ -0,0 +1,140 @@
+import json
+import threading
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from src.db import supabase
+from src.logging.colorlog_config import get_color_logger
+from src.metrics import metrics
+
+logger = get_color_logger()
+
+
+class LocalVectorIndex:
+    """
+    In-memory mirror of the 'articles' embeddings for nearest-neighbour lookups.
+
+    Embeddings are kept L2-normalized in one contiguous float32 matrix, so a batch
+    of queries is a single matrix multiply followed by a partial sort. Rows are
+    appended in place (the matrix grows by doubling) as new articles are stored.
+    Search results have the same shape as rows returned by the match_articles RPC,
+    including a 'similarity' key.
+    """
+
+    # Columns needed by the analyzer prompt and by duplicate merges
+    COLUMNS = ['id', 'title', 'publishedAt', 'url', 'location', 'description', 'content', 'airport_hangar_name']
+
+    def __init__(self, dimensions: int = 1536, capacity: int = 1024):
+        self.dimensions = dimensions
+        self._matrix = np.zeros((capacity, dimensions), dtype=np.float32)
+        self._records: List[Dict[str, Any]] = []
+        self._positions: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, page_size: int = 500) -> "LocalVectorIndex":
+        """Load every embedded row of the 'articles' table, one page at a time."""
+        index = cls()
+        columns = ','.join(cls.COLUMNS + ['embedding'])
+        start = 0
+        while True:
+            with metrics.timer("supabase_request_seconds", op="select"):
+                rows = supabase.table('articles').select(columns).order('id').range(start, start + page_size - 1).execute().data
+            for row in rows:
+                embedding = row.pop('embedding', None)
+                if embedding:
+                    index.add(row, embedding)
+            if len(rows) < page_size:
+                break
+            start += page_size
+        logger.info(f"Loaded {len(index)} article embeddings into the local vector index.")
+        return index
+
+    def add(self, record: Dict[str, Any], embedding: Sequence[float]) -> None:
+        """Add a stored article, or replace it if its id is already indexed."""
+        if isinstance(embedding, str):
+            # pgvector columns come back from PostgREST as '[x,y,...]' strings
+            embedding = json.loads(embedding)
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        record = {key: record.get(key) for key in self.COLUMNS}
+
+        with self._lock:
+            position = self._positions.get(record['id']) if record['id'] is not None else None
+            if position is None:
+                position = len(self._records)
+                if position == self._matrix.shape[0]:
+                    grown = np.zeros((self._matrix.shape[0] * 2, self.dimensions), dtype=np.float32)
+                    grown[:position] = self._matrix
+                    self._matrix = grown
+                self._records.append(record)
+                if record['id'] is not None:
+                    self._positions[record['id']] = position
+            else:
+                self._records[position] = record
+            self._matrix[position] = vector
+
+    def update(self, article_id: Any, fields: Dict[str, Any]) -> None:
+        """Refresh the stored fields of an indexed article, e.g. after a duplicate merge."""
+        with self._lock:
+            position = self._positions.get(article_id)
+            if position is not None:
+                self._records[position].update({key: value for key, value in fields.items() if key in self.COLUMNS})
+
+    def rekey(self, old_id: Any, new_id: Any) -> None:
+        """Change the id of an indexed article, e.g. from a provisional to a stored id."""
+        with self._lock:
+            position = self._positions.pop(old_id, None)
+            if position is not None:
+                self._positions[new_id] = position
+                self._records[position]['id'] = new_id
+
+    def remove(self, article_id: Any) -> None:
+        """Drop an indexed article, e.g. one whose insert failed; the last row takes its place."""
+        with self._lock:
+            position = self._positions.pop(article_id, None)
+            if position is None:
+                return
+            last = len(self._records) - 1
+            if position != last:
+                self._matrix[position] = self._matrix[last]
+                self._records[position] = self._records[last]
+                if self._records[position]['id'] is not None:
+                    self._positions[self._records[position]['id']] = position
+            self._records.pop()
+
+    def get(self, article_id: Any) -> Dict[str, Any]:
+        """Return a copy of the indexed fields for an article id, or None."""
+        with self._lock:
+            position = self._positions.get(article_id)
+            return dict(self._records[position]) if position is not None else None
+
+    def search(self, query_embeddings: Sequence[Sequence[float]], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Return the `limit` most similar articles for each query embedding,
+        most similar first.
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(-1, self.dimensions)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms > 0, norms, 1)
+
+        # Scored under the lock: add() may grow the matrix and remove() moves rows,
+        # so the rows and their records must come from the same state
+        with self._lock:
+            count = len(self._records)
+            if count == 0 or limit <= 0:
+                return [[] for _ in range(len(queries))]
+            scores = queries @ self._matrix[:count].T
+            k = min(limit, count)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            results = []
+            for row, candidates in enumerate(top):
+                ordered = candidates[np.argsort(-scores[row, candidates])]
+                results.append([dict(self._records[i], similarity=float(scores[row, i])) for i in ordered])
+        return results
+
+    def __len__(self) -> int:
+        return len(self._records)
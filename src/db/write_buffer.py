@@ -0,0 +1,185 @@
+import copy
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.config import Config
+from src.db import supabase
+from src.logging.colorlog_config import get_color_logger
+from src.metrics import metrics
+
+logger = get_color_logger()
+
+MergeFn = Callable[[Dict[str, Any]], None]
+
+# Columns a duplicate merge reads and may change; only these are fetched and written back
+MERGE_COLUMNS = ('url', 'location', 'airport_hangar_name', 'description', 'content',
+                 'summary_en', 'summary_source', 'summary_version')
+
+
+class ArticleWriteBuffer:
+    """
+    Groups writes to a Supabase table into size-bounded batches.
+
+    Inserts are buffered as record dicts and sent as one insert per chunk; each
+    record gets its new 'id' set in place once its chunk is stored. Merges into
+    existing rows are buffered as functions that edit a row: at flush time the
+    `merge_columns` of the target rows are fetched in one select, every pending
+    merge is applied in order, and the rows that changed are written back, those
+    columns only, with one upsert per chunk. Merge functions must only touch
+    `merge_columns`.
+
+    The buffer flushes when `batch_size` writes are pending, or on the first write
+    or `flush_if_due` call after `flush_interval` seconds. A chunk that fails is
+    retried one row at a time, so one bad row does not lose the rest. Every row
+    gets an outcome dict (op, tag, id, ok, error) in `outcomes`, and `on_outcome`
+    is called with it if given.
+    """
+
+    def __init__(self, table: str = 'articles', batch_size: int = None, flush_interval: float = None,
+                 on_outcome: Callable[[Dict[str, Any]], None] = None, merge_columns: Sequence[str] = MERGE_COLUMNS):
+        self.table = table
+        self.merge_columns = ['id'] + [column for column in merge_columns if column != 'id']
+        self.batch_size = batch_size or Config.WRITE_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.WRITE_FLUSH_INTERVAL
+        self.on_outcome = on_outcome
+        self.outcomes: List[Dict[str, Any]] = []
+        self.round_trips = 0
+
+        self._inserts: List[tuple] = []
+        self._merges: Dict[Any, List[tuple]] = {}
+        self._merge_count = 0
+        self._last_flush = time.monotonic()
+
+    def insert(self, record: Dict[str, Any], tag: Any = None) -> None:
+        """Queue a new row. `record['id']` is set when the row has been stored."""
+        self._inserts.append((record, tag))
+        self._after_write()
+
+    def merge(self, row_id: Any, merge_fn: MergeFn, tag: Any = None) -> None:
+        """Queue an in-place edit of an existing row, applied to its current contents at flush time."""
+        self._merges.setdefault(row_id, []).append((merge_fn, tag))
+        self._merge_count += 1
+        self._after_write()
+
+    def pending(self) -> int:
+        return len(self._inserts) + self._merge_count
+
+    def flush_if_due(self) -> None:
+        if self.pending() and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _after_write(self) -> None:
+        if self.pending() >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush(self) -> None:
+        """Write every pending insert and merge."""
+        inserts, self._inserts = self._inserts, []
+        merges, self._merges, self._merge_count = self._merges, {}, 0
+        for start in range(0, len(inserts), self.batch_size):
+            self._flush_inserts(inserts[start:start + self.batch_size])
+        row_ids = list(merges)
+        for start in range(0, len(row_ids), self.batch_size):
+            chunk = row_ids[start:start + self.batch_size]
+            self._flush_merges({row_id: merges[row_id] for row_id in chunk})
+        self._last_flush = time.monotonic()
+
+    def close(self) -> Dict[str, int]:
+        """Flush what is left and return a summary of the outcomes."""
+        self.flush()
+        failed = sum(1 for outcome in self.outcomes if not outcome['ok'])
+        summary = {"rows": len(self.outcomes), "failed": failed, "round_trips": self.round_trips}
+        logger.info(f"Wrote {summary['rows'] - failed} rows to '{self.table}' in {self.round_trips} round trips"
+                    + (f", {failed} failed." if failed else "."))
+        return summary
+
+    def record_failure(self, op: str, tag: Any, error: Exception) -> None:
+        """Record a failed outcome for a write that never reached the table (e.g. one depending on a failed insert)."""
+        self._record(op, tag, None, error)
+
+    def _record(self, op: str, tag: Any, row_id: Any, error: Optional[Exception] = None) -> None:
+        outcome = {"op": op, "tag": tag, "id": row_id, "ok": error is None, "error": str(error) if error else None}
+        if error is not None:
+            logger.error(f"Failed to {op} row {row_id if row_id is not None else tag}: {str(error)}")
+        self.outcomes.append(outcome)
+        metrics.inc("rows_written_total", table=self.table, op=op, status="ok" if error is None else "failed")
+        if self.on_outcome:
+            self.on_outcome(outcome)
+
+    def _flush_inserts(self, chunk: List[tuple]) -> None:
+        if not chunk:
+            return
+        try:
+            self.round_trips += 1
+            with metrics.timer("supabase_request_seconds", op="insert"):
+                stored = supabase.table(self.table).insert([record for record, _ in chunk]).execute().data
+        except Exception as e:
+            if len(chunk) == 1:
+                self._record("insert", chunk[0][1], None, e)
+                return
+            logger.warning(f"Batch insert of {len(chunk)} rows failed, retrying one by one: {str(e)}")
+            for entry in chunk:
+                self._flush_inserts([entry])
+            return
+        # PostgREST returns inserted rows in request order
+        for (record, tag), row in zip(chunk, stored):
+            record['id'] = row.get('id')
+            self._record("insert", tag, record['id'])
+
+    def _flush_merges(self, merges: Dict[Any, List[tuple]]) -> None:
+        if not merges:
+            return
+        try:
+            self.round_trips += 1
+            with metrics.timer("supabase_request_seconds", op="select"):
+                rows = supabase.table(self.table).select(','.join(self.merge_columns)).in_('id', list(merges)).execute().data
+        except Exception as e:
+            for row_id, entries in merges.items():
+                for _, tag in entries:
+                    self._record("merge", tag, row_id, e)
+            return
+
+        rows_by_id = {row['id']: row for row in rows}
+        updated = []
+        for row_id, entries in merges.items():
+            row = rows_by_id.get(row_id)
+            if row is None:
+                for _, tag in entries:
+                    self._record("merge", tag, row_id, LookupError("row not found"))
+                continue
+            original = {column: copy.deepcopy(row.get(column)) for column in self.merge_columns}
+            for merge_fn, _ in entries:
+                merge_fn(row)
+            changed = {column: row.get(column) for column in self.merge_columns}
+            if changed == original:
+                # Nothing new for this row: no write needed
+                for _, tag in entries:
+                    self._record("merge", tag, row_id)
+                continue
+            updated.append(changed)
+
+        try:
+            if updated:
+                self.round_trips += 1
+                with metrics.timer("supabase_request_seconds", op="upsert"):
+                    supabase.table(self.table).upsert(updated).execute()
+        except Exception as e:
+            logger.warning(f"Batch update of {len(updated)} rows failed, retrying one by one: {str(e)}")
+            for row in updated:
+                try:
+                    self.round_trips += 1
+                    with metrics.timer("supabase_request_seconds", op="update"):
+                        fields = {column: value for column, value in row.items() if column != 'id'}
+                        supabase.table(self.table).update(fields).eq('id', row['id']).execute()
+                except Exception as row_error:
+                    for _, tag in merges[row['id']]:
+                        self._record("merge", tag, row['id'], row_error)
+                    continue
+                for _, tag in merges[row['id']]:
+                    self._record("merge", tag, row['id'])
+            return
+        for row in updated:
+            for _, tag in merges[row['id']]:
+                self._record("merge", tag, row['id'])
@@ -1,12 +1,12 @@
 import os
 import pandas as pd
-from src.llm.language import translate_text
-from src.db import get_articles
+from concurrent.futures import ThreadPoolExecutor
+from src.llm.language import to_english
+from src.db import get_articles, store_summaries
 from src.config import Config
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.hyperlink import Hyperlink
+from src.excel.report_store import ReportHistoryStore
+from src.excel.report_writer import ReportWriter
+from src.metrics import metrics
 
 class ArticleExcelExporter:
     HEADERS = [
@@ -19,17 +19,58 @@ class ArticleExcelExporter:
         "Origin Title"
     ]
     MAX_COL_WIDTH = 50  # Maximum column width
+    # Only the columns the report uses; never the embedding vectors
+    ARTICLE_COLUMNS = [
+        "publishedAt", "airport_hangar_name", "location", "description", "title", "url", "language", "updatedAt",
+        "summary_en", "summary_version"
+    ]
 
     def __init__(self):
         self.output_path = Config.REPORT_FILE_PATH or "reports/hangar_fire_report.xlsx"
+        self.store = ReportHistoryStore()
+        self.writer = ReportWriter(self.HEADERS, link_column="Source Link(s)", max_col_width=self.MAX_COL_WIDTH)
+
+    def _fill_missing_summaries(self, articles):
+        """
+        Translate summaries for rows stored without a current English summary,
+        concurrently, and save them so later exports don't translate them again.
+        """
+        missing = [
+            article for article in articles
+            if not article.get("summary_en") or (article.get("summary_version") or 0) < Config.SUMMARY_VERSION
+        ]
+        if not missing:
+            return
+
+        def summarize(article):
+            return to_english(article.get("description") or article.get("title"), article.get("language", "en"))
+
+        with ThreadPoolExecutor(max_workers=Config.TRANSLATION_WORKERS) as executor:
+            summaries = list(executor.map(summarize, missing))
+
+        rows = []
+        for article, (summary, source) in zip(missing, summaries):
+            article["summary_en"] = summary
+            rows.append({"id": article["id"], "summary_en": summary, "summary_source": source,
+                         "summary_version": Config.SUMMARY_VERSION})
+        # Summary columns only; the row's updatedAt is left alone (sql/migrations/003)
+        failed = store_summaries(rows)
+        print(f"Translated and stored {len(missing) - failed} missing summaries"
+              + (f", {failed} could not be saved." if failed else "."))
 
     def export_articles_to_excel(self):
-        # Fetch articles from Supabase
-        articles = get_articles()
+        # Fetch only rows added or changed since the last merge into the history store
+        with metrics.timer("export_step_seconds", step="fetch"):
+            articles = get_articles(columns=self.ARTICLE_COLUMNS, updated_since=self.store.watermark)
         if not articles:
             print(f"No articles found.")
+            if self.store.exists() and not os.path.exists(self.output_path):
+                self.writer.write(self.store.read_report(), self.output_path)
             return
 
+        with metrics.timer("export_step_seconds", step="summaries"):
+            self._fill_missing_summaries(articles)
+
         # Prepare new data
         new_rows = []
         for article in articles:
@@ -43,12 +84,10 @@ class ArticleExcelExporter:
                 url_str = str(urls)
             
             language = article.get("language", "en")
-            summary = article.get("description") or article.get("title") 
-            
-            if language != "en":
-                summary = translate_text(summary, "en", language)   
-            
+            summary = article.get("summary_en")
+
             row = {
+                "article_id": article["id"],
                 "Date of Incident": article.get("publishedAt", ""),
                 "Airport / Hangar Name": article.get("airport_hangar_name", ""),
                 "Country / Region": article.get("location", ""),
@@ -58,64 +97,15 @@ class ArticleExcelExporter:
                 "Origin Title": article.get("title", "") if language != "en" else "",
             }
             new_rows.append(row)
-        new_df = pd.DataFrame(new_rows, columns=self.HEADERS)
-
-        # If file exists, update it
-        if os.path.exists(self.output_path):
-            old_df = pd.read_excel(self.output_path)
-            # Remove duplicates based on Source Link(s)
-            combined_df = pd.concat([new_df, old_df], ignore_index=True)
-            combined_df.drop_duplicates(subset=["Source Link(s)"], keep="last", inplace=True)
-            combined_df.reset_index(drop=True, inplace=True)
-        else:
-            combined_df = new_df
-
-        # Sort by Date of Incident (descending, most recent first)
-        combined_df.sort_values(by="Date of Incident", ascending=False, inplace=True)
-
-        # Write to Excel
-        combined_df.to_excel(self.output_path, index=False)
-
-        # Post-process with openpyxl for styling
-        wb = load_workbook(self.output_path)
-        ws = wb.active
-
-        # Style header row
-        header_fill = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")
-        header_font = Font(bold=True)
-        for col_idx, header in enumerate(self.HEADERS, 1):
-            cell = ws.cell(row=1, column=col_idx)
-            cell.fill = header_fill
-            cell.font = header_font
 
-        # Adjust column widths
-        for col_idx, header in enumerate(self.HEADERS, 1):
-            max_length = len(header)
-            for row in ws.iter_rows(min_row=2, min_col=col_idx, max_col=col_idx):
-                for cell in row:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-            max_length = min(max_length + 2, self.MAX_COL_WIDTH)
-            ws.column_dimensions[get_column_letter(col_idx)].width = max_length
+        # Merge by article id into the history store, then render the report from it
+        timestamps = [article["updatedAt"] for article in articles if article.get("updatedAt")]
+        watermark = max(timestamps, key=pd.Timestamp) if timestamps else None
+        with metrics.timer("export_step_seconds", step="merge"):
+            self.store.merge(new_rows, watermark=watermark)
 
-        # Format URLs as clickable hyperlinks and color them blue
-        url_col_idx = self.HEADERS.index("Source Link(s)") + 1
-        blue_font = Font(color="0000EE", underline="single")
-        for row in ws.iter_rows(min_row=2, min_col=url_col_idx, max_col=url_col_idx):
-            for cell in row:
-                if cell.value:
-                    urls = [u.strip() for u in str(cell.value).split(",") if u.strip()]
-                    if urls:
-                        # If multiple URLs, join with comma and space, each as hyperlink
-                        display = []
-                        for u in urls:
-                            cell.value = u  # Set to first URL for hyperlink
-                            cell.hyperlink = u
-                            cell.font = blue_font
-                            display.append(u)
-                        if len(display) > 1:
-                            # If multiple, show as comma-separated, but only first is clickable
-                            cell.value = ", ".join(display)
-                            # openpyxl only supports one hyperlink per cell
-        wb.save(self.output_path)
-        print(f"Exported {len(new_df)} new/updated articles to {self.output_path}") 
\ No newline at end of file
+        # Write and style the workbook in a single streaming pass, most recent incident first
+        with metrics.timer("export_step_seconds", step="render"):
+            self.writer.write(self.store.read_report(), self.output_path)
+        metrics.inc("report_rows_merged_total", len(new_rows))
+        print(f"Exported {len(new_rows)} new/updated articles to {self.output_path}")
@@ -0,0 +1,106 @@
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.config import Config
+
+WATERMARK_KEY = b"updatedAt"
+
+
+class ReportHistoryStore:
+    """
+    Report rows keyed by article id, stored in a Parquet file.
+
+    This is the source of truth for the Excel report: new and changed articles
+    are merged in by id, replacing the previous version of each row, and the
+    xlsx is rendered from the merged table. The newest "updatedAt" merged so far
+    is kept in the file's metadata as the watermark for the next incremental
+    fetch. Other consumers can read the typed table with `read()`.
+    """
+
+    # Report header -> stored column
+    COLUMNS = {
+        "Date of Incident": "date_of_incident",
+        "Airport / Hangar Name": "airport_hangar_name",
+        "Country / Region": "country_region",
+        "Brief Summary": "brief_summary",
+        "Source Link(s)": "source_links",
+        "Language": "language",
+        "Origin Title": "origin_title",
+    }
+    SCHEMA = pa.schema(
+        [("article_id", pa.int64()), ("date_of_incident", pa.date32())]
+        + [(column, pa.string()) for column in list(COLUMNS.values())[1:]]
+    )
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.REPORT_HISTORY_PATH
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """The newest "updatedAt" merged into the store, or None for an empty store."""
+        if not self.exists():
+            return None
+        metadata = pq.read_schema(self.path).metadata or {}
+        value = metadata.get(WATERMARK_KEY)
+        return value.decode("utf-8") if value else None
+
+    def read(self, columns: List[str] = None) -> pd.DataFrame:
+        """Read the stored rows with their Parquet types (article_id int64, date_of_incident date)."""
+        if not self.exists():
+            return self.SCHEMA.empty_table().to_pandas()
+        return pq.read_table(self.path, columns=columns).to_pandas()
+
+    def read_report(self) -> pd.DataFrame:
+        """Read the stored rows with report headers, most recent incident first."""
+        df = self.read().sort_values(by="date_of_incident", ascending=False, na_position="last")
+        df["date_of_incident"] = pd.to_datetime(df["date_of_incident"]).dt.strftime("%Y-%m-%d")
+        return df.rename(columns={column: header for header, column in self.COLUMNS.items()})
+
+    def merge(self, rows: List[Dict], watermark: str = None) -> int:
+        """
+        Insert or replace report rows by article id.
+
+        Args:
+            rows: Dicts with an "article_id" key and report headers as the other keys.
+            watermark: Newest "updatedAt" among the rows, stored for the next incremental fetch.
+
+        Returns:
+            int: Number of rows in the store after the merge.
+        """
+        new = pd.DataFrame(rows).rename(columns=self.COLUMNS)
+        new = new.reindex(columns=self.SCHEMA.names)
+        new["date_of_incident"] = pd.to_datetime(new["date_of_incident"], errors="coerce").dt.date
+        new = new.drop_duplicates(subset=["article_id"], keep="last")
+        new_table = pa.Table.from_pandas(new, schema=self.SCHEMA, preserve_index=False)
+
+        if self.exists():
+            existing = pq.read_table(self.path)
+            # Keep only the stored rows that are not being replaced
+            keep = pc.invert(pc.is_in(existing["article_id"], value_set=new_table["article_id"]))
+            table = pa.concat_tables([existing.filter(keep).cast(self.SCHEMA), new_table])
+            previous = self.watermark
+        else:
+            table = new_table
+            previous = None
+
+        if previous and (not watermark or pd.Timestamp(previous) > pd.Timestamp(watermark)):
+            watermark = previous
+        table = table.sort_by("article_id").replace_schema_metadata(
+            {WATERMARK_KEY: watermark.encode("utf-8")} if watermark else None
+        )
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        pq.write_table(table, temp_path, compression="zstd")
+        os.replace(temp_path, self.path)
+        return table.num_rows
@@ -0,0 +1,77 @@
+import os
+from typing import Dict, List
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+
+class ReportWriter:
+    """
+    Writes the styled report workbook in one streaming pass using openpyxl's
+    write-only mode, instead of writing with pandas and then reloading the file
+    to style it.
+
+    Column widths are worked out from the data before the first row is streamed
+    (write-only sheets need them up front), with a vectorized length per column
+    rather than a scan of the written workbook. Link cells get their hyperlink
+    and font as each row is written.
+    """
+
+    HEADER_FILL = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")
+    HEADER_FONT = Font(bold=True)
+    LINK_FONT = Font(color="0000EE", underline="single")
+
+    def __init__(self, headers: List[str], link_column: str = None, max_col_width: int = 50):
+        self.headers = headers
+        self.link_column = link_column
+        self.max_col_width = max_col_width
+
+    def column_widths(self, df: pd.DataFrame) -> Dict[str, int]:
+        """Width of each column: its longest value or header plus padding, capped at max_col_width."""
+        widths = {}
+        for header in self.headers:
+            longest = len(header)
+            if header in df.columns and len(df):
+                values = df[header].dropna()
+                values = values[values.astype(bool)]
+                if len(values):
+                    longest = max(longest, int(values.astype(str).str.len().max()))
+            widths[header] = min(longest + 2, self.max_col_width)
+        return widths
+
+    def write(self, df: pd.DataFrame, path: str) -> None:
+        """Write the rows of df, in order, to a new workbook at path."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        for col_idx, width in enumerate(self.column_widths(df).values(), 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+        header_cells = []
+        for header in self.headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.fill = self.HEADER_FILL
+            cell.font = self.HEADER_FONT
+            header_cells.append(cell)
+        ws.append(header_cells)
+
+        link_idx = self.headers.index(self.link_column) if self.link_column in self.headers else None
+        columns = df.reindex(columns=self.headers)
+        for values in columns.itertuples(index=False, name=None):
+            row = [None if pd.isna(value) else value for value in values]
+            if link_idx is not None and row[link_idx]:
+                urls = [u.strip() for u in str(row[link_idx]).split(",") if u.strip()]
+                if urls:
+                    # openpyxl only supports one hyperlink per cell, so the first URL is clickable
+                    cell = WriteOnlyCell(ws, value=", ".join(urls))
+                    cell.hyperlink = urls[0]
+                    cell.font = self.LINK_FONT
+                    row[link_idx] = cell
+            ws.append(row)
+        wb.save(path)
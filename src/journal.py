@@ -0,0 +1,116 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Any, Dict, Optional
+
+from src.config import Config
+
+# Article statuses that need no more work when a run is resumed
+DONE_STATUSES = ('written', 'rejected')
+
+
+class RunJournal:
+    """
+    Durable journal of one pipeline run, stored in SQLite.
+
+    Records which stages of the run have completed (with an optional JSON
+    payload, such as the scrape results) and the status of every article in
+    the upload stage: 'embedded', 'analyzed' (with the analysis result),
+    'rejected' or 'written'. A crashed run can be reopened with `latest_unfinished`
+    and continued from the last committed point. Safe to share between threads.
+    """
+
+    def __init__(self, run_id: str, path: str = None):
+        self.run_id = run_id
+        self.path = path or Config.RUN_JOURNAL_PATH
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY, kind TEXT NOT NULL, started_at TEXT NOT NULL, finished_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS stages (
+                run_id TEXT NOT NULL, stage TEXT NOT NULL, completed_at TEXT NOT NULL, payload TEXT,
+                PRIMARY KEY (run_id, stage)
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                run_id TEXT NOT NULL, article_key TEXT NOT NULL, status TEXT NOT NULL, data TEXT,
+                updated_at TEXT NOT NULL, PRIMARY KEY (run_id, article_key)
+            );
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.now().isoformat(timespec='seconds')
+
+    @classmethod
+    def start(cls, kind: str, path: str = None) -> "RunJournal":
+        """Open a journal for a new run of the given kind (e.g. 'weekly')."""
+        journal = cls(f"{kind}-{datetime.datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}", path)
+        with journal._lock:
+            journal._conn.execute("INSERT INTO runs (run_id, kind, started_at) VALUES (?, ?, ?)",
+                                  (journal.run_id, kind, cls._now()))
+            journal._conn.commit()
+        return journal
+
+    @classmethod
+    def latest_unfinished(cls, kind: str, path: str = None) -> Optional["RunJournal"]:
+        """Reopen the most recent run of the given kind that did not finish, if any."""
+        probe = cls("", path)
+        row = probe._conn.execute(
+            "SELECT run_id FROM runs WHERE kind = ? AND finished_at IS NULL ORDER BY started_at DESC, rowid DESC LIMIT 1",
+            (kind,)
+        ).fetchone()
+        probe._conn.close()
+        return cls(row[0], path) if row else None
+
+    def stage_done(self, stage: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM stages WHERE run_id = ? AND stage = ?", (self.run_id, stage)
+            ).fetchone() is not None
+
+    def stage_payload(self, stage: str) -> Any:
+        """Return the JSON payload saved when the stage completed, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM stages WHERE run_id = ? AND stage = ?", (self.run_id, stage)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def complete_stage(self, stage: str, payload: Any = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stages (run_id, stage, completed_at, payload) VALUES (?, ?, ?, ?)",
+                (self.run_id, stage, self._now(), json.dumps(payload, ensure_ascii=False) if payload is not None else None)
+            )
+            self._conn.commit()
+
+    def record_article(self, key: str, status: str, data: Dict[str, Any] = None) -> None:
+        """Record an article's latest status, with optional data needed to resume from it."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles (run_id, article_key, status, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (self.run_id, key, status, json.dumps(data, ensure_ascii=False) if data is not None else None, self._now())
+            )
+            self._conn.commit()
+
+    def article_statuses(self) -> Dict[str, Dict[str, Any]]:
+        """Return {article key: {'status': ..., 'data': ...}} for every article recorded in this run."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT article_key, status, data FROM articles WHERE run_id = ?", (self.run_id,)
+            ).fetchall()
+        return {key: {"status": status, "data": json.loads(data) if data else None} for key, status, data in rows}
+
+    def finish(self) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (self._now(), self.run_id))
+            self._conn.commit()
@@ -1,5 +1,12 @@
 import os
+import hashlib
+import threading
+from array import array
+from typing import List
 import openai
+from src.cache.sqlite_cache import SqliteCache
+from src.config import Config
+from src.metrics import metrics
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 if not OPENAI_API_KEY:
@@ -7,6 +14,115 @@ if not OPENAI_API_KEY:
 openai.api_key = OPENAI_API_KEY
 client = openai.OpenAI()
 
-def get_embedding(text, model="text-embedding-3-small"):
-    text = text.replace("\n", " ")
-    return client.embeddings.create(input = [text], model=model).data[0].embedding
\ No newline at end of file
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+_embedding_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> SqliteCache:
+    """Return the shared on-disk embedding cache."""
+    global _embedding_cache
+    with _cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = SqliteCache(
+                Config.EMBEDDING_CACHE_PATH,
+                table="embeddings",
+                max_entries=Config.EMBEDDING_CACHE_MAX_ENTRIES
+            )
+    return _embedding_cache
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _embedding_key(text: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+def _request_batches(texts: List[str]) -> List[List[int]]:
+    """Group text indices into requests that stay under the provider's input and token limits."""
+    batches = []
+    current = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        # Rough, conservative token estimate; keeps us clear of the per-request limit
+        tokens = len(text) // 3 + 1
+        if current and (len(current) >= Config.EMBEDDING_BATCH_SIZE
+                        or current_tokens + tokens > Config.EMBEDDING_MAX_BATCH_TOKENS):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def get_embeddings(texts: List[str], model=EMBEDDING_MODEL) -> List[List[float]]:
+    """
+    Embed many texts, packing cache misses into as few embedding requests as the
+    provider allows. Embeddings are cached on disk keyed on a hash of
+    (model, normalized text), so texts embedded before are never re-sent.
+    Returns one embedding per input text, in input order.
+    """
+    normalized = [_normalize_text(text) for text in texts]
+    cache = get_embedding_cache()
+    embeddings = [None] * len(normalized)
+
+    # Unique texts still to embed, mapped to every input position that needs them
+    pending = {}
+    for i, text in enumerate(normalized):
+        key = _embedding_key(text, model)
+        if key in pending:
+            pending[key][1].append(i)
+            continue
+        cached = cache.get(key)
+        if cached is not None:
+            embeddings[i] = array('f', cached).tolist()
+        else:
+            pending[key] = (text, [i])
+
+    keys = list(pending)
+    pending_texts = [pending[key][0] for key in keys]
+    metrics.inc("embedding_texts_total", len(texts) - len(pending_texts), result="cache_hit")
+    metrics.inc("embedding_texts_total", len(pending_texts), result="embedded")
+    for batch in _request_batches(pending_texts):
+        with metrics.timer("openai_request_seconds", endpoint="embeddings", model=model):
+            response = client.embeddings.create(input=[pending_texts[i] for i in batch], model=model)
+        metrics.record_tokens(model, response.usage.prompt_tokens)
+        for item in response.data:
+            key = keys[batch[item.index]]
+            cache.set(key, array('f', item.embedding).tobytes())
+            for position in pending[key][1]:
+                embeddings[position] = item.embedding
+    return embeddings
+
+
+def uncached_embedding_texts(texts: List[str], model=EMBEDDING_MODEL) -> List[List[str]]:
+    """
+    Normalized texts with no cached embedding, deduplicated and grouped into
+    request-sized batches, for embedding them outside get_embeddings (batch jobs).
+    """
+    cache = get_embedding_cache()
+    pending = {}
+    for text in texts:
+        text = _normalize_text(text)
+        key = _embedding_key(text, model)
+        if key not in pending and cache.get(key) is None:
+            pending[key] = text
+    pending_texts = list(pending.values())
+    return [[pending_texts[i] for i in batch] for batch in _request_batches(pending_texts)]
+
+
+def cache_embeddings(texts: List[str], embeddings: List[List[float]], model=EMBEDDING_MODEL) -> None:
+    """Store embeddings made outside get_embeddings, so get_embeddings finds them."""
+    cache = get_embedding_cache()
+    for text, embedding in zip(texts, embeddings):
+        cache.set(_embedding_key(_normalize_text(text), model), array('f', embedding).tobytes())
+
+
+def get_embedding(text, model=EMBEDDING_MODEL):
+    return get_embeddings([text], model=model)[0]
@@ -0,0 +1,158 @@
+import importlib
+import json
+import os
+import shutil
+import types
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator
+
+from src.config import Config
+from src.logging.colorlog_config import get_color_logger
+
+logger = get_color_logger()
+
+# Batch statuses after which a job's results will not change
+TERMINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+class BatchEndpoint(ABC):
+    """
+    Where batch jobs run. A job is a JSONL file of requests in the OpenAI batch
+    format ({"custom_id", "method", "url", "body"} per line); its results are
+    lines of {"custom_id", "response": {"status_code", "body"}, "error"}.
+    """
+
+    @abstractmethod
+    def submit(self, requests_path: str, url: str) -> str:
+        """Submit the request file for the given API path (e.g. '/v1/embeddings') and return the batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Return 'in_progress' or one of TERMINAL_STATUSES."""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield the result lines of a finished batch, failed requests included."""
+
+
+class OpenAIBatchEndpoint(BatchEndpoint):
+    """OpenAI Batch API: results within 24 hours at half the synchronous price."""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import src.llm
+            self._client = src.llm.client
+        return self._client
+
+    def submit(self, requests_path: str, url: str) -> str:
+        with open(requests_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(input_file_id=uploaded.id, endpoint=url, completion_window="24h")
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        status = self.client.batches.retrieve(batch_id).status
+        return status if status in TERMINAL_STATUSES else 'in_progress'
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _as_dict(value: Any) -> Any:
+    """API response objects (pydantic models or plain namespaces) as JSON-ready data."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if isinstance(value, types.SimpleNamespace):
+        value = vars(value)
+    if isinstance(value, dict):
+        return {key: _as_dict(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_as_dict(item) for item in value]
+    return value
+
+
+class LocalBatchEndpoint(BatchEndpoint):
+    """
+    Stand-in that runs a batch through the synchronous client (src.llm.client, or
+    whatever replaces it), for testing the batch flow end to end. A batch is run
+    in full the first time its status is polled; files live under `directory`.
+    """
+
+    def __init__(self, directory: str = None, workers: int = None):
+        self.directory = directory or os.path.join(Config.BATCH_WORK_DIR, "local")
+        self.workers = workers or Config.UPLOAD_CLASSIFY_WORKERS
+
+    def _path(self, batch_id: str, name: str) -> str:
+        return os.path.join(self.directory, batch_id, name)
+
+    def submit(self, requests_path: str, url: str) -> str:
+        batch_id = f"local-{uuid.uuid4().hex[:12]}"
+        os.makedirs(os.path.dirname(self._path(batch_id, "input.jsonl")), exist_ok=True)
+        shutil.copyfile(requests_path, self._path(batch_id, "input.jsonl"))
+        return batch_id
+
+    def _execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        import src.llm
+
+        create = {
+            "/v1/embeddings": src.llm.client.embeddings.create,
+            "/v1/chat/completions": src.llm.client.chat.completions.create,
+        }.get(request["url"])
+        try:
+            if create is None:
+                raise ValueError(f"Unsupported batch url: {request['url']}")
+            body = _as_dict(create(**request["body"]))
+            return {"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}, "error": None}
+        except Exception as e:
+            return {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+
+    def status(self, batch_id: str) -> str:
+        output_path = self._path(batch_id, "output.jsonl")
+        if not os.path.exists(output_path):
+            with open(self._path(batch_id, "input.jsonl"), "r", encoding="utf-8") as f:
+                requests = [json.loads(line) for line in f if line.strip()]
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(self._execute, requests))
+            with open(output_path + ".tmp", "w", encoding="utf-8") as f:
+                for result in results:
+                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+            os.replace(output_path + ".tmp", output_path)
+        return 'completed'
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        with open(self._path(batch_id, "output.jsonl"), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def get_batch_endpoint(name: str = None) -> BatchEndpoint:
+    """
+    Batch endpoint named by Config.BATCH_ENDPOINT: 'openai', 'local', or the
+    'package.module:ClassName' of another BatchEndpoint subclass.
+    """
+    name = name or Config.BATCH_ENDPOINT
+    if name == 'openai':
+        return OpenAIBatchEndpoint()
+    if name == 'local':
+        return LocalBatchEndpoint()
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown batch endpoint: {name}")
+    endpoint_class = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(endpoint_class, type) and issubclass(endpoint_class, BatchEndpoint)):
+        raise TypeError(f"Batch endpoint {name} is not a BatchEndpoint subclass")
+    # Instantiating fails here, before any job is prepared, if the class leaves a method unimplemented
+    return endpoint_class()
@@ -1,47 +1,25 @@
 import json
 import os
-from typing import Dict, List, Any
+import time
+from typing import Dict, List, Any, Optional, Tuple
 import openai
 
+from src.config import Config
 from src.db import get_similar_articles
+from src.llm.prompt_builder import PromptBuilder, count_tokens
+from src.llm.response_cache import LLMResponseCache
+from src.logging.colorlog_config import get_color_logger
+from src.metrics import metrics
 
+logger = get_color_logger()
 
-class HangarFireAnalyzer:
-    def __init__(self):
-        api_key = os.getenv('OPENAI_API_KEY')
-        self.client = openai.OpenAI(api_key=api_key)
-
-    def create_analysis_prompt(self, existing_articles: List[Dict], new_article: Dict) -> str:
-        """
-        Create a prompt for analyzing the new article against existing articles.
-        """
-        prompt = f"""You are an expert analyst specializing in aviation hangar fire incidents. Your task is to analyze a new article and provide structured information about it.
-
-EXISTING ARTICLES FOR COMPARISON:
-"""
-        for i, article in enumerate(existing_articles):
-            prompt += f"""
-Article {i + 1}:
-Title: {article.get('title', '')}
-Article Date: {article.get('publishedAt', '')}
-Article Links: {str(article.get('url', ''))}
-Location: {article.get('location', '')}
-Description: {article.get('description', '')}
-Content: {article.get('content', '')}
-"""
-        prompt += f"""
-NEW ARTICLE TO ANALYZE:
-Title: {new_article.get('title', '')}
-Article Date: {new_article.get('publishedAt', '')}
-Article Links: {str(new_article.get('url', ''))}
-Location: {new_article.get('location', '')}
-Description: {new_article.get('description', '')}
-Content: {new_article.get('content', '')}
-"""
-        prompt += f"""
-ANALYSIS REQUIREMENTS:
 
-1. **is_valid** (boolean):
+class HangarFireAnalyzer:
+    MODEL = Config.ANALYSIS_MODEL
+    SCREEN_MODEL = Config.ANALYSIS_SCREEN_MODEL
+    TEMPERATURE = 0.1  # Low temperature for consistent analysis
+    # Static instructions, sent first so every request shares the same prefix for provider-side prompt caching
+    VALIDITY_REQUIREMENT = """1. **is_valid** (boolean):
    Include ONLY incidents that meet ALL of the following criteria:
    • Occurred in ACTIVE aircraft hangars (MRO, commercial, or military aviation)
    • Fire originated in OR affected the hangar structure or operations
@@ -54,7 +32,11 @@ ANALYSIS REQUIREMENTS:
    • Non-fire-related incidents (false alarms, power outages, maintenance issues)
    • Events related to accidental discharge if it does not involve aircraft or the suppression system causing a fire-related incident
    
-   True only if the article describes a valid aviation hangar fire incident or accidental discharge event involving a malfunction of fire suppression systems.
+   True only if the article describes a valid aviation hangar fire incident or accidental discharge event involving a malfunction of fire suppression systems."""
+
+    ANALYSIS_REQUIREMENTS = """ANALYSIS REQUIREMENTS:
+
+""" + VALIDITY_REQUIREMENT + """
 
 2. **duplicate_index** (integer 0-3):
    Compare the new article with the 3 existing articles:
@@ -70,35 +52,223 @@ ANALYSIS REQUIREMENTS:
 4. **country_region** (string):
    • Extract the country where the incident occurred
    • If country not clear, provide the region/state/province
-   • Use standard country names (e.g., "United States", "United Kingdom")
+   • Use standard country names (e.g., "United States", "United Kingdom")"""
+
+    SYSTEM_PROMPT = """You are an expert analyst specializing in aviation hangar fire incidents. Your task is to analyze a new article and provide structured information about it.
+
+The user message lists the EXISTING ARTICLES FOR COMPARISON followed by the NEW ARTICLE TO ANALYZE.
+
+""" + ANALYSIS_REQUIREMENTS + """
 
 RESPONSE FORMAT:
 Return ONLY a valid JSON object with this exact structure:
-{{
+{
     "is_valid": boolean,
     "duplicate_index": integer (0-3),
     "airport_hangar_name": "string",
     "country_region": "string"
-}}
+}
 
 Be thorough in your analysis and ensure accuracy in classification."""
 
+    BATCH_SYSTEM_PROMPT = """You are an expert analyst specializing in aviation hangar fire incidents. Your task is to analyze several new articles and provide structured information about each of them.
+
+The user message contains numbered CASES. Each case lists its own EXISTING ARTICLES FOR COMPARISON followed by the NEW ARTICLE TO ANALYZE. Analyze every case independently: duplicate_index refers only to the existing articles of the same case.
+
+""" + ANALYSIS_REQUIREMENTS + """
+
+RESPONSE FORMAT:
+Return ONLY a valid JSON object with one result per case, in case order:
+{
+    "results": [
+        {
+            "case": integer (the case number),
+            "is_valid": boolean,
+            "duplicate_index": integer (0-3),
+            "airport_hangar_name": "string",
+            "country_region": "string"
+        }
+    ]
+}
+
+Be thorough in your analysis and ensure accuracy in classification."""
+
+    # Structured output schema of a batched analysis
+    BATCH_RESPONSE_FORMAT = {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "hangar_fire_analyses",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "results": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "case": {"type": "integer"},
+                                "is_valid": {"type": "boolean"},
+                                "duplicate_index": {"type": "integer"},
+                                "airport_hangar_name": {"type": "string"},
+                                "country_region": {"type": "string"},
+                            },
+                            "required": ["case", "is_valid", "duplicate_index", "airport_hangar_name", "country_region"],
+                            "additionalProperties": False,
+                        },
+                    },
+                },
+                "required": ["results"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+    SCREEN_SYSTEM_PROMPT = """You are an expert analyst specializing in aviation hangar fire incidents. Your task is to screen news articles, from their title and description only, before a detailed analysis.
+
+The user message contains numbered ARTICLES. For each one, estimate the probability that it meets this requirement:
+
+""" + VALIDITY_REQUIREMENT + """
+
+RESPONSE FORMAT:
+Return ONLY a valid JSON object with one result per article, in article order:
+{
+    "results": [
+        {
+            "case": integer (the article number),
+            "valid_probability": number (0.0-1.0)
+        }
+    ]
+}
+
+When the title and description leave it open whether the incident qualifies, return a probability near 0.5."""
+
+    SCREEN_RESPONSE_FORMAT = {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "hangar_fire_screen",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "results": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "case": {"type": "integer"},
+                                "valid_probability": {"type": "number"},
+                            },
+                            "required": ["case", "valid_probability"],
+                            "additionalProperties": False,
+                        },
+                    },
+                },
+                "required": ["results"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+    def __init__(self, prompt_token_budget: Optional[int] = Config.ANALYSIS_PROMPT_TOKEN_BUDGET,
+                 cascade: bool = None, use_cache: bool = None):
+        """
+        Args:
+            prompt_token_budget: Maximum prompt tokens per analysis, None for no limit.
+            cascade: Screen articles with SCREEN_MODEL before the full analysis.
+                Defaults to Config.ANALYSIS_CASCADE_ENABLED.
+            use_cache: Reuse replies to identical questions from the LLM response cache.
+                Defaults to Config.LLM_CACHE_ENABLED.
+        """
+        self.cascade = Config.ANALYSIS_CASCADE_ENABLED if cascade is None else cascade
+        if Config.LLM_CACHE_ENABLED if use_cache is None else use_cache:
+            self.response_cache = LLMResponseCache(LLMResponseCache.fingerprint(
+                self.SYSTEM_PROMPT, self.BATCH_SYSTEM_PROMPT, self.SCREEN_SYSTEM_PROMPT,
+                json.dumps(self.BATCH_RESPONSE_FORMAT), json.dumps(self.SCREEN_RESPONSE_FORMAT)
+            ))
+        else:
+            self.response_cache = None
+        api_key = os.getenv('OPENAI_API_KEY')
+        self.client = openai.OpenAI(api_key=api_key)
+        self.system_prompt_tokens = count_tokens(self.SYSTEM_PROMPT, self.MODEL)
+        # The budget covers the whole request; the builder fits the user message into what the system prompt leaves
+        self.prompt_builder = PromptBuilder(
+            self.MODEL, None if prompt_token_budget is None else prompt_token_budget - self.system_prompt_tokens
+        )
+
+    def create_analysis_prompt(self, existing_articles: List[Dict], new_article: Dict) -> str:
+        """
+        Create the per-article part of the prompt (the user message) for analyzing
+        the new article against existing articles, within the analyzer's token budget.
+        """
+        return self.build_analysis_messages(existing_articles, new_article)[0][1]["content"]
+
+    def build_analysis_messages(self, existing_articles: List[Dict],
+                                new_article: Dict) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+        """
+        Create the chat messages for one analysis: the static instructions as the
+        system message and the articles, fitted to the token budget, as the user message.
+        Returns the messages and the prompt's token counts before and after fitting.
+        """
+        prompt, prompt_stats = self.prompt_builder.build(existing_articles, new_article, self._render_prompt)
+        prompt_stats = {**prompt_stats,
+                        "full_tokens": prompt_stats["full_tokens"] + self.system_prompt_tokens,
+                        "tokens": prompt_stats["tokens"] + self.system_prompt_tokens}
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+        return messages, prompt_stats
+
+    @staticmethod
+    def _render_prompt(existing_articles: List[Dict], new_article: Dict) -> str:
+        """
+        Render the user message from the given article fields.
+        """
+        prompt = """EXISTING ARTICLES FOR COMPARISON:
+"""
+        for i, article in enumerate(existing_articles):
+            prompt += f"""
+Article {i + 1}:
+Title: {article.get('title', '')}
+Article Date: {article.get('publishedAt', '')}
+Article Links: {str(article.get('url', ''))}
+Location: {article.get('location', '')}
+Description: {article.get('description', '')}
+Content: {article.get('content', '')}
+"""
+        prompt += f"""
+NEW ARTICLE TO ANALYZE:
+Title: {new_article.get('title', '')}
+Article Date: {new_article.get('publishedAt', '')}
+Article Links: {str(new_article.get('url', ''))}
+Location: {new_article.get('location', '')}
+Description: {new_article.get('description', '')}
+Content: {new_article.get('content', '')}
+"""
         return prompt
     
-    def _analyze_article(self, existing_articles: List[Dict], new_article: Dict) -> Dict[str, Any]:
+    def _complete(self, messages: List[Dict[str, str]], response_format: Dict[str, Any], max_tokens: int,
+                  model: str = None) -> Dict[str, Any]:
         """
-        Analyze a new article against existing ones
+        Send one chat request, record its latency and token usage, and parse the JSON reply.
         """
-        prompt = self.create_analysis_prompt(existing_articles, new_article)
-        
+        model = model or self.MODEL
+        result_text = None
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.1,  # Low temperature for consistent analysis
-                max_tokens=200
-            )
+            with metrics.timer("openai_request_seconds", endpoint="chat", model=model):
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    response_format=response_format,
+                    temperature=self.TEMPERATURE,
+                    max_tokens=max_tokens
+                )
+            usage = response.usage
+            if usage is not None:
+                details = getattr(usage, "prompt_tokens_details", None)
+                metrics.record_tokens(model, usage.prompt_tokens, usage.completion_tokens,
+                                      getattr(details, "cached_tokens", 0) or 0)
             
             result_text = response.choices[0].message.content.strip()
             # Parse JSON response
@@ -107,29 +277,284 @@ Be thorough in your analysis and ensure accuracy in classification."""
             return result
             
         except json.JSONDecodeError as e:
+            metrics.inc("openai_errors_total", endpoint="chat", kind="invalid_json")
             print(f"JSON parsing error: {e}")
             print(f"Raw response: {result_text}")
             raise
         except Exception as e:
+            metrics.inc("openai_errors_total", endpoint="chat", kind="api")
             print(f"API call error: {e}")
             raise
+
+    def _cached(self, model: str, messages: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        """Reply stored for these exact messages, if the response cache is on and has one."""
+        if self.response_cache is None:
+            return None
+        reply = self.response_cache.get(model, self.TEMPERATURE, messages)
+        metrics.inc("llm_cache_total", outcome="miss" if reply is None else "hit", model=model)
+        return reply
+
+    def _remember(self, model: str, messages: List[Dict[str, str]], reply: Dict[str, Any]) -> None:
+        if self.response_cache is not None:
+            self.response_cache.set(model, self.TEMPERATURE, messages, reply)
+
+    @staticmethod
+    def _screen_entry(i: int, article: Dict) -> str:
+        return f"\n=== ARTICLE {i} ===\nTitle: {article.get('title', '')}\nDescription: {article.get('description', '')}\n"
+
+    def _screen_messages(self, user_message: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.SCREEN_SYSTEM_PROMPT},
+            {"role": "user", "content": user_message},
+        ]
+
+    def screen(self, articles: List[Dict]) -> List[float]:
+        """
+        Estimate with SCREEN_MODEL, from the title and description alone, the probability
+        that each article is a valid incident. All articles go in one request.
+        Articles the reply does not answer get 1.0, so they go on to the full analysis.
+        """
+        probabilities = [1.0] * len(articles)
+        # Cached per article, as if each had been screened alone, so hits do not depend on batching
+        single_messages = [self._screen_messages(self._screen_entry(1, article)) for article in articles]
+        pending = []
+        for i, messages in enumerate(single_messages):
+            cached = self._cached(self.SCREEN_MODEL, messages)
+            if cached is not None:
+                probabilities[i] = float(cached["valid_probability"])
+            else:
+                pending.append(i)
+        if not pending:
+            return probabilities
+
+        user_message = "".join(self._screen_entry(case, articles[i]) for case, i in enumerate(pending, start=1))
+        try:
+            reply = self._complete(self._screen_messages(user_message), self.SCREEN_RESPONSE_FORMAT,
+                                   max_tokens=20 * len(pending) + 50, model=self.SCREEN_MODEL)
+        except Exception as e:
+            logger.warning(f"Screening failed, sending {len(pending)} articles to the full analysis: {str(e)}")
+            return probabilities
+        for result in reply.get("results", []) if isinstance(reply, dict) else []:
+            case = result.get("case") if isinstance(result, dict) else None
+            probability = result.get("valid_probability") if isinstance(result, dict) else None
+            if isinstance(case, int) and 1 <= case <= len(pending) and isinstance(probability, (int, float)):
+                i = pending[case - 1]
+                probabilities[i] = float(probability)
+                self._remember(self.SCREEN_MODEL, single_messages[i], {"valid_probability": probabilities[i]})
+        return probabilities
+
+    def _screen_out(self, cases: List[Tuple[List[Dict], Dict]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Screen the cases' articles when the cascade is on. Returns, per case, the
+        rejection result for articles screened out, or None for articles to analyze.
+        """
+        if not self.cascade or not cases:
+            return [None] * len(cases)
+        probabilities = self.screen([article for _, article in cases])
+        rejections = []
+        for probability in probabilities:
+            rejected = probability < Config.ANALYSIS_SCREEN_REJECT_BELOW
+            metrics.inc("analysis_screened_total", outcome="rejected" if rejected else "passed")
+            rejections.append({
+                "is_valid": False, "duplicate_index": 0, "airport_hangar_name": "", "country_region": "",
+                "screen_probability": probability,
+            } if rejected else None)
+        return rejections
+
+    def _fit_case(self, existing_articles: List[Dict], new_article: Dict) -> str:
+        """
+        Render one article's comparison within the token budget and count the tokens saved.
+        """
+        prompt, prompt_stats = self.prompt_builder.build(existing_articles, new_article, self._render_prompt)
+        metrics.inc("analysis_prompts_total", trimmed=prompt_stats["saved_tokens"] > 0)
+        if prompt_stats["saved_tokens"]:
+            metrics.inc("prompt_tokens_saved_total", prompt_stats["saved_tokens"], model=self.MODEL)
+        return prompt
+
+    def analysis_request(self, similar_articles: List[Dict], article: Dict) -> Optional[Dict[str, Any]]:
+        """
+        Chat request body of the single-article analysis, for submitting it as a batch
+        job, or None if the response cache already holds the reply.
+        """
+        messages = self._analysis_messages(self._fit_case(similar_articles, article))
+        if self._cached(self.MODEL, messages) is not None:
+            return None
+        return {
+            "model": self.MODEL,
+            "messages": messages,
+            "response_format": {"type": "json_object"},
+            "temperature": self.TEMPERATURE,
+            "max_tokens": 200,
+        }
+
+    def store_analysis_reply(self, request: Dict[str, Any], reply: Dict[str, Any]) -> None:
+        """Cache the reply to a request from `analysis_request`, so classify finds it."""
+        self._remember(request["model"], request["messages"], reply)
+
+    def _analysis_messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _analyze_prompt(self, prompt: str) -> Dict[str, Any]:
+        """
+        Analyze one new article, given its fitted comparison prompt, and cache the reply.
+        """
+        messages = self._analysis_messages(prompt)
+        result = self._complete(messages, {"type": "json_object"}, max_tokens=200)
+        self._remember(self.MODEL, messages, result)
+        return result
+
+    def _analyze_batch(self, prompts: List[str]) -> Dict[int, Dict[str, Any]]:
+        """
+        Analyze several new articles, given their fitted comparison prompts, in one request.
+        Returns {prompt index: result} for the prompts the reply answered.
+        """
+        user_message = "".join(f"\n=== CASE {i + 1} ===\n{prompt}" for i, prompt in enumerate(prompts))
+        messages = [
+            {"role": "system", "content": self.BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": user_message},
+        ]
+        reply = self._complete(messages, self.BATCH_RESPONSE_FORMAT, max_tokens=60 * len(prompts) + 50)
+        results = {}
+        for result in reply.get("results", []) if isinstance(reply, dict) else []:
+            case = result.get("case") if isinstance(result, dict) else None
+            if isinstance(case, int) and 1 <= case <= len(prompts) and isinstance(result.get("is_valid"), bool):
+                results[case - 1] = {key: value for key, value in result.items() if key != "case"}
+                # Cached under the single-article question, so hits do not depend on batching
+                self._remember(self.MODEL, self._analysis_messages(prompts[case - 1]), results[case - 1])
+        return results
     
-    def analyze_article(self, article: Dict) -> Dict[str, Any]:
+    @staticmethod
+    def embedding_text(article: Dict) -> str:
         """
-        Add a new article to the database or storage.
-        This method should implement the logic to store the article.
+        Text used to embed an incoming article for the similarity lookup.
         """
-        combined_text = f"""Title: {article.get('title', '')}
+        return f"""Title: {article.get('title', '')}
 Location: {article.get('location', "")}
 Description: {article.get('description', "")}
 Content: {article.get('content', "")}""".strip()
 
+    @staticmethod
+    def _resolve_duplicate(similar_articles: List[Dict], analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Clamp the duplicate index to the compared articles and add the matching article's id.
+        """
+        duplicate_index = analysis_result.get("duplicate_index", 0)
+        if not isinstance(duplicate_index, int) or not 0 <= duplicate_index <= len(similar_articles):
+            duplicate_index = 0
+        analysis_result["duplicate_index"] = duplicate_index
+        if duplicate_index > 0:
+            analysis_result["id"] = similar_articles[duplicate_index - 1].get("id", None)
+        return analysis_result
+
+    def classify(self, similar_articles: List[Dict], article: Dict, screen: bool = True) -> Dict[str, Any]:
+        """
+        Classify an article against its nearest stored articles and resolve the
+        duplicate index to the matching article's id.
+        """
+        return self.classify_batch([(similar_articles, article)], screen)[0]
+
+    def classify_batch(self, cases: List[Tuple[List[Dict], Dict]], screen: bool = True) -> List[Dict[str, Any]]:
+        """
+        Classify several articles, each against its own nearest stored articles, in
+        one structured-output request. Articles the reply does not answer, or every
+        article if the reply cannot be parsed, are classified one by one. With the
+        cascade on, articles the screen rejects skip the full analysis.
+
+        Args:
+            cases: (similar articles, article) pairs.
+            screen: Apply the cascade's screen, if enabled. Off for articles that already passed it.
+
+        Returns:
+            List[Dict[str, Any]]: One analysis result per case, in case order.
+        """
+        rejections = self._screen_out(cases) if screen else [None] * len(cases)
+        results = {i: rejection for i, rejection in enumerate(rejections) if rejection}
+        prompts = {i: self._fit_case(*cases[i]) for i in range(len(cases)) if i not in results}
+        analyses = {}
+        for i, prompt in prompts.items():
+            cached = self._cached(self.MODEL, self._analysis_messages(prompt))
+            if cached is not None:
+                analyses[i] = cached
+        remaining = [i for i in prompts if i not in analyses]
+        if len(remaining) == 1:
+            analyses[remaining[0]] = self._analyze_prompt(prompts[remaining[0]])
+        elif remaining:
+            try:
+                answered = self._analyze_batch([prompts[i] for i in remaining])
+            except json.JSONDecodeError:
+                answered = {}
+            metrics.inc("analysis_batches_total")
+            missing = [i for position, i in enumerate(remaining) if position not in answered]
+            if missing:
+                logger.warning(f"Batched analysis answered {len(remaining) - len(missing)} of {len(remaining)} articles; "
+                               f"analyzing the other {len(missing)} one by one.")
+                metrics.inc("analysis_batch_fallbacks_total", len(missing))
+            for position, i in enumerate(remaining):
+                analyses[i] = answered[position] if position in answered else self._analyze_prompt(prompts[i])
+        for i, analysis_result in analyses.items():
+            results[i] = self._resolve_duplicate(cases[i][0], analysis_result)
+        return [results[i] for i in range(len(cases))]
+
+    def analyze_article(self, article: Dict) -> Dict[str, Any]:
+        """
+        Find the articles most similar to the given one and classify it against them.
+        Returns the analysis result and the article's embedding.
+        """
+        combined_text = self.embedding_text(article)
+
         similar_articles, query_embedding = get_similar_articles(combined_text, limit=3)
 
-        analysis_result = self._analyze_article(similar_articles, article)
-        
-        if analysis_result["duplicate_index"] > 0:
-            analysis_result["id"] = similar_articles[analysis_result["duplicate_index"] - 1].get("id", None)
-        print(f"Analysis result: {analysis_result}")
+        analysis_result = self.classify(similar_articles, article)
+        logger.debug(f"Analysis result: {analysis_result}")
         
         return analysis_result, query_embedding
+
+
+def evaluate_cascade(cases: List[Dict[str, Any]], batch_size: int = None) -> Dict[str, Any]:
+    """
+    Classify a labelled set with and without the screening cascade and compare
+    accuracy, latency and estimated cost.
+
+    Args:
+        cases: Dicts with "article", "existing" (the compared articles) and optionally
+            "expected" ({"is_valid", "duplicate_index"}).
+        batch_size: Articles per request, as in the upload pipeline. Defaults to Config.ANALYSIS_BATCH_SIZE.
+
+    Returns:
+        Dict[str, Any]: Per mode ('full', 'cascade'): seconds, estimated cost, accuracy against
+        the labels and valid articles missed; plus the agreement between modes and the cases that differ.
+    """
+    batch_size = batch_size or Config.ANALYSIS_BATCH_SIZE
+    report: Dict[str, Any] = {"cases": len(cases), "batch_size": batch_size}
+    decisions = {}
+    for mode in ("full", "cascade"):
+        # Without the response cache, so the second mode does not reuse the first one's replies
+        analyzer = HangarFireAnalyzer(cascade=mode == "cascade", use_cache=False)
+        cost_before = metrics.total("cost_usd_total")
+        start = time.perf_counter()
+        results = []
+        for offset in range(0, len(cases), batch_size):
+            chunk = cases[offset:offset + batch_size]
+            results += analyzer.classify_batch([(case["existing"], case["article"]) for case in chunk])
+        elapsed = time.perf_counter() - start
+
+        decisions[mode] = [(result.get("is_valid"), result.get("duplicate_index")) for result in results]
+        labelled = [(decision, case["expected"]) for decision, case in zip(decisions[mode], cases) if case.get("expected")]
+        correct = sum(decision == (expected.get("is_valid"), expected.get("duplicate_index")) for decision, expected in labelled)
+        report[mode] = {
+            "seconds": round(elapsed, 2),
+            "cost_usd": round(metrics.total("cost_usd_total") - cost_before, 4),
+            "accuracy": round(correct / len(labelled), 4) if labelled else None,
+            "missed_valid": sum(1 for decision, expected in labelled if expected.get("is_valid") and not decision[0]),
+        }
+
+    changed = [
+        {"case": i, "title": case["article"].get("title"), "full": full, "cascade": cascade}
+        for i, (case, full, cascade) in enumerate(zip(cases, decisions["full"], decisions["cascade"])) if full != cascade
+    ]
+    report["agreement"] = round((len(cases) - len(changed)) / len(cases), 4) if cases else None
+    report["changed"] = changed
+    return report
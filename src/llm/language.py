@@ -1,11 +1,49 @@
 import asyncio
+import threading
 import time
+from typing import Tuple
 from googletrans import Translator
+from src.cache.sqlite_cache import SqliteCache
+from src.config import Config
+from src.metrics import metrics
+
+# Single translator whose async client lives on a dedicated event loop thread,
+# so connections are reused and calls can be made from any thread.
+_translator = None
+_translator_loop = None
+_translation_cache = None
+_init_lock = threading.Lock()
+
+
+def _get_translator():
+    global _translator, _translator_loop
+    with _init_lock:
+        if _translator is None:
+            _translator_loop = asyncio.new_event_loop()
+            threading.Thread(target=_translator_loop.run_forever, name="googletrans", daemon=True).start()
+            _translator = Translator()
+    return _translator, _translator_loop
+
+
+def get_translation_cache() -> SqliteCache:
+    """Return the shared on-disk translation cache."""
+    global _translation_cache
+    with _init_lock:
+        if _translation_cache is None:
+            _translation_cache = SqliteCache(
+                Config.TRANSLATION_CACHE_PATH,
+                table="translations",
+                max_entries=Config.TRANSLATION_CACHE_MAX_ENTRIES
+            )
+    return _translation_cache
+
 
 def translate_text(text: str, target_language: str, source_language: str = None) -> str:
     """
     Translate text from source_language to target_language using Google Translate.
     If source_language is None, it will be auto-detected.
+    Results are cached on disk keyed on (text, source, target), so only strings
+    not seen before reach the translator.
     Args:
         text (str): The text to translate.
         target_language (str): The target language code (e.g., 'en', 'fr').
@@ -13,15 +51,45 @@ def translate_text(text: str, target_language: str, source_language: str = None)
     Returns:
         str: The translated text.
     """
-    translator = Translator()
+    if not text:
+        return text
+
+    cache = get_translation_cache()
+    key = "\x1f".join([source_language or "auto", target_language, text])
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.inc("translations_total", result="cache_hit")
+        return cached
+
+    translator, loop = _get_translator()
     if source_language:
-        result = asyncio.run(translator.translate(text, src=source_language, dest=target_language))
+        coroutine = translator.translate(text, src=source_language, dest=target_language)
     else:
-        result = asyncio.run(translator.translate(text, dest=target_language))
-    time.sleep(1)
+        coroutine = translator.translate(text, dest=target_language)
+    with metrics.timer("translate_request_seconds"):
+        result = asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+    metrics.inc("translations_total", result="translated")
+    time.sleep(Config.TRANSLATION_MIN_INTERVAL)
+    metrics.inc("translation_sleep_seconds_total", Config.TRANSLATION_MIN_INTERVAL)
+    cache.set(key, result.text)
     return result.text
 
 
+def to_english(text: str, language: str) -> Tuple[str, str]:
+    """
+    Return text in English along with where the English text came from:
+    'original' if it was already English, otherwise 'googletrans'.
+    Args:
+        text (str): The text to translate.
+        language (str): The language code of the text.
+    Returns:
+        Tuple[str, str]: The English text and its source.
+    """
+    if not text or not language or language == 'en':
+        return text, 'original'
+    return translate_text(text, 'en', language), 'googletrans'
+
+
 def translate_query(query: str, target_language: str) -> str:
     """
     Split the query by spaces, translate each part to the target language, and combine them.
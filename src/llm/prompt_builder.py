@@ -0,0 +1,216 @@
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import Config
+from src.llm.relevance import LEXICONS
+from src.logging.colorlog_config import get_color_logger
+
+logger = get_color_logger()
+
+# Article fields that can be long; every other field is rendered as is
+LONG_FIELDS = ('description', 'content')
+# Share of the field budget given to the new article relative to each compared one
+NEW_ARTICLE_WEIGHT = 2.0
+
+_SENTENCE_END = re.compile(r'(?<=[.!?。！？])\s+')
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model: str):
+    """tiktoken encoding for the model, or None when tiktoken or its encoding files are unavailable."""
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                import tiktoken
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                logger.warning(f"tiktoken unavailable for {model} ({str(e)}); estimating tokens from text length.")
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens of text locally, or estimate them at ~4 characters per token without tiktoken."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class PromptBuilder:
+    """
+    Fits an analysis prompt into a token budget.
+
+    The prompt is rendered in full first and sent as is when it fits. Otherwise
+    the long fields (description and content) of the compared articles and the
+    new article share what is left of the budget after the fixed text: short
+    fields keep their full text and the rest is split by weight, the new article
+    getting twice the share of each compared one. A field over its share keeps
+    its lead sentence plus the sentences that mention the new article's title
+    words or incident terms, in their original order. Link lists are capped at
+    Config.ANALYSIS_PROMPT_MAX_LINKS.
+    """
+
+    def __init__(self, model: str, token_budget: Optional[int] = None, max_links: int = None):
+        self.model = model
+        self.token_budget = token_budget
+        self.max_links = Config.ANALYSIS_PROMPT_MAX_LINKS if max_links is None else max_links
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def build(self, existing_articles: List[Dict], new_article: Dict,
+              render: Callable[[List[Dict], Dict], str]) -> Tuple[str, Dict[str, int]]:
+        """
+        Render the prompt within the token budget.
+
+        Args:
+            existing_articles: Compared articles.
+            new_article: Article to analyze.
+            render: Renders a prompt from (existing_articles, new_article).
+
+        Returns:
+            Tuple[str, Dict[str, int]]: The prompt, and {"full_tokens", "tokens", "saved_tokens"}.
+        """
+        prompt = render(existing_articles, new_article)
+        full_tokens = self.count(prompt)
+        if self.token_budget is None or full_tokens <= self.token_budget:
+            return prompt, {"full_tokens": full_tokens, "tokens": full_tokens, "saved_tokens": 0}
+
+        articles = [self._cap_links(article) for article in existing_articles] + [self._cap_links(new_article)]
+        fields = [(i, field) for i, article in enumerate(articles) for field in LONG_FIELDS if article.get(field)]
+        stripped = [{**article, **{field: "" for field in LONG_FIELDS if article.get(field)}} for article in articles]
+        fixed_tokens = self.count(render(stripped[:-1], stripped[-1]))
+
+        sizes = [self.count(str(articles[i][field])) for i, field in fields]
+        weights = [NEW_ARTICLE_WEIGHT if i == len(articles) - 1 else 1.0 for i, _ in fields]
+        allowances = self._allocate(sizes, weights, max(self.token_budget - fixed_tokens, 0))
+
+        keywords = self._keywords(new_article)
+        fitted = [dict(article) for article in stripped]
+        for (i, field), size, allowance in zip(fields, sizes, allowances):
+            text = str(articles[i][field])
+            fitted[i][field] = text if size <= allowance else self._extract(text, allowance, keywords)
+
+        prompt = render(fitted[:-1], fitted[-1])
+        tokens = self.count(prompt)
+        return prompt, {"full_tokens": full_tokens, "tokens": tokens, "saved_tokens": full_tokens - tokens}
+
+    def _cap_links(self, article: Dict) -> Dict:
+        urls = article.get('url')
+        if isinstance(urls, list) and len(urls) > self.max_links:
+            return {**article, 'url': urls[:self.max_links]}
+        return article
+
+    @staticmethod
+    def _allocate(sizes: List[int], weights: List[float], available: int) -> List[int]:
+        """Split available tokens by weight; fields smaller than their share pass theirs on to the others."""
+        allowances = [0] * len(sizes)
+        remaining = set(range(len(sizes)))
+        while remaining:
+            total_weight = sum(weights[i] for i in remaining)
+            shares = {i: available * weights[i] / total_weight for i in remaining}
+            fitting = [i for i in remaining if sizes[i] <= shares[i]]
+            if not fitting:
+                for i in remaining:
+                    allowances[i] = int(shares[i])
+                break
+            for i in fitting:
+                allowances[i] = sizes[i]
+                available -= sizes[i]
+                remaining.discard(i)
+        return allowances
+
+    @staticmethod
+    def _keywords(article: Dict) -> set:
+        """Words that mark a sentence as relevant: the article's title and location words, and incident terms."""
+        words = set()
+        for field in ('title', 'location', 'airport_hangar_name'):
+            words.update(word.lower() for word in _WORD.findall(str(article.get(field) or '')) if len(word) > 3)
+        for language in {'en', article.get('language') or 'en'}:
+            for terms in LEXICONS.get(language, {}).values():
+                words.update(term.lower() for term in terms)
+        return words
+
+    def _extract(self, text: str, max_tokens: int, keywords: set) -> str:
+        """Keep the lead sentence and the most keyword-dense sentences that fit, in their original order."""
+        if max_tokens <= 0:
+            return ""
+        sentences = [sentence for sentence in _SENTENCE_END.split(text.strip()) if sentence]
+        lowered = [sentence.lower() for sentence in sentences]
+        hits = [sum(1 for keyword in keywords if keyword in sentence) for sentence in lowered]
+        order = sorted(range(len(sentences)), key=lambda i: (i != 0, -hits[i], i))
+
+        chosen = []
+        used = 0
+        for i in order:
+            tokens = self.count(sentences[i]) + 1
+            if used + tokens <= max_tokens:
+                chosen.append(i)
+                used += tokens
+        if not chosen:
+            return self._truncate(sentences[0], max_tokens)
+        return " ".join(sentences[i] for i in sorted(chosen)) + (" ..." if len(chosen) < len(sentences) else "")
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        encoding = _encoding(self.model)
+        if encoding is None:
+            return text[:max_tokens * 4] + " ..."
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]) + " ..."
+
+
+def evaluate_prompt_budget(cases: List[Dict[str, Any]], classify_full: Callable, classify_budgeted: Callable) -> Dict[str, Any]:
+    """
+    Compare decisions made with full and budgeted prompts on a labelled set.
+
+    Args:
+        cases: Dicts with "article", "existing" (the compared articles) and optionally
+            "expected" ({"is_valid", "duplicate_index"}).
+        classify_full, classify_budgeted: Callables (existing, article) -> (analysis, prompt stats).
+
+    Returns:
+        Dict[str, Any]: Agreement between the two, accuracy against the labels where given,
+        token counts and the cases whose decision changed.
+    """
+    changed = []
+    correct = {"full": 0, "budgeted": 0}
+    labelled = 0
+    full_tokens = 0
+    sent_tokens = 0
+    for i, case in enumerate(cases):
+        full, full_stats = classify_full(case["existing"], case["article"])
+        budgeted, budgeted_stats = classify_budgeted(case["existing"], case["article"])
+        full_tokens += full_stats["tokens"]
+        sent_tokens += budgeted_stats["tokens"]
+        decision_full = (full.get("is_valid"), full.get("duplicate_index"))
+        decision_budgeted = (budgeted.get("is_valid"), budgeted.get("duplicate_index"))
+        if decision_full != decision_budgeted:
+            changed.append({"case": i, "title": case["article"].get("title"),
+                            "full": decision_full, "budgeted": decision_budgeted})
+        expected = case.get("expected")
+        if expected:
+            labelled += 1
+            target = (expected.get("is_valid"), expected.get("duplicate_index"))
+            correct["full"] += decision_full == target
+            correct["budgeted"] += decision_budgeted == target
+
+    total = len(cases)
+    return {
+        "cases": total,
+        "agreement": round((total - len(changed)) / total, 4) if total else None,
+        "accuracy_full": round(correct["full"] / labelled, 4) if labelled else None,
+        "accuracy_budgeted": round(correct["budgeted"] / labelled, 4) if labelled else None,
+        "prompt_tokens_full": full_tokens,
+        "prompt_tokens_budgeted": sent_tokens,
+        "tokens_saved_per_call": round((full_tokens - sent_tokens) / total, 1) if total else None,
+        "changed": changed,
+    }
@@ -0,0 +1,227 @@
+import datetime
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Tuple
+
+from src.config import Config
+
+# Keyword lexicons per Config.LANGUAGES entry. "hangar" terms count towards the
+# facility score as well and earn a bonus; "system" terms (foam and fixed fire
+# suppression systems, which protect hangars) count towards the facility score.
+# Terms match whole words with one of the language's SUFFIXES; a term ending
+# in '*' is a stem and matches any word starting with it.
+LEXICONS = {
+    'en': {
+        'hangar': ['hangar'],
+        'facility': ['aircraft', 'airplane', 'aeroplane', 'plane', 'jet', 'helicopter', 'airport', 'airfield',
+                     'aviation', 'mro', 'air base', 'airbase', 'air force', 'airline'],
+        'system': ['afff', 'aqueous film', 'foam suppression', 'suppression system', 'foam system',
+                   'deluge system', 'sprinkler system', 'high-expansion foam', 'hi-ex foam', 'foam concentrate',
+                   'firefighting foam', 'fire-fighting foam'],
+        'incident': ['fire', 'blaze', 'flame', 'burn', 'burnt', 'smoke', 'explo*', 'firefight*', 'foam', 'afff',
+                     'suppression', 'extinguish*', 'discharg*', 'sprinkler', 'deluge'],
+    },
+    'es': {
+        'hangar': ['hangar'],
+        'facility': ['avión', 'avion', 'aeronave', 'aeropuerto', 'aeródromo', 'aerodromo', 'aviación',
+                     'aviacion', 'base aérea', 'helicóptero', 'aerolínea'],
+        'system': ['sistema de espuma', 'sistema de extinción', 'sistema contra incendios',
+                   'espuma contra incendios', 'espuma extintora'],
+        'incident': ['incendio', 'fuego', 'llama', 'humo', 'explosión', 'explosion', 'espuma', 'bombero',
+                     'extinción', 'descarga', 'calcin*'],
+    },
+    'fr': {
+        'hangar': ['hangar'],
+        'facility': ['avion', 'aéronef', 'aeronef', 'aéroport', 'aeroport', 'aérodrome', 'aviation',
+                     'base aérienne', 'hélicoptère', 'compagnie aérienne'],
+        'system': ["système d'extinction", 'système de mousse', 'mousse extinctrice', 'émulseur'],
+        'incident': ['incendie', 'feu', 'flamme', 'fumée', 'explosion', 'mousse', 'pompier', 'extinction',
+                     'déversement', 'brûl*'],
+    },
+    'pt': {
+        'hangar': ['hangar', 'hangares'],
+        'facility': ['avião', 'aviao', 'aeronave', 'aeroporto', 'aviação', 'aviacao', 'base aérea',
+                     'helicóptero', 'companhia aérea'],
+        'system': ['sistema de espuma', 'sistema de combate a incêndio', 'espuma de combate a incêndio',
+                   'líquido gerador de espuma'],
+        'incident': ['incêndio', 'incendio', 'fogo', 'chama', 'fumaça', 'explosão', 'espuma', 'bombeiro',
+                     'extinção', 'descarga'],
+    },
+    'de': {
+        'hangar': ['hangar', 'flugzeughalle', 'wartungshalle'],
+        'facility': ['flugzeug*', 'flughafen', 'flugplatz', 'luftfahrt*', 'fliegerhorst', 'luftwaffe',
+                     'hubschrauber', 'fluggesellschaft'],
+        'system': ['löschanlage', 'schaumlöschanlage', 'sprinkleranlage', 'löschschaum', 'schaumteppich'],
+        'incident': ['brand', 'feuer', 'flamme', 'rauch', 'explosion', 'schaum', 'löschanlage', 'feuerwehr*',
+                     'löschmittel', 'großbrand'],
+    },
+    'ru': {
+        'hangar': ['ангар'],
+        'facility': ['самолет', 'самолёт', 'аэропорт', 'аэродром', 'авиа*', 'вертолет', 'вертолёт'],
+        'system': ['система пожаротушения', 'пенное пожаротушение', 'пенообразовател*'],
+        'incident': ['пожар', 'огонь', 'огня', 'возгоран*', 'плам*', 'дым', 'взрыв', 'пена', 'пены', 'тушени*'],
+    },
+    'tr': {
+        'hangar': ['hangar'],
+        'facility': ['uçak', 'havalimanı', 'havaalanı', 'havacılık', 'hava üssü', 'helikopter'],
+        'system': ['söndürme sistemi', 'köpüklü söndürme', 'yangın söndürme köpüğü'],
+        'incident': ['yangın', 'alev', 'duman', 'patlama', 'köpük', 'itfaiye', 'söndürme'],
+    },
+    'ar': {
+        'hangar': ['حظيرة', 'هنجر', 'حظائر'],
+        'facility': ['طائرة', 'طائرات', 'مطار', 'الطيران', 'قاعدة جوية', 'مروحية'],
+        'system': ['نظام إطفاء', 'أنظمة إطفاء', 'رغوة إطفاء', 'رغوة الإطفاء'],
+        'incident': ['حريق', 'نيران', 'النار', 'دخان', 'انفجار', 'رغوة', 'الإطفاء', 'إطفاء'],
+    },
+    'zh-cn': {
+        'hangar': ['机库', '機庫'],
+        'facility': ['飞机', '航空', '机场', '直升机', '客机', '战机'],
+        'system': ['泡沫灭火', '灭火系统', '喷淋系统', '消防泡沫'],
+        'incident': ['火灾', '起火', '大火', '着火', '失火', '爆炸', '泡沫', '灭火', '消防', '燃烧'],
+    },
+    'ja': {
+        'hangar': ['格納庫', 'ハンガー'],
+        'facility': ['航空機', '飛行機', '空港', '航空', '自衛隊', 'ヘリ', '旅客機'],
+        'system': ['泡消火設備', '消火設備', 'スプリンクラー', '消火剤'],
+        'incident': ['火災', '火事', '炎上', '出火', '爆発', '泡消火', '消火', '消防', '焼'],
+    },
+}
+
+# Scripts without spaces between words are matched as plain substrings
+UNSEGMENTED_LANGUAGES = {'zh-cn', 'ja', 'ar'}
+
+# Inflections a whole-word term may take, so "plane" matches "planes" but not "planet"
+# and "fire" matches "fires" but not "fired" or "firefox"
+SUFFIXES = {
+    'en': ['s', 'es', 'ed', 'ing', 'er', 'ers'],
+    'es': ['s', 'es'],
+    'fr': ['s', 'x'],
+    'pt': ['s', 'es'],
+    'de': ['e', 'en', 'n', 'es', 's', 'er', 'ern'],
+}
+# Heavily inflected languages allow any ending up to this many letters instead
+SUFFIX_LENGTHS = {'ru': 3, 'tr': 5}
+
+WEIGHTS = {'facility': 0.4, 'incident': 0.4, 'hangar': 0.3}
+
+
+def _alternatives(terms: List[str]) -> str:
+    return '|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+
+
+def _compile(terms: List[str], language: str) -> re.Pattern:
+    if language in UNSEGMENTED_LANGUAGES:
+        return re.compile(f"(?:{_alternatives([term.rstrip('*') for term in terms])})", re.IGNORECASE)
+    stems = [term[:-1] for term in terms if term.endswith('*')]
+    words = [term for term in terms if not term.endswith('*')]
+    if language in SUFFIX_LENGTHS:
+        ending = rf"\w{{0,{SUFFIX_LENGTHS[language]}}}"
+    else:
+        ending = f"(?:{_alternatives(SUFFIXES.get(language, []))})?"
+    parts = [rf"(?:{_alternatives(stems)})\w*"] if stems else []
+    if words:
+        parts.append(f"(?:{_alternatives(words)}){ending}")
+    return re.compile(rf"\b(?:{'|'.join(parts)})\b", re.IGNORECASE)
+
+
+_PATTERNS = {
+    language: {group: _compile(terms, language) for group, terms in lexicon.items()}
+    for language, lexicon in LEXICONS.items()
+}
+
+
+class RelevanceScorer:
+    """
+    CPU-only multilingual relevance scorer used to drop obviously off-topic
+    search hits before they reach the LLM.
+
+    The score is a linear combination of keyword features over the title and
+    description: an aviation facility or fire suppression system term, a fire
+    or foam incident term and a hangar term, matched with the English lexicon plus the article's own
+    language lexicon. Articles scoring below the threshold are rejected and
+    written to a JSONL audit log.
+    """
+
+    def __init__(self, threshold: float = None, audit_log_path: str = None):
+        self.threshold = Config.RELEVANCE_THRESHOLD if threshold is None else threshold
+        self.audit_log_path = audit_log_path or Config.RELEVANCE_AUDIT_LOG
+        self._audit_lock = threading.Lock()
+
+    def score(self, article: Dict[str, Any]) -> Tuple[float, Dict[str, List[str]]]:
+        """Return the relevance score of an article and the keywords that matched per group."""
+        text = f"{article.get('title') or ''}\n{article.get('description') or ''}"
+        languages = ['en']
+        if article.get('language') in _PATTERNS and article.get('language') != 'en':
+            languages.append(article['language'])
+
+        matched = {group: [] for group in _PATTERNS['en']}
+        for language in languages:
+            for group, pattern in _PATTERNS[language].items():
+                matched[group].extend(match.group(0).lower() for match in pattern.finditer(text))
+
+        has_hangar = bool(matched['hangar'])
+        score = (
+            WEIGHTS['facility'] * (has_hangar or bool(matched['facility']) or bool(matched['system']))
+            + WEIGHTS['incident'] * bool(matched['incident'])
+            + WEIGHTS['hangar'] * has_hangar
+        )
+        return round(min(score, 1.0), 3), {group: sorted(set(terms)) for group, terms in matched.items() if terms}
+
+    @staticmethod
+    def mentions_suppression_system(article: Dict[str, Any]) -> bool:
+        """Whether an article names a foam or fire suppression system (e.g. an AFFF discharge)."""
+        text = "\n".join(article.get(field) or '' for field in ('title', 'description', 'content'))
+        languages = {'en', article.get('language')} & set(_PATTERNS)
+        return any(_PATTERNS[language]['system'].search(text) for language in languages)
+
+    def is_relevant(self, article: Dict[str, Any], audit: bool = True) -> bool:
+        """Check an article against the threshold, recording rejections in the audit log."""
+        score, matched = self.score(article)
+        if score >= self.threshold:
+            return True
+        if audit:
+            self._audit(article, score, matched)
+        return False
+
+    def _audit(self, article: Dict[str, Any], score: float, matched: Dict[str, List[str]]) -> None:
+        entry = {
+            "rejectedAt": datetime.datetime.now().isoformat(timespec='seconds'),
+            "score": score,
+            "threshold": self.threshold,
+            "matched": matched,
+            "title": article.get('title'),
+            "url": article.get('url'),
+            "language": article.get('language'),
+        }
+        with self._audit_lock:
+            directory = os.path.dirname(self.audit_log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.audit_log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def evaluate(self, positives: Iterable[Dict[str, Any]], negatives: Iterable[Dict[str, Any]] = ()) -> Dict[str, Any]:
+        """
+        Score labelled articles offline, without writing to the audit log.
+
+        Args:
+            positives: Articles known to be valid incidents (e.g. doc_parse history).
+            negatives: Articles known to be off-topic, if available.
+
+        Returns:
+            Dict[str, Any]: Recall, rejection rate on negatives and the missed positives.
+        """
+        positives = list(positives)
+        negatives = list(negatives)
+        missed = [article for article in positives if not self.is_relevant(article, audit=False)]
+        rejected_negatives = sum(1 for article in negatives if not self.is_relevant(article, audit=False))
+        return {
+            "threshold": self.threshold,
+            "positives": len(positives),
+            "recall": 1 - len(missed) / len(positives) if positives else None,
+            "negatives": len(negatives),
+            "negative_rejection_rate": rejected_negatives / len(negatives) if negatives else None,
+            "missed": [{"title": article.get('title'), "score": self.score(article)[0]} for article in missed],
+        }
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import re
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional
+
+from src.cache.sqlite_cache import SqliteCache
+from src.config import Config
+
+# Entry holding the fingerprint of the prompt templates the cached responses were made with
+_TEMPLATE_KEY = "__template__"
+_SPACES = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of parsed LLM replies, so re-runs over the same articles do not
+    ask the same question twice.
+
+    Entries are keyed on (model, temperature, hash of the normalized messages).
+    Normalization (NFC, collapsed runs of spaces and blank lines, stripped line ends)
+    only removes differences the model would not act on. Entries expire after
+    Config.LLM_CACHE_TTL. The cache is bound to a fingerprint of the prompt
+    templates: opening it with a different fingerprint empties it, so editing the
+    instructions (or bumping Config.ANALYSIS_PROMPT_VERSION) invalidates every
+    stored reply.
+    """
+
+    def __init__(self, template_fingerprint: str, path: str = None, max_entries: int = None, ttl: float = None):
+        self.template_fingerprint = template_fingerprint
+        self._cache = SqliteCache(
+            path or Config.LLM_CACHE_PATH,
+            table="llm_responses",
+            max_entries=max_entries or Config.LLM_CACHE_MAX_ENTRIES,
+            ttl=ttl or Config.LLM_CACHE_TTL
+        )
+        stored = self._cache.get(_TEMPLATE_KEY, max_age=float("inf"))
+        if stored is not None and stored != template_fingerprint:
+            self._cache.clear()
+        if stored != template_fingerprint:
+            self._cache.set(_TEMPLATE_KEY, template_fingerprint)
+
+    @staticmethod
+    def fingerprint(*templates: str) -> str:
+        """Fingerprint of the prompt templates and Config.ANALYSIS_PROMPT_VERSION."""
+        payload = json.dumps([Config.ANALYSIS_PROMPT_VERSION, *templates], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        text = unicodedata.normalize("NFC", text).replace("\r\n", "\n")
+        text = "\n".join(_SPACES.sub(" ", line).rstrip() for line in text.split("\n"))
+        return _BLANK_LINES.sub("\n\n", text).strip()
+
+    def key(self, model: str, temperature: float, messages: List[Dict[str, str]]) -> str:
+        normalized = [[message.get("role", ""), self.normalize(str(message.get("content", "")))] for message in messages]
+        payload = json.dumps([self.template_fingerprint, model, temperature, normalized], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, temperature: float, messages: List[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        value = self._cache.get(self.key(model, temperature, messages))
+        if value is None:
+            return None
+        return json.loads(zlib.decompress(value).decode("utf-8"))
+
+    def set(self, model: str, temperature: float, messages: List[Dict[str, str]], reply: Dict[str, Any]) -> None:
+        payload = json.dumps(reply, ensure_ascii=False).encode("utf-8")
+        self._cache.set(self.key(model, temperature, messages), zlib.compress(payload, 6))
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._cache.set(_TEMPLATE_KEY, self.template_fingerprint)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
@@ -0,0 +1,207 @@
+import bisect
+import datetime
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Tuple
+
+from src.config import Config
+
+# Histogram bucket upper bounds in seconds, as in Prometheus client defaults plus longer tails
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the max for the +Inf bucket)."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and latency histograms for one CLI run.
+
+    Metrics have a name and optional labels (`metrics.inc("serpapi_requests_total",
+    engine="bing_news", source="api")`). LLM token usage is counted per model and
+    priced with Config.MODEL_PRICES. At the end of a run, `write_report` saves a
+    JSON report or a Prometheus textfile (Config.METRICS_FORMAT). Safe to use from
+    any thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters: Dict[str, Dict[LabelKey, float]] = {}
+            self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+            self.started_at = time.time()
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._histograms.setdefault(name, {}).setdefault(key, _Histogram()).observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Observe the duration of the block in the `name` histogram, whether or not it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def record_tokens(self, model: str, prompt_tokens: int, completion_tokens: int = 0,
+                      cached_tokens: int = 0, price_factor: float = 1.0) -> None:
+        """
+        Count one API response's token usage and its estimated cost in USD.
+        price_factor scales the list price, e.g. Config.BATCH_PRICE_FACTOR for batch jobs.
+        """
+        self.inc("llm_prompt_tokens_total", prompt_tokens, model=model)
+        if completion_tokens:
+            self.inc("llm_completion_tokens_total", completion_tokens, model=model)
+        if cached_tokens:
+            self.inc("llm_cached_prompt_tokens_total", cached_tokens, model=model)
+        prices = Config.MODEL_PRICES.get(model)
+        if prices:
+            cost = ((prompt_tokens - cached_tokens) * prices["input"]
+                    + cached_tokens * prices.get("cached_input", prices["input"])
+                    + completion_tokens * prices.get("output", 0)) * price_factor / 1_000_000
+            self.inc("cost_usd_total", cost, service="openai", model=model)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and histogram summaries as plain JSON-ready data."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": round(value, 6)} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [{
+                    "labels": dict(key),
+                    "count": hist.count,
+                    "sum": round(hist.sum, 6),
+                    "max": round(hist.max, 6),
+                    "p50": round(hist.quantile(0.5), 6),
+                    "p95": round(hist.quantile(0.95), 6),
+                    "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], hist.counts)),
+                } for key, hist in series.items()]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def total(self, name: str, **labels) -> float:
+        """Sum of a counter over every series whose labels include the given ones."""
+        wanted = set(self._key(labels))
+        with self._lock:
+            return sum(value for key, value in self._counters.get(name, {}).items() if wanted <= set(key))
+
+    @staticmethod
+    def _prometheus_labels(key: LabelKey, extra: Dict[str, str] = None) -> str:
+        pairs = list(key) + list((extra or {}).items())
+        if not pairs:
+            return ""
+
+        def escape(value: str) -> str:
+            return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+    def to_prometheus(self, prefix: str = "hangar_fire_") -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for key, value in series.items():
+                    lines.append(f"{prefix}{name}{self._prometheus_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for key, hist in series.items():
+                    cumulative = 0
+                    for bound, count in zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], hist.counts):
+                        cumulative += count
+                        lines.append(f"{prefix}{name}_bucket{self._prometheus_labels(key, {'le': bound})} {cumulative}")
+                    lines.append(f"{prefix}{name}_sum{self._prometheus_labels(key)} {hist.sum}")
+                    lines.append(f"{prefix}{name}_count{self._prometheus_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, run_name: str, directory: str = None, fmt: str = None) -> str:
+        """
+        Write the run report and return its path.
+
+        Args:
+            run_name: Name of the run, e.g. the CLI option.
+            directory: Output directory. Defaults to Config.METRICS_REPORT_DIR.
+            fmt: 'json' (one timestamped file per run) or 'prometheus' (a textfile
+                per run name, replaced atomically for node_exporter's textfile collector).
+
+        Returns:
+            str: Path of the written report.
+        """
+        directory = directory or Config.METRICS_REPORT_DIR
+        fmt = fmt or Config.METRICS_FORMAT
+        os.makedirs(directory, exist_ok=True)
+        finished_at = time.time()
+
+        if fmt == "prometheus":
+            path = os.path.join(directory, f"hangar_fire_{run_name}.prom")
+            content = self.to_prometheus() + (
+                "# TYPE hangar_fire_run_duration_seconds gauge\n"
+                f"hangar_fire_run_duration_seconds {finished_at - self.started_at}\n"
+                "# TYPE hangar_fire_run_finished_timestamp_seconds gauge\n"
+                f"hangar_fire_run_finished_timestamp_seconds {finished_at}\n"
+            )
+        else:
+            stamp = datetime.datetime.fromtimestamp(finished_at).strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(directory, f"{run_name}-{stamp}.json")
+            content = json.dumps({
+                "run": run_name,
+                "started_at": datetime.datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+                "duration_seconds": round(finished_at - self.started_at, 3),
+                "estimated_cost_usd": round(self.total("cost_usd_total"), 4),
+                "llm_prompt_tokens": int(self.total("llm_prompt_tokens_total")),
+                "llm_cached_prompt_tokens": int(self.total("llm_cached_prompt_tokens_total")),
+                **self.snapshot(),
+            }, indent=2)
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+        return path
+
+
+metrics = MetricsRegistry()
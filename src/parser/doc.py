@@ -1,49 +1,150 @@
+import json
+import os
 import re
-from typing import Any, Dict, List
-from docx import Document
-
-def split_doc(path: str) -> List[Dict[str, Any]]:
-    doc = Document(path)
-    content_list = []
-    content = ""
-    for para in doc.paragraphs:
-        # Check if the parameter is a heading
-        if para.style.name.startswith('Heading'):
-            if content:
-                content_list.append(content)
-                content = ""
-        else:
-            content += f"{para.text}\n"
-    if content:
-        content_list.append(content)
-    return content_list
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List
+from xml.etree import ElementTree
+
+from src.config import Config
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Built-in heading styles are stored lowercase ('heading 1') and shown capitalized
+_BUILTIN_HEADING = re.compile(r"heading [1-9]")
+
+# Every field label in one alternation, so a section is scanned once
+_LABELS = re.compile(r"(Article Title|Publication name|Accident Location|Article Date|Author|Article Link):")
+# Value patterns, matched right after their label (the first occurrence of each label counts)
+_VALUES = {
+    "Article Title": ("title", re.compile(r"\s*(.*)")),
+    "Publication name": ("source", re.compile(r"\s*(.*)")),
+    "Accident Location": ("location", re.compile(r"\s*(.*)")),
+    "Article Date": ("publishedAt", re.compile(r"\s*(.*)")),
+    "Author": ("author", re.compile(r"[\t]*(.*)")),
+    "Article Link": ("url", re.compile(r"\s*(\S+)")),
+}
+_CONTENT = re.compile(r"\s*\S+\s*([\s\S]+)")
+FIELDS = ("title", "source", "location", "publishedAt", "author", "url", "content")
+
+
+def _paragraph_styles(archive: zipfile.ZipFile) -> tuple:
+    """Map paragraph style ids to their names, and return the default paragraph style's name."""
+    names = {}
+    default = "Normal"
+    try:
+        root = ElementTree.fromstring(archive.read("word/styles.xml"))
+    except KeyError:
+        return names, default
+    for style in root.iter(f"{_W}style"):
+        if style.get(f"{_W}type") != "paragraph":
+            continue
+        name = style.find(f"{_W}name")
+        name = name.get(f"{_W}val") if name is not None else ""
+        if _BUILTIN_HEADING.fullmatch(name):
+            name = name.capitalize()
+        names[style.get(f"{_W}styleId")] = name
+        if style.get(f"{_W}default") in ("1", "true"):
+            default = name
+    return names, default
+
+
+def _run_text(run: ElementTree.Element) -> str:
+    parts = []
+    for child in run:
+        if child.tag == f"{_W}t":
+            parts.append(child.text or "")
+        elif child.tag in (f"{_W}tab", f"{_W}ptab"):
+            parts.append("\t")
+        elif child.tag == f"{_W}cr" or (child.tag == f"{_W}br" and child.get(f"{_W}type", "textWrapping") == "textWrapping"):
+            parts.append("\n")
+        elif child.tag == f"{_W}noBreakHyphen":
+            parts.append("-")
+    return "".join(parts)
+
+
+def _paragraph_text(paragraph: ElementTree.Element) -> str:
+    """Text of the paragraph's runs, hyperlinked runs included, as python-docx reads it."""
+    parts = []
+    for child in paragraph:
+        if child.tag == f"{_W}r":
+            parts.append(_run_text(child))
+        elif child.tag == f"{_W}hyperlink":
+            parts.extend(_run_text(run) for run in child.iter(f"{_W}r"))
+    return "".join(parts)
+
+
+def iter_sections(path: str) -> Iterator[str]:
+    """
+    Yield the text between headings of a DOCX file, one section at a time.
+
+    The document XML is read incrementally and every top-level paragraph is
+    discarded once handled, so memory stays flat however long the archive is.
+    Like python-docx's `Document.paragraphs`, only paragraphs directly in the
+    body count (not those inside tables).
+    """
+    with zipfile.ZipFile(path) as archive:
+        styles, default_style = _paragraph_styles(archive)
+        lines: List[str] = []
+        depth = 0
+        body = None
+        with archive.open("word/document.xml") as document:
+            for event, element in ElementTree.iterparse(document, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 2 and element.tag == f"{_W}body":
+                        body = element
+                    continue
+                depth -= 1
+                if depth != 2 or body is None:
+                    continue
+                if element.tag == f"{_W}p":
+                    style_id = element.find(f"{_W}pPr/{_W}pStyle")
+                    style = styles.get(style_id.get(f"{_W}val"), default_style) if style_id is not None else default_style
+                    if style.startswith('Heading'):
+                        if lines:
+                            yield "".join(lines)
+                            lines = []
+                    else:
+                        lines.append(f"{_paragraph_text(element)}\n")
+                body.remove(element)
+        if lines:
+            yield "".join(lines)
+
+
+def split_doc(path: str) -> List[str]:
+    return list(iter_sections(path))
+
 
 def extract_details(content: str) -> Dict[str, Any]:
-    
-    patterns = {
-        "title": r"Article Title:\s*(.*)",
-        "source": r"Publication name:\s*(.*)",
-        "location": r"Accident Location:\s*(.*)",
-        "publishedAt": r"Article Date:\s*(.*)",
-        "author": r"Author:[\t]*(.*)",
-        "url": r"Article Link:\s*(\S+)",
-        "content": r"Article Link:\s*\S+\s*([\s\S]+)"
-    }
-    
-    details = {}
-    
-    for key, pattern in patterns.items():
-        match = re.search(pattern, content)
+    """Extract the article fields from a section in a single scan for their labels."""
+    details = dict.fromkeys(FIELDS, "")
+    seen = set()
+    for label in _LABELS.finditer(content):
+        name = label.group(1)
+        if name in seen:
+            continue
+        seen.add(name)
+        key, pattern = _VALUES[name]
+        match = pattern.match(content, label.end())
         if match:
             details[key] = match.group(1).strip()
-        else:
-            details[key] = ""
-
-    if "content" in details:
-        details["content"] = details["content"].replace("\n", " ").strip()
+        if name == "Article Link":
+            match = _CONTENT.match(content, label.end())
+            if match:
+                details["content"] = match.group(1).strip().replace("\n", " ").strip()
+        if len(seen) == len(_VALUES):
+            break
     return details
 
 
+def iter_articles(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the articles of a DOCX file as its sections are read; sections without a title are skipped."""
+    for content in iter_sections(file_path):
+        article = extract_details(content)
+        if article["title"]:
+            yield article
+
+
 def doc_parse(file_path: str) -> List[Dict[str, Any]]:
     """
     Parse a DOCX file and extract articles.
@@ -54,10 +155,56 @@ def doc_parse(file_path: str) -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: List of articles with title and content.
     """
-    content_list = split_doc(file_path)
-    articles = []
-    for content in content_list:
-        article = extract_details(content)
-        if article["title"]:
-           articles.append(article)
-    return articles
+    return list(iter_articles(file_path))
+
+
+def archive_paths(path: str) -> List[str]:
+    """The DOCX file at path, or every DOCX file under the directory (Word lock files excluded), sorted."""
+    if not os.path.isdir(path):
+        return [path]
+    paths = []
+    for root, _, files in os.walk(path):
+        paths.extend(os.path.join(root, name) for name in files
+                     if name.lower().endswith(".docx") and not name.startswith("~$"))
+    return sorted(paths)
+
+
+def parse_archives(path: str, workers: int = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the articles of a DOCX file or a directory of DOCX archives, file by file in path order.
+
+    Args:
+        path (str): A DOCX file or a directory searched recursively.
+        workers (int): Parallel processes, Config.DOC_PARSE_WORKERS by default. With one
+            worker or one file, articles are parsed and yielded one at a time in this process.
+
+    Returns:
+        Iterator[Dict[str, Any]]: Articles, as doc_parse extracts them.
+    """
+    paths = archive_paths(path)
+    workers = min(workers or Config.DOC_PARSE_WORKERS, len(paths))
+    if workers <= 1:
+        for file_path in paths:
+            yield from iter_articles(file_path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for articles in executor.map(doc_parse, paths):
+            yield from articles
+
+
+def write_jsonl(articles: Iterable[Dict[str, Any]], path: str) -> int:
+    """Write articles one JSON object per line as they arrive; the file appears complete or not at all. Returns the count."""
+    count = 0
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        for article in articles:
+            f.write(json.dumps(article, ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(path + ".tmp", path)
+    return count
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -1,41 +1,209 @@
-import requests
+import math
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config import Config
+from src.llm.language import translate_query
+from src.logging.colorlog_config import get_color_logger
+from src.metrics import metrics
+from src.scrapers.url_utils import canonicalize_url
 
 load_dotenv()
 NEWSAPI_KEY = os.getenv('NEWSAPI_KEY')
 
+logger = get_color_logger()
+config = Config()
+
+NEWSAPI_URL = 'https://newsapi.org/v2/everything'
 PAGE_SIZE = 100
 
+# NewsAPI language codes for the entries of Config.LANGUAGES it supports (not ja or tr)
+NEWSAPI_LANGUAGES = {
+    'en': 'en',
+    'zh-cn': 'zh',
+    'es': 'es',
+    'fr': 'fr',
+    'pt': 'pt',
+    'de': 'de',
+    'ar': 'ar',
+    'ru': 'ru'
+}
+
+_session = None
+_session_lock = threading.Lock()
+
 
-def get_articles_from_newsapi(query, from_date):
-    base_url = 'https://newsapi.org/v2/everything'
-    headers = {'Authorization': NEWSAPI_KEY}
-    
-    all_articles = []
-    page = 1
-    total_results = 1  # dummy to enter loop
-    
-    while len(all_articles) < total_results:
-        params = {
-            'q': query,
-            'pageSize': PAGE_SIZE,
-            'page': page,
-            'language': 'en',
-            'sortBy': 'publishedAt',
-            'from': from_date
-        }
-        response = requests.get(base_url, headers=headers, params=params)
+def get_newsapi_session() -> requests.Session:
+    """
+    Return the shared NewsAPI session: pooled keep-alive connections sized for
+    Config.NEWSAPI_MAX_WORKERS, retrying 429 and 5xx responses with exponential
+    backoff (honouring Retry-After).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=config.NEWSAPI_RETRIES,
+                backoff_factor=1,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET'],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            # Pages of several languages can be in flight at once
+            pool_size = config.NEWSAPI_MAX_WORKERS * config.NEWSAPI_MAX_WORKERS
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            _session = session
+    return _session
+
+
+def _fetch_page(session: requests.Session, api_key: str, query: str, from_date: str,
+                language: str, page: int) -> Optional[Dict[str, Any]]:
+    params = {
+        'q': query,
+        'pageSize': PAGE_SIZE,
+        'page': page,
+        'language': language,
+        'sortBy': 'publishedAt',
+        'from': from_date
+    }
+    try:
+        with metrics.timer("newsapi_request_seconds", language=language):
+            response = session.get(NEWSAPI_URL, headers={'Authorization': api_key}, params=params, timeout=30)
         data = response.json()
-        if response.status_code != 200 or 'articles' not in data:
-            print(f"Error fetching page {page}: {data}")
-            break
-        if page == 1:
-            total_results = min(data.get('totalResults', 0), 100 * 5)  # NewsAPI caps at 100 results per page, 5 pages max
-        all_articles.extend(data['articles'])
-        if len(data['articles']) < PAGE_SIZE:
-            break  # No more articles
-        page += 1
-        if page > 5:
-            break  # NewsAPI free tier limit
+    except (requests.RequestException, ValueError) as e:
+        metrics.inc("newsapi_errors_total", language=language)
+        logger.error(f"Error fetching NewsAPI page {page} for '{query}' ({language}): {str(e)}")
+        return None
+    metrics.inc("newsapi_requests_total", language=language, status=response.status_code)
+    if response.status_code != 200 or 'articles' not in data:
+        metrics.inc("newsapi_errors_total", language=language)
+        logger.error(f"Error fetching NewsAPI page {page} for '{query}' ({language}): {data}")
+        return None
+    return data
+
+
+def get_articles_from_newsapi(query: str, from_date: str, language: str = 'en', api_key: str = None,
+                              max_workers: int = None) -> List[Dict[str, Any]]:
+    """
+    Fetch every page of NewsAPI results for a query, as raw NewsAPI articles.
+
+    Page 1 gives totalResults, so the remaining pages (up to Config.NEWSAPI_MAX_PAGES)
+    are fetched in parallel over the shared session. Articles keep page order.
+    """
+    session = get_newsapi_session()
+    api_key = api_key or NEWSAPI_KEY
+    if max_workers is None:
+        max_workers = config.NEWSAPI_MAX_WORKERS
+
+    first = _fetch_page(session, api_key, query, from_date, language, 1)
+    if first is None:
+        return []
+    total_results = min(first.get('totalResults', 0), PAGE_SIZE * config.NEWSAPI_MAX_PAGES)
+    all_articles = list(first['articles'])
+    pages = list(range(2, math.ceil(total_results / PAGE_SIZE) + 1))
+    if pages and len(first['articles']) == PAGE_SIZE:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="newsapi-page") as executor:
+            results = executor.map(
+                lambda page: _fetch_page(session, api_key, query, from_date, language, page), pages
+            )
+            for data in results:
+                if data:
+                    all_articles.extend(data['articles'])
     return all_articles
+
+
+def to_record(article: Dict[str, Any], language: str) -> Dict[str, Any]:
+    """Map a raw NewsAPI article to the record shape the SerpAPI scraper emits."""
+    published_at = article.get('publishedAt')
+    return {
+        "title": article.get('title'),
+        "url": article.get('url'),
+        "description": article.get('description'),
+        "source": (article.get('source') or {}).get('name'),
+        "author": article.get('author'),
+        "publishedAt": published_at[:10] if published_at else datetime.now().strftime('%Y-%m-%d'),
+        "language": language
+    }
+
+
+class NewsApiScraper:
+    def __init__(self):
+        self.api_key = os.getenv('NEWSAPI_KEY')
+        if not self.api_key:
+            raise ValueError("NEWSAPI_KEY not found in environment variables")
+
+    @staticmethod
+    def _combined_queries(queries: List[str]) -> List[str]:
+        """OR the queries together into as few searches as the query length limit allows."""
+        combined = []
+        current = []
+        for query in queries:
+            candidate = " OR ".join(f"({q})" for q in current + [query])
+            if current and len(candidate) > config.NEWSAPI_MAX_QUERY_LENGTH:
+                combined.append(" OR ".join(f"({q})" for q in current))
+                current = []
+            current.append(query)
+        if current:
+            combined.append(" OR ".join(f"({q})" for q in current))
+        return combined
+
+    def scrape(self, query_list: List[str], weekly: bool = False, from_date: str = None,
+               languages: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search NewsAPI for the queries in every supported language.
+
+        Queries are translated per language and ORed together, and the searches of
+        all languages run concurrently. Weekly runs search from last week's Monday,
+        like the SerpAPI weekly filter; backfills go back Config.NEWSAPI_BACKFILL_DAYS.
+
+        Returns:
+            List[Dict[str, Any]]: Records in the SerpAPI scraper's shape, without duplicate URLs.
+        """
+        if from_date is None:
+            today = datetime.today()
+            if weekly:
+                start = today - timedelta(days=today.weekday() + 7)
+            else:
+                start = today - timedelta(days=config.NEWSAPI_BACKFILL_DAYS)
+            from_date = start.strftime('%Y-%m-%d')
+
+        tasks = []
+        for language in languages or config.LANGUAGES:
+            newsapi_language = NEWSAPI_LANGUAGES.get(language)
+            if newsapi_language is None:
+                logger.info(f"NewsAPI does not support language '{language}', skipping it.")
+                continue
+            translated = [translate_query(query, language) for query in query_list]
+            for query in self._combined_queries(translated):
+                tasks.append((query, language, newsapi_language))
+
+        def search(task):
+            query, language, newsapi_language = task
+            articles = get_articles_from_newsapi(query, from_date, newsapi_language, api_key=self.api_key)
+            return [to_record(article, language) for article in articles]
+
+        with ThreadPoolExecutor(max_workers=config.NEWSAPI_MAX_WORKERS, thread_name_prefix="newsapi") as executor:
+            results = list(executor.map(search, tasks))
+
+        seen_urls = set()
+        unique_articles = []
+        for records in results:
+            for record in records:
+                url = canonicalize_url(record.get('url') or '')
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    unique_articles.append(record)
+        metrics.inc("articles_scraped_total", len(unique_articles), source="newsapi")
+        logger.info(f"Found {len(unique_articles)} unique articles with NewsAPI.")
+        return unique_articles
@@ -1,11 +1,17 @@
 import os
-from src.llm.language import translate_query
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.llm.language import translate_query, get_translation_cache
 from src.logging.colorlog_config import get_color_logger
 from src.config import Config
+from src.metrics import metrics
+from src.scrapers.serp_cache import SerpResponseCache
+from src.scrapers.url_utils import canonicalize_url
+from src.scrapers.watermarks import ScrapeWatermarks
 
 # Configure colorful logging using Rich
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from serpapi import GoogleSearch
 
 # Use the color logger from the logging utility
@@ -13,10 +19,39 @@ logger = get_color_logger()
 config = Config()
 
 class SerpScraper:
-    def __init__(self):
+    ENGINES = ['bing_news', 'google_news']
+
+    def __init__(self, replay: bool = False, cache: SerpResponseCache = None, incremental: bool = None):
+        """
+        Args:
+            replay: Serve every search from the response cache, regardless of age,
+                without calling SerpAPI. Searches missing from the cache return nothing.
+            cache: Raw response cache; defaults to the on-disk cache when
+                Config.SERPAPI_CACHE_ENABLED is set (always used in replay mode).
+            incremental: Stop paging Bing News at the first result an earlier run already
+                saw, per each search's watermark. Defaults to Config.SERPAPI_INCREMENTAL;
+                always off in replay mode, which reproduces the cached scrape in full.
+                The watermarks only move when the caller commits pending_watermarks()
+                after uploading the articles.
+        """
+        self.replay = replay
         self.api_key = os.getenv('SERPAPI_KEY')
-        if not self.api_key:
+        if not self.api_key and not replay:
             raise ValueError("SERPAPI_KEY not found in environment variables")
+        if cache is None and (replay or config.SERPAPI_CACHE_ENABLED):
+            cache = SerpResponseCache()
+        self.cache = cache
+        if incremental is None:
+            incremental = config.SERPAPI_INCREMENTAL
+        self.watermarks = ScrapeWatermarks() if incremental and not replay else None
+        # New results per search, kept until the caller commits them once uploaded
+        self._pending_marks: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._pending_lock = threading.Lock()
+        # Per-engine limits on concurrent searches, shared by all worker threads
+        self._engine_limits = {
+            engine: threading.BoundedSemaphore(config.SERPAPI_ENGINE_CONCURRENCY.get(engine, 1))
+            for engine in self.ENGINES
+        }
 
     def _is_old_article(self, date_str: str) -> bool:
         """Check if the Bing News date string is valid for the current mode (backfill or weekly)"""
@@ -29,13 +64,13 @@ class SerpScraper:
             return False
 
     def _remove_duplicates(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate articles based on URL"""
+        """Remove duplicate articles based on canonical URL"""
         seen_urls = set()
         unique_articles = []
         
         try:
             for article in articles:
-                url = article.get('url', '')
+                url = canonicalize_url(article.get('url', ''))
                 if url and url not in seen_urls:
                     seen_urls.add(url)
                     unique_articles.append(article)
@@ -46,9 +81,13 @@ class SerpScraper:
             return articles
 
     def _parse_date(self, date_str: str) -> str:
-        """Parse and format date string for both absolute and relative formats"""
+        """Parse and format date string for both absolute and relative formats; today if it cannot be parsed"""
+        return self._parse_known_date(date_str) or datetime.now().strftime('%Y-%m-%d')
+
+    def _parse_known_date(self, date_str: str) -> Optional[str]:
+        """Parse and format date string for both absolute and relative formats, or None if it is missing or unparseable"""
         if not date_str:
-            return datetime.now().strftime('%Y-%m-%d')
+            return None
         try:
             # Handle relative date formats (Bing News)
             now = datetime.now()
@@ -84,10 +123,54 @@ class SerpScraper:
                     return parsed_date.strftime('%Y-%m-%d')
                 except ValueError:
                     continue
-            # If no format matches, return current date
-            return datetime.now().strftime('%Y-%m-%d')
+            return None
         except Exception:
-            return datetime.now().strftime('%Y-%m-%d')
+            return None
+
+    def _fetch(self, params: Dict[str, Any], weekly: bool) -> Dict[str, Any]:
+        """Return the raw SerpAPI response for params, from the cache when it is fresh enough"""
+        if self.cache is not None:
+            if self.replay:
+                max_age = None
+            else:
+                max_age = config.SERPAPI_CACHE_TTL_WEEKLY if weekly else config.SERPAPI_CACHE_TTL_BACKFILL
+            cached = self.cache.get(params, max_age=max_age)
+            if cached is not None:
+                metrics.inc("serpapi_requests_total", engine=params.get('engine'), source="cache")
+                return cached
+        if self.replay:
+            metrics.inc("serpapi_requests_total", engine=params.get('engine'), source="replay_miss")
+            logger.warning(f"No cached response for {params.get('engine')} query '{params.get('q')}' in replay mode")
+            return {}
+        with metrics.timer("serpapi_request_seconds", engine=params.get('engine')):
+            results = GoogleSearch(params).get_dict()
+        metrics.inc("serpapi_requests_total", engine=params.get('engine'), source="api")
+        metrics.inc("cost_usd_total", config.SERPAPI_COST_PER_SEARCH, service="serpapi")
+        if "error" in results:
+            metrics.inc("serpapi_errors_total", engine=params.get('engine'))
+        # Error payloads (including "no results") are not cached so the next run asks again
+        if self.cache is not None and "error" not in results:
+            self.cache.set(params, results)
+        return results
+
+    def _watermark(self, engine: str, query: str, language: str, weekly: bool):
+        return self.watermarks.get(engine, query, language, weekly) if self.watermarks else None
+
+    def _advance_watermark(self, engine: str, query: str, language: str, weekly: bool,
+                           articles: List[Dict[str, Any]]) -> None:
+        """Hold the search's new results ({"url", "publishedAt"}, newest first) until they are committed."""
+        if self.watermarks and articles:
+            with self._pending_lock:
+                self._pending_marks.setdefault((engine, query, language, weekly), []).extend(articles)
+
+    def pending_watermarks(self) -> List[Dict[str, Any]]:
+        """
+        Watermark updates from the searches run so far, as JSON-ready data. Save them with
+        ScrapeWatermarks().commit(...) once the scraped articles have been uploaded.
+        """
+        with self._pending_lock:
+            return [{"engine": engine, "query": query, "language": language, "weekly": weekly, "articles": articles}
+                    for (engine, query, language, weekly), articles in self._pending_marks.items()]
 
     def search_google_news(self, query: str, weekly: bool = False, language: str = 'en') -> List[Dict[str, Any]]:
         """Search Google News for query"""
@@ -99,8 +182,7 @@ class SerpScraper:
                 "hl": language
             }
             
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            results = self._fetch(params, weekly)
             
             if "news_results" in results:
                 temp_articles = [{
@@ -132,6 +214,7 @@ class SerpScraper:
                 return []
                 
         except Exception as e:
+            metrics.inc("serpapi_errors_total", engine='google_news')
             logger.error(f"Error searching Google News for query '{query}': {str(e)}")
             return []
 
@@ -146,13 +229,14 @@ class SerpScraper:
                 'qft': 'interval="8"+sortbydate="1"' if weekly else 'sortbydate="1"'
             }
 
+            # Results are sorted newest first, so paging stops at the first one seen in an earlier run
+            mark = self._watermark('bing_news', query, language, weekly)
             all_articles = []
             first = 1
             stop_paging = False
             while not stop_paging:
                 params['first'] = first
-                search = GoogleSearch(params)
-                results = search.get_dict()
+                results = self._fetch(params, weekly)
                 organic_results = results.get("organic_results", [])
                 if not organic_results:
                     break
@@ -162,11 +246,14 @@ class SerpScraper:
                     if is_old_article:
                         stop_paging = True
                         break
+                    if mark and self.watermarks.is_seen(mark, article.get('link'), self._parse_known_date(date_str)):
+                        stop_paging = True
+                        break
                     all_articles.append(article)
                 if stop_paging or len(organic_results) < params['count']:
                     break
                 first += params['count']
-            return [{
+            articles = [{
                 "title": article.get("title"),
                 "url": article.get("link"),
                 "description": article.get("snippet"),
@@ -175,30 +262,67 @@ class SerpScraper:
                 "publishedAt": self._parse_date(article.get("date")),
                 "language": language
             } for article in all_articles]
+            # Unparseable dates must not move the watermark's newest date
+            self._advance_watermark('bing_news', query, language, weekly, [
+                {"url": article.get("link"), "publishedAt": self._parse_known_date(article.get("date"))}
+                for article in all_articles
+            ])
+            return articles
         except Exception as e:
+            metrics.inc("serpapi_errors_total", engine='bing_news')
             logger.error(f"Error searching Bing News for query '{query}': {str(e)}")
             return []
 
-    def scrape(self, query_list: List[str], weekly: bool = False) -> List[Dict[str, Any]]:
-        """Scrape all news sources"""
-        all_articles = []
+    def _search_engine(self, engine: str, query: str, weekly: bool, language: str) -> List[Dict[str, Any]]:
+        """Run one engine search while holding that engine's concurrency slot"""
+        search = self.search_bing_news if engine == 'bing_news' else self.search_google_news
+        with self._engine_limits[engine]:
+            return search(query, weekly=weekly, language=language)
+
+    def scrape(self, query_list: List[str], weekly: bool = False, max_workers: int = None) -> List[Dict[str, Any]]:
+        """
+        Scrape all news sources.
+
+        Searches for every (language, query, engine) combination are fanned out over a
+        thread pool of `max_workers` threads (defaults to Config.SERPAPI_MAX_WORKERS),
+        with Config.SERPAPI_ENGINE_CONCURRENCY bounding in-flight searches per engine.
+        Results are collected in task order, so the output is the same as a sequential
+        run. Pass max_workers=1 to search sequentially.
+        """
+        if max_workers is None:
+            max_workers = config.SERPAPI_MAX_WORKERS
 
+        tasks = []
         for language in config.LANGUAGES:
-            logger.info(f"##### Starting Scraping news for language: {language} #####")
+            logger.info(f"##### Preparing queries for language: {language} #####")
             for query in query_list:
                 query_lng = translate_query(query, language)
                 logger.info(f"Searching for query: {query_lng}")
+                for engine in self.ENGINES:
+                    tasks.append((engine, query_lng, weekly, language))
+        cache_stats = get_translation_cache().stats()
+        logger.info(f"Translation cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses.")
+        if self.cache is not None:
+            serp_before = self.cache.stats()
+
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="serpapi") as executor:
+                futures = [executor.submit(self._search_engine, *task) for task in tasks]
+                results = [future.result() for future in futures]
+        else:
+            results = [self._search_engine(*task) for task in tasks]
+
+        if self.cache is not None:
+            serp_after = self.cache.stats()
+            logger.info(f"SerpAPI response cache: {serp_after['hits'] - serp_before['hits']} hits, "
+                        f"{serp_after['misses'] - serp_before['misses']} misses.")
+
+        all_articles = []
+        for task_results in results:
+            all_articles.extend(task_results)
 
-                # Search Bing News
-                bing_results = self.search_bing_news(query_lng, weekly=weekly, language=language)
-                all_articles.extend(bing_results)
-                
-                # Search Google News
-                google_results = self.search_google_news(query_lng, weekly=weekly, language=language)
-                all_articles.extend(google_results)
-        
         # Remove duplicates based on URL
         unique_articles = self._remove_duplicates(all_articles)
+        metrics.inc("articles_scraped_total", len(unique_articles), source="serpapi")
         logger.info(f"Found {len(unique_articles)} unique articles with SERP API.")
         return unique_articles
-    
\ No newline at end of file
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+from src.cache.sqlite_cache import SqliteCache
+from src.config import Config
+
+
+class SerpResponseCache:
+    """
+    On-disk cache of raw SerpAPI responses (`GoogleSearch.get_dict()` payloads).
+
+    Entries are keyed on a hash of the normalized request params with `api_key`
+    removed, so the same search hits the same entry whichever key made it.
+    Responses are stored as zlib-compressed JSON. The caller picks how old an
+    entry may be on each lookup, which lets weekly and backfill runs use
+    different TTLs and lets a replay run accept any cached response.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        self._cache = SqliteCache(
+            path or Config.SERPAPI_CACHE_PATH,
+            table="serpapi_responses",
+            max_entries=max_entries or Config.SERPAPI_CACHE_MAX_ENTRIES
+        )
+
+    @staticmethod
+    def key(params: Dict[str, Any]) -> str:
+        """Hash of the request params without api_key; values are compared as strings."""
+        normalized = {name: str(value) for name, value in params.items() if name != "api_key"}
+        payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, params: Dict[str, Any], max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached response for params, or None.
+
+        Args:
+            params: SerpAPI request params.
+            max_age: Oldest acceptable entry in seconds; None accepts any age.
+        """
+        value = self._cache.get(self.key(params), max_age=max_age)
+        if value is None:
+            return None
+        return json.loads(zlib.decompress(value).decode("utf-8"))
+
+    def set(self, params: Dict[str, Any], response: Dict[str, Any]) -> None:
+        payload = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        self._cache.set(self.key(params), zlib.compress(payload, 6))
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
@@ -0,0 +1,104 @@
+import base64
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only identify the click or campaign and never change the page;
+# generic names such as 'ref', 'src' or 'id' can select content and are kept
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'gbraid', 'wbraid', 'dclid', 'msclkid', 'yclid', 'twclid', 'ttclid',
+    'igshid', 'mc_cid', 'mc_eid', '_ga', '_gl',
+}
+TRACKING_PREFIXES = ('utm_',)
+HOST_PREFIXES = ('www.', 'amp.', 'm.')
+
+_AMP_CDN_PATH = re.compile(r'^/[cv]/(s/)?(?P<rest>.+)$')
+
+
+def _decode_google_news_id(article_id: str) -> str:
+    """
+    Extract the target URL embedded in a Google News article id, if any.
+    Older ids are base64-encoded protobufs containing the URL in clear text;
+    newer ids are opaque and return an empty string.
+    """
+    try:
+        decoded = base64.urlsafe_b64decode(article_id + '=' * (-len(article_id) % 4))
+    except (ValueError, TypeError):
+        return ''
+    start = decoded.find(b'http')
+    if start < 0:
+        return ''
+    end = start
+    while end < len(decoded) and 0x21 <= decoded[end] <= 0x7e:
+        end += 1
+    return decoded[start:end].decode('ascii', errors='ignore')
+
+
+def _unwrap_redirect(url: str) -> str:
+    """Follow known redirect and proxy link formats to the publisher URL without a network call."""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    params = dict(parse_qsl(parts.query))
+
+    if host.endswith('news.google.com') and '/articles/' in parts.path:
+        target = _decode_google_news_id(parts.path.rstrip('/').rsplit('/', 1)[-1])
+        return target or url
+    if (host.endswith('google.com') and parts.path == '/url') or \
+            (host.endswith('bing.com') and parts.path.lower().startswith('/news/apiclick')):
+        # parse_qsl has already percent-decoded the target once
+        target = params.get('url') or params.get('q')
+        return target if target and target.startswith('http') else url
+    if host.endswith('.cdn.ampproject.org'):
+        match = _AMP_CDN_PATH.match(parts.path)
+        if match:
+            return f"{'https' if match.group(1) else 'http'}://{match.group('rest')}"
+    return url
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize an article URL so that variants of the same page compare equal.
+
+    Unwraps Google News, Google and Bing redirect links and AMP cache links,
+    lower-cases the host and drops www./amp./m. prefixes, strips AMP path
+    variants (a leading or trailing 'amp' segment, '.amp' suffixes), known
+    tracking parameters, fragments, default ports and trailing slashes, and
+    sorts the remaining query parameters. The scheme is always
+    reported as https.
+    """
+    if not url:
+        return ''
+    url = url.strip()
+    # Redirects can be nested (e.g. a Google redirect to an AMP cache page)
+    for _ in range(3):
+        unwrapped = _unwrap_redirect(url)
+        if unwrapped == url:
+            break
+        url = unwrapped
+
+    parts = urlsplit(url)
+    host = parts.hostname or ''
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    segments = [segment for segment in parts.path.split('/') if segment]
+    # AMP variants put 'amp' before or after the article path; elsewhere it may be part of it
+    if segments and segments[-1].lower() == 'amp':
+        segments.pop()
+    if segments and segments[0].lower() == 'amp':
+        segments.pop(0)
+    if segments:
+        last = segments[-1]
+        for suffix in ('.amp.html', '.amp'):
+            if last.lower().endswith(suffix):
+                last = last[:-len(suffix)] + ('.html' if suffix == '.amp.html' else '')
+        segments[-1] = last
+    path = '/' + '/'.join(segments)
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(('https', host, path, urlencode(query), ''))
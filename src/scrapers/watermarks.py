@@ -0,0 +1,84 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.cache.sqlite_cache import SqliteCache
+from src.config import Config
+from src.scrapers.url_utils import canonicalize_url
+
+
+class ScrapeWatermarks:
+    """
+    High-water marks for incremental scraping, one per (engine, query, language, mode).
+
+    A watermark holds the newest published date seen for a search and the
+    canonical URLs of its most recent results. A later run of the same search
+    can stop paging at the first result that is already known, or that is older
+    than the watermark by more than Config.SERPAPI_WATERMARK_OVERLAP_DAYS
+    (dates of relative results such as "2d" are only accurate to the day).
+    Weekly and backfill searches use different result windows, so they keep
+    separate watermarks.
+
+    Scrapers only collect the results to fold in (see SerpScraper.pending_watermarks);
+    they are saved with `commit` once the articles are uploaded, so a run that
+    fails before uploading scrapes the same results again.
+    """
+
+    def __init__(self, path: str = None, max_urls: int = None, overlap_days: int = None):
+        self.max_urls = max_urls or Config.SERPAPI_WATERMARK_MAX_URLS
+        self.overlap_days = Config.SERPAPI_WATERMARK_OVERLAP_DAYS if overlap_days is None else overlap_days
+        # One small entry per search, so eviction is effectively never reached
+        self._store = SqliteCache(path or Config.SERPAPI_WATERMARK_PATH, table="watermarks", max_entries=1000000)
+
+    @staticmethod
+    def key(engine: str, query: str, language: str, weekly: bool) -> str:
+        return "\x1f".join([engine, "weekly" if weekly else "backfill", language, query])
+
+    def get(self, engine: str, query: str, language: str, weekly: bool) -> Optional[Dict[str, Any]]:
+        """Return {"newest": "YYYY-MM-DD", "urls": [...]} for the search, or None if it never ran."""
+        value = self._store.get(self.key(engine, query, language, weekly))
+        return json.loads(value) if value else None
+
+    def is_seen(self, mark: Optional[Dict[str, Any]], url: str, published_at: Optional[str]) -> bool:
+        """
+        Whether a result falls in territory a previous run already covered.
+        Results without a known date (published_at None) are checked by URL only.
+        """
+        if not mark:
+            return False
+        if canonicalize_url(url or '') in set(mark["urls"]):
+            return True
+        if not mark["newest"] or not published_at:
+            return False
+        cutoff = datetime.strptime(mark["newest"], '%Y-%m-%d') - timedelta(days=self.overlap_days)
+        return datetime.strptime(published_at, '%Y-%m-%d') < cutoff
+
+    def advance(self, engine: str, query: str, language: str, weekly: bool,
+                articles: List[Dict[str, Any]]) -> None:
+        """
+        Fold the newly seen articles (newest first, as {"url", "publishedAt"}) into the
+        search's watermark. Articles whose "publishedAt" is None (date unknown) add
+        their URL but never move the newest date.
+        """
+        if not articles:
+            return
+        mark = self.get(engine, query, language, weekly) or {"newest": None, "urls": []}
+        dates = [article["publishedAt"] for article in articles if article.get("publishedAt")]
+        newest = max(dates + ([mark["newest"]] if mark["newest"] else []), default=None)
+        new_urls = [canonicalize_url(article.get("url") or '') for article in articles]
+        # Most recent first, without duplicates
+        urls = list(dict.fromkeys(url for url in new_urls + mark["urls"] if url))
+        value = {"newest": newest, "urls": urls[:self.max_urls]}
+        self._store.set(self.key(engine, query, language, weekly), json.dumps(value))
+
+    def commit(self, pending: List[Dict[str, Any]], failed_urls: Iterable[str] = ()) -> None:
+        """
+        Save watermarks collected by SerpScraper.pending_watermarks, once their articles
+        are uploaded. A search with any article in failed_urls keeps its old watermark,
+        so the next run fetches that article again.
+        """
+        failed = {canonicalize_url(url) for url in failed_urls}
+        for search in pending:
+            if any(canonicalize_url(article.get("url") or '') in failed for article in search["articles"]):
+                continue
+            self.advance(search["engine"], search["query"], search["language"], search["weekly"], search["articles"])
@@ -0,0 +1,44 @@
+import os
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+import pytest
+
+from src.llm.relevance import RelevanceScorer
+
+
+@pytest.fixture
+def scorer():
+    return RelevanceScorer(threshold=0.7)
+
+
+@pytest.mark.parametrize("title", [
+    "Planet Fitness fired manager after smoke alarm",
+    "Jetty fire destroys boats in marina",
+    "Firefox update fixes crash on startup",
+])
+def test_terms_do_not_match_longer_words(scorer, title):
+    assert not scorer.is_relevant({"title": title, "language": "en"}, audit=False)
+
+
+@pytest.mark.parametrize("title, language", [
+    ("Planes damaged as blaze engulfs airport hangars", "en"),
+    ("Firefighters battle explosion at aircraft maintenance hangar", "en"),
+    ("Incendio en un hangar del aeropuerto de Barajas", "es"),
+    ("Пожар в ангаре аэропорта Шереметьево", "ru"),
+    ("Brand in Flugzeughalle am Flughafen", "de"),
+    ("机库发生火灾", "zh-cn"),
+])
+def test_hangar_fires_pass(scorer, title, language):
+    assert scorer.is_relevant({"title": title, "language": language}, audit=False)
+
+
+@pytest.mark.parametrize("title", [
+    "AFFF accidental discharge at Naval Air Station",
+    "Foam suppression system malfunction floods maintenance facility",
+    "Sprinkler system discharges foam in maintenance building",
+])
+def test_suppression_system_discharges_pass_without_a_facility_term(scorer, title):
+    article = {"title": title, "language": "en"}
+    assert RelevanceScorer.mentions_suppression_system(article)
+    assert scorer.is_relevant(article, audit=False)
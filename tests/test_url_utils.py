@@ -0,0 +1,56 @@
+import base64
+from urllib.parse import quote
+
+from src.scrapers.url_utils import canonicalize_url
+
+
+def test_strips_tracking_params_and_sorts_the_rest():
+    url = "https://www.example.com/news/story?utm_source=feed&utm_medium=rss&fbclid=abc&b=2&gclid=x&a=1"
+    assert canonicalize_url(url) == "https://example.com/news/story?a=1&b=2"
+
+
+def test_keeps_generic_params_that_can_select_content():
+    url = "https://example.com/article.php?ref=home&src=rss&id=42&partner=x"
+    assert canonicalize_url(url) == "https://example.com/article.php?id=42&partner=x&ref=home&src=rss"
+
+
+def test_normalizes_scheme_host_port_fragment_and_trailing_slash():
+    assert canonicalize_url("http://M.Example.com:443/news/story/#comments") == "https://example.com/news/story"
+    assert canonicalize_url("http://example.com:8080/story") == "https://example.com:8080/story"
+
+
+def test_drops_amp_segment_at_either_end():
+    assert canonicalize_url("https://example.com/amp/news/story") == "https://example.com/news/story"
+    assert canonicalize_url("https://example.com/news/story/amp/") == "https://example.com/news/story"
+    assert canonicalize_url("https://amp.example.com/news/story.amp.html") == "https://example.com/news/story.html"
+
+
+def test_keeps_amp_segment_inside_the_path():
+    assert canonicalize_url("https://example.com/blog/amp/how-amp-works") == "https://example.com/blog/amp/how-amp-works"
+
+
+def test_unwraps_google_redirect():
+    target = "https://example.com/news/story?utm_source=google&id=7"
+    url = f"https://www.google.com/url?sa=t&url={quote(target, safe='')}"
+    assert canonicalize_url(url) == "https://example.com/news/story?id=7"
+
+
+def test_unwraps_bing_redirect():
+    target = "https://example.com/news/story"
+    url = f"https://www.bing.com/news/apiclick.aspx?ref=FexRss&aid=&url={quote(target, safe='')}&c=1"
+    assert canonicalize_url(url) == "https://example.com/news/story"
+
+
+def test_redirect_target_is_decoded_only_once():
+    # The target's own query holds an encoded '&' and a literal '%25'
+    target = "https://example.com/search?q=fire%26smoke&rate=50%25"
+    url = f"https://www.bing.com/news/apiclick.aspx?url={quote(target, safe='')}"
+    assert canonicalize_url(url) == canonicalize_url(target)
+    assert canonicalize_url(url) == "https://example.com/search?q=fire%26smoke&rate=50%25"
+
+
+def test_unwraps_amp_cache_and_google_news_links():
+    assert canonicalize_url("https://example-com.cdn.ampproject.org/c/s/example.com/news/story/amp") == \
+        "https://example.com/news/story"
+    article_id = base64.urlsafe_b64encode(b'\x08\x13"\x1ahttps://example.com/news/story\xd2\x01\x00').decode().rstrip('=')
+    assert canonicalize_url(f"https://news.google.com/rss/articles/{article_id}?oc=5") == "https://example.com/news/story"